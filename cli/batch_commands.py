@@ -0,0 +1,299 @@
+"""
+Batch command for ZK Health CLI
+
+Runs many operations from one NDJSON file in a single process, concurrently,
+instead of one CLI process per operation.
+
+Each input line is a JSON object:
+
+    {"id": "c1", "op": "consent.create", "params": {...}, "depends_on": ["p1", "d1"]}
+
+``id`` is optional (defaults to "line<N>") and must be unique. ``depends_on``
+lists ids of earlier lines that must succeed first. String values in
+``params`` may reference results of those lines as ``${<id>.<field>}``, e.g.
+``"consent_id": "${c1.consent_id}"``. Each finished operation is written as one
+NDJSON result line, in completion order.
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+import click
+from rich.console import Console
+
+from utils import get_session, POOL_SIZE
+from multipart import MultipartEncoder
+
+# Progress and summary go to stderr so stdout can carry the NDJSON results
+console = Console(stderr=True)
+
+REFERENCE = re.compile(r"\$\{([^}.]+)((?:\.[^}.]+)*)\}")
+
+
+def _identity_create(params):
+    metadata = dict(params.get('metadata') or {})
+    if params.get('name'):
+        metadata['name'] = params['name']
+    return {'json': {'party_id': params['party_id'], 'claim': params['claim'], 'metadata': metadata}}
+
+
+def _document_upload(params):
+    fields = {key: value for key, value in params.items() if key != 'file_path'}
+    fields['metadata'] = json.dumps(fields.get('metadata') or {})
+    return {'data': fields, 'file_path': params['file_path']}
+
+
+def _json_body(params):
+    return {'json': params}
+
+
+# op name -> (HTTP method, path, request builder)
+OPERATIONS = {
+    'identity.create': ('POST', '/api/identity/register', _identity_create),
+    'identity.verify': ('POST', '/api/identity/verify', _json_body),
+    'consent.create': ('POST', '/api/consent', _json_body),
+    'consent.approve': ('POST', '/api/consent/approve', _json_body),
+    'consent.revoke': ('POST', '/api/consent/revoke', _json_body),
+    'document.upload': ('POST', '/api/document/upload', _document_upload),
+    'treatment.start': ('POST', '/api/treatment/start', _json_body),
+    'treatment.update': ('POST', '/api/treatment/update', _json_body),
+    'treatment.complete': ('POST', '/api/treatment/complete', _json_body),
+    'treatment.feedback': ('POST', '/api/treatment/feedback', _json_body),
+}
+
+
+class BatchError(Exception):
+    """An input line that cannot be run"""
+
+
+def _lookup(results, op_id, path):
+    value = results[op_id]
+    for key in path:
+        if not isinstance(value, dict) or key not in value:
+            raise BatchError(f"Reference ${{{op_id}.{'.'.join(path)}}} not found in result of {op_id}")
+        value = value[key]
+    return value
+
+
+def resolve_references(value, results):
+    """Replace ${id.field} references in value with fields of earlier results"""
+    if isinstance(value, dict):
+        return {key: resolve_references(item, results) for key, item in value.items()}
+    if isinstance(value, list):
+        return [resolve_references(item, results) for item in value]
+    if not isinstance(value, str):
+        return value
+
+    whole = REFERENCE.fullmatch(value)
+    if whole:
+        # A lone reference keeps the referenced value's type
+        return _lookup(results, whole.group(1), [p for p in whole.group(2).split('.') if p])
+    return REFERENCE.sub(
+        lambda m: str(_lookup(results, m.group(1), [p for p in m.group(2).split('.') if p])),
+        value
+    )
+
+
+def run_operation(api_url, op, params, timeout):
+    """Execute one operation; returns (http_status, response body)"""
+    if op not in OPERATIONS:
+        raise BatchError(f"Unknown operation '{op}'")
+    method, path, build = OPERATIONS[op]
+    request = build(params)
+    file_path = request.pop('file_path', None)
+
+    # Shared pooled session; errors are reported in the results, not printed
+    session = get_session()
+    if file_path:
+        with open(file_path, 'rb') as f:
+            encoder = MultipartEncoder(request['data'], {'file': (os.path.basename(file_path), f)})
+            response = session.request(
+                method, f"{api_url}{path}", data=encoder,
+                headers={'Content-Type': encoder.content_type}, timeout=timeout
+            )
+    else:
+        response = session.request(method, f"{api_url}{path}", timeout=timeout, **request)
+
+    try:
+        body = response.json()
+    except ValueError:
+        body = response.text
+    return response.status_code, body
+
+
+class BatchRunner:
+    """Schedules NDJSON operations over a bounded pool of workers
+
+    Lines are read lazily. A line is submitted once all of its dependencies
+    have succeeded, and skipped if any of them failed. At most ``workers``
+    operations run at once, and reading pauses while ``max_pending`` lines are
+    queued or running, so memory stays bounded on large inputs.
+    """
+
+    def __init__(self, api_url, workers=16, timeout=30.0, max_pending=None):
+        self.api_url = api_url
+        self.workers = workers
+        self.timeout = timeout
+        self.max_pending = max_pending or workers * 4
+        self.results = {}
+        self.status = {}
+        self.counts = {'ok': 0, 'error': 0, 'skipped': 0}
+        self._waiting = {}
+        self._running = {}
+        # ids waiting or running
+        self._active = set()
+        self._lock = threading.Lock()
+
+    def run(self, lines, emit):
+        """Run every operation in lines, passing each result record to emit"""
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for number, line in enumerate(lines, 1):
+                line = line.strip()
+                if not line:
+                    continue
+
+                while len(self._waiting) + len(self._running) >= self.max_pending:
+                    self._drain(executor, emit, block=True)
+
+                entry = self._parse(number, line, emit)
+                if entry is not None:
+                    self._waiting[entry['id']] = entry
+                    self._active.add(entry['id'])
+                    self._schedule(executor, emit)
+                self._drain(executor, emit, block=False)
+
+            while self._running:
+                self._drain(executor, emit, block=True)
+
+        # Anything still waiting depends on a line that never ran
+        for entry in list(self._waiting.values()):
+            self._finish(entry, emit, 'skipped', error="Dependency never completed")
+        self._waiting.clear()
+        return time.perf_counter() - started
+
+    def _parse(self, number, line, emit):
+        try:
+            entry = json.loads(line)
+            if not isinstance(entry, dict) or 'op' not in entry:
+                raise BatchError("Line must be a JSON object with an 'op' field")
+        except (ValueError, BatchError) as e:
+            self._finish({'id': f"line{number}", 'op': None}, emit, 'error', error=f"Invalid line: {e}")
+            return None
+
+        entry.setdefault('id', f"line{number}")
+        entry['id'] = str(entry['id'])
+        entry['depends_on'] = [str(dep) for dep in entry.get('depends_on') or []]
+        entry.setdefault('params', {})
+
+        if entry['id'] in self.status or entry['id'] in self._active:
+            self._finish(dict(entry, id=f"line{number}"), emit, 'error',
+                         error=f"Duplicate id '{entry['id']}'")
+            return None
+        unknown = [dep for dep in entry['depends_on'] if dep not in self.status and dep not in self._active]
+        if unknown:
+            self._finish(entry, emit, 'error',
+                         error=f"Unknown dependencies (must appear on earlier lines): {', '.join(unknown)}")
+            return None
+        return entry
+
+    def _schedule(self, executor, emit):
+        """Submit or skip every waiting entry whose dependencies have finished"""
+        progressed = True
+        while progressed:
+            progressed = False
+            for op_id, entry in list(self._waiting.items()):
+                states = [self.status.get(dep) for dep in entry['depends_on']]
+                if any(state in ('error', 'skipped') for state in states):
+                    del self._waiting[op_id]
+                    failed = [dep for dep, state in zip(entry['depends_on'], states) if state != 'ok']
+                    self._finish(entry, emit, 'skipped', error=f"Dependency failed: {', '.join(failed)}")
+                    progressed = True
+                elif all(state == 'ok' for state in states):
+                    del self._waiting[op_id]
+                    future = executor.submit(self._execute, entry)
+                    self._running[future] = entry
+
+    def _execute(self, entry):
+        started = time.perf_counter()
+        try:
+            with self._lock:
+                params = resolve_references(entry['params'], self.results)
+            http_status, body = run_operation(self.api_url, entry['op'], params, self.timeout)
+            state = 'ok' if 200 <= http_status < 300 else 'error'
+            return state, http_status, body, None, time.perf_counter() - started
+        except Exception as e:
+            return 'error', None, None, str(e), time.perf_counter() - started
+
+    def _drain(self, executor, emit, block):
+        if not self._running:
+            return
+        done, _ = wait(list(self._running), timeout=None if block else 0, return_when=FIRST_COMPLETED)
+        for future in done:
+            entry = self._running.pop(future)
+            state, http_status, body, error, elapsed = future.result()
+            if state == 'ok':
+                with self._lock:
+                    self.results[entry['id']] = body
+            elif error is None:
+                error = body.get('error', body.get('message')) if isinstance(body, dict) else body
+            self._finish(entry, emit, state, http_status=http_status, body=body,
+                         error=error, elapsed=elapsed)
+        if done:
+            self._schedule(executor, emit)
+
+    def _finish(self, entry, emit, state, http_status=None, body=None, error=None, elapsed=None):
+        self._active.discard(entry['id'])
+        self.status[entry['id']] = state
+        self.counts[state] += 1
+        record = {'id': entry['id'], 'op': entry.get('op'), 'status': state}
+        if http_status is not None:
+            record['http_status'] = http_status
+        if elapsed is not None:
+            record['elapsed_ms'] = round(elapsed * 1000, 2)
+        if state == 'ok':
+            record['result'] = body
+        else:
+            record['error'] = error
+        emit(record)
+
+
+@click.command(name="batch")
+@click.argument('input_file', type=click.File('r'), default='-')
+@click.option('--output', '-o', type=click.File('w'), default='-',
+              help='NDJSON results file (default: stdout)')
+@click.option('--workers', type=int, default=min(16, POOL_SIZE), show_default=True,
+              help='Operations run concurrently')
+@click.option('--timeout', type=float, default=30.0, show_default=True,
+              help='Per-request timeout in seconds')
+def batch_command(input_file, output, workers, timeout):
+    """Run operations from an NDJSON file concurrently
+
+    Supported ops: identity.create, identity.verify, consent.create,
+    consent.approve, consent.revoke, document.upload, treatment.start,
+    treatment.update, treatment.complete, treatment.feedback.
+    """
+    api_url = os.getenv('API_URL', 'http://localhost:8080')
+    runner = BatchRunner(api_url, workers=max(1, workers), timeout=timeout)
+
+    def emit(record):
+        output.write(json.dumps(record) + "\n")
+        output.flush()
+
+    elapsed = runner.run(input_file, emit)
+
+    total = sum(runner.counts.values())
+    console.print(
+        f"[bold]{total}[/bold] operations in {elapsed:.2f}s "
+        f"({total / elapsed if elapsed else 0:.1f} ops/s): "
+        f"[green]{runner.counts['ok']} ok[/green], "
+        f"[red]{runner.counts['error']} failed[/red], "
+        f"[yellow]{runner.counts['skipped']} skipped[/yellow]"
+    )
+    if runner.counts['error'] or runner.counts['skipped']:
+        sys.exit(1)
@@ -7,10 +7,11 @@ import time
 import uuid
 import random
 import json
-import requests
 from rich.console import Console
 from rich.progress import track
 
+from utils import new_session
+
 # API Endpoints for Gateway Services
 BASE_API_URL = "http://localhost:8080"
 TOKEN_GEN_URL = f"{BASE_API_URL}/identity/register"
@@ -22,6 +23,10 @@ CROSS_SERVICE_URL = f"{BASE_API_URL}/event/log"
 
 console = Console()
 
+# Pooled keep-alive session shared by all API calls; no retries, so timings
+# and error rates are what the server actually returned
+session = new_session(retries=0)
+
 def run_gateway_benchmarks(iterations=100):
     """
     Run benchmarks for API Gateway operations
@@ -364,7 +369,7 @@ def call_token_generation(token_params):
             "claim": claim
         }
         
-        response = requests.post(TOKEN_GEN_URL, json=payload, timeout=15)
+        response = session.post(TOKEN_GEN_URL, json=payload, timeout=15)
         if response.status_code in [200, 201]:
             result = response.json()
             # Add token data to result
@@ -420,7 +425,7 @@ def call_token_validation(token, request_context):
             "claim": claim
         }
         
-        response = requests.post(TOKEN_VALIDATE_URL, json=payload, timeout=10)
+        response = session.post(TOKEN_VALIDATE_URL, json=payload, timeout=10)
         if response.status_code == 200:
             return response.json()
         else:
@@ -464,7 +469,7 @@ def call_request_routing(request):
             "user_id": request.get("user_id", "default_user"),
             "action": request.get("action", "read")
         }
-        response = requests.get(REQUEST_ROUTE_URL, params=params, timeout=10)
+        response = session.get(REQUEST_ROUTE_URL, params=params, timeout=10)
         if response.status_code == 200:
             return response.json()
         else:
@@ -509,7 +514,7 @@ def call_request_throttling(request):
             "rate": request.get("rate", "10"),
             "burst": request.get("burst", "5")
         }
-        response = requests.get(THROTTLE_URL, params=params, timeout=10)
+        response = session.get(THROTTLE_URL, params=params, timeout=10)
         if response.status_code == 200:
             return response.json()
         else:
@@ -560,7 +565,7 @@ def call_rbac_verification(context):
             "owner_id": str(uuid.uuid4())
         }
         
-        response = requests.post(RBAC_URL, json=policy_request, timeout=10)
+        response = session.post(RBAC_URL, json=policy_request, timeout=10)
         if response.status_code == 200:
             result = response.json()
             # Map the policy response back to RBAC format
@@ -628,7 +633,7 @@ def call_cross_service_auth(auth_context):
             }
         }
         
-        response = requests.post(CROSS_SERVICE_URL, json=event_request, timeout=10)
+        response = session.post(CROSS_SERVICE_URL, json=event_request, timeout=10)
         # Treat both 200 OK and 201 Created as success
         if response.status_code in [200, 201]:
             try:
@@ -6,12 +6,13 @@ Identity Management Benchmarks for ZK Health Infrastructure
 import time
 import uuid
 import random
-import requests
 from rich.console import Console
 from rich.progress import track
 from functools import lru_cache
 from collections import OrderedDict
 
+from utils import new_session
+
 # Identity cache with limited size (LRU policy)
 class IdentityCache:
     def __init__(self, max_size=1000):
@@ -58,6 +59,10 @@ IDENTITY_RETRIEVAL_URL = f"{BASE_API_URL}/identity/retrieve"
 
 console = Console()
 
+# Pooled keep-alive session shared by all API calls; no retries, so timings
+# and error rates are what the server actually returned
+session = new_session(retries=0)
+
 def run_identity_benchmarks(iterations=100):
     """
     Run benchmarks for identity management operations
@@ -300,7 +305,7 @@ def call_zk_proof_generation(party_id, claim):
             "party_id": party_id,
             "claim": claim
         }
-        response = requests.post(ZK_PROOF_GEN_URL, json=payload, timeout=10)
+        response = session.post(ZK_PROOF_GEN_URL, json=payload, timeout=10)
         # The registerIdentity endpoint returns 201 Created with the ZK proof
         if response.status_code == 201:
             return response.json().get("zk_proof")
@@ -331,7 +336,7 @@ def call_identity_verification(party_id, zk_proof):
             "party_id": party_id,
             "claim": claim
         }
-        response = requests.post(IDENTITY_VERIFY_URL, json=payload, timeout=10)
+        response = session.post(IDENTITY_VERIFY_URL, json=payload, timeout=10)
         if response.status_code == 200:
             return response.json().get("is_valid", False)
         else:
@@ -356,7 +361,7 @@ def call_claim_validation(party_id, claim):
             "party_id": party_id,
             "claim": claim
         }
-        response = requests.post(CLAIM_VALIDATE_URL, json=payload, timeout=10)
+        response = session.post(CLAIM_VALIDATE_URL, json=payload, timeout=10)
         if response.status_code == 200:
             return response.json().get("is_valid", False)
         else:
@@ -402,14 +407,14 @@ def call_identity_retrieval(party_id):
         }
         
         # First try with the /identity/retrieve/{id} pattern
-        response = requests.get(
+        response = session.get(
             f"{BASE_API_URL}/identity/retrieve/{formatted_party_id}", 
             **request_options
         )
         
         # If that fails, try alternate route that might be configured
         if response.status_code != 200:
-            response = requests.get(
+            response = session.get(
                 f"{BASE_API_URL}/identity/{formatted_party_id}", 
                 **request_options
             )
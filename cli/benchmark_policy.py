@@ -6,13 +6,18 @@ Location-Based Policy Agreement Engine Benchmarks for ZK Health Infrastructure
 import time
 import uuid
 import random
-import requests
 from datetime import datetime
 from rich.console import Console
 from rich.progress import track
 
+from utils import new_session
+
 console = Console()
 
+# Pooled keep-alive session shared by all API calls; no retries, so timings
+# and error rates are what the server actually returned
+session = new_session(retries=0)
+
 # API endpoints for policy validation (assumes the Go API is running)
 POLICY_API_URL = "http://localhost:8080/policy/validate"
 CROSS_JURISDICTION_API_URL = "http://localhost:8080/policy/cross-jurisdiction"
@@ -338,7 +343,7 @@ def call_policy_validation(request):
     """Call the actual policy validation API"""
     try:
         # Make an actual API call to the Go backend
-        response = requests.post(POLICY_API_URL, json=request, timeout=10)
+        response = session.post(POLICY_API_URL, json=request, timeout=10)
         if response.status_code == 200:
             # Extract the key fields we need from the response
             result = response.json()
@@ -407,7 +412,7 @@ def simulate_policy_validation_fallback(request):
 def call_cross_jurisdiction_validation(request):
     """Call the actual cross-jurisdiction validation API"""
     try:
-        response = requests.post(CROSS_JURISDICTION_API_URL, json=request, timeout=15)
+        response = session.post(CROSS_JURISDICTION_API_URL, json=request, timeout=15)
         if response.status_code == 200:
             return response.json()
         else:
@@ -450,7 +455,7 @@ def simulate_cross_jurisdiction_validation_fallback(request):
 def call_role_validation(request):
     """Call the actual role validation API"""
     try:
-        response = requests.post(ROLE_API_URL, json=request, timeout=10)
+        response = session.post(ROLE_API_URL, json=request, timeout=10)
         if response.status_code == 200:
             return response.json()
         else:
@@ -532,7 +537,7 @@ def call_validator_selection(request):
             "action": request.get("action", ""),
             "location": request.get("location", "")
         }
-        response = requests.get(VALIDATOR_API_URL, params=params, timeout=10)
+        response = session.get(VALIDATOR_API_URL, params=params, timeout=10)
         if response.status_code == 200:
             return response.json()
         else:
@@ -583,7 +588,7 @@ def simulate_validator_selection_fallback(request):
 def call_policy_oracle_integration(oracle_request):
     """Call the actual policy-oracle integration API"""
     try:
-        response = requests.post(ORACLE_API_URL, json=oracle_request, timeout=15)
+        response = session.post(ORACLE_API_URL, json=oracle_request, timeout=15)
         if response.status_code == 200:
             return response.json()
         else:
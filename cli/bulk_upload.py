@@ -0,0 +1,408 @@
+"""
+Directory-scale document ingestion for ZK Health CLI
+
+A directory tree is walked lazily and its files are hashed in parallel. Files
+whose content was already uploaded for the same patient are skipped using a
+local content-addressed index (SQLite, keyed by SHA-256), and the rest are
+uploaded concurrently. Uploads are bounded by a budget of bytes in flight as
+well as a worker count; on 429/503 responses the number of concurrent
+uploads is halved and every worker pauses (honouring Retry-After), then
+concurrency grows back by one per success.
+
+Every file's outcome is recorded in a manifest table in the same database,
+keyed by run (directory and upload parameters), path, size and mtime, so
+running the same command again resumes a half-finished run without
+re-hashing finished files.
+"""
+
+import os
+import json
+import time
+import random
+import fnmatch
+import hashlib
+import sqlite3
+import datetime
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from utils import get_session
+from multipart import MultipartEncoder
+
+STATE_DIR = os.path.expanduser(os.getenv('ZK_CLI_STATE_DIR', '~/.zk_health'))
+DEFAULT_INDEX_PATH = os.path.join(STATE_DIR, 'upload_index.sqlite')
+
+DEFAULT_MAX_IN_FLIGHT = 256 * 1024 * 1024
+HASH_READ_SIZE = 1024 * 1024
+
+# Responses that mean "slow down"
+THROTTLE_STATUSES = (429, 503)
+MAX_ATTEMPTS = 6
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 30.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    sha256 TEXT NOT NULL,
+    patient_id TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    document_id TEXT,
+    merkle_root TEXT,
+    path TEXT,
+    uploaded_at TEXT NOT NULL,
+    PRIMARY KEY (sha256, patient_id)
+);
+CREATE TABLE IF NOT EXISTS manifest (
+    run_id TEXT NOT NULL,
+    path TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    sha256 TEXT,
+    status TEXT NOT NULL,
+    document_id TEXT,
+    error TEXT,
+    updated_at TEXT NOT NULL,
+    PRIMARY KEY (run_id, path)
+);
+"""
+
+# Manifest states that need no further work
+FINISHED = ('uploaded', 'duplicate')
+
+
+def walk_files(root, patterns=('*',)):
+    """
+    Yield regular files under root lazily, in sorted order
+
+    Hidden entries and symlinked directories are skipped; only one directory
+    listing is held per level of the tree.
+    """
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        try:
+            with os.scandir(directory) as it:
+                entries = sorted(it, key=lambda entry: entry.name)
+        except OSError:
+            continue
+        subdirs = []
+        for entry in entries:
+            if entry.name.startswith('.'):
+                continue
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.path)
+                elif entry.is_file() and any(fnmatch.fnmatch(entry.name, p) for p in patterns):
+                    yield entry
+            except OSError:
+                continue
+        stack.extend(reversed(subdirs))
+
+
+def hash_file(path):
+    """Hex SHA-256 of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(HASH_READ_SIZE)
+            if not chunk:
+                return digest.hexdigest()
+            digest.update(chunk)
+
+
+def _now():
+    return datetime.datetime.now().isoformat()
+
+
+class UploadIndex:
+    """SQLite content index of uploaded documents, plus per-run manifests"""
+
+    def __init__(self, path=DEFAULT_INDEX_PATH):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.db = sqlite3.connect(path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.commit()
+        self.db.close()
+
+    def lookup(self, sha256, patient_id):
+        """Document ID of content already uploaded for the patient, or None"""
+        row = self.db.execute(
+            "SELECT document_id FROM documents WHERE sha256 = ? AND patient_id = ?",
+            (sha256, patient_id)
+        ).fetchone()
+        return row[0] if row else None
+
+    def add(self, sha256, patient_id, size, document_id, merkle_root, path):
+        self.db.execute(
+            "INSERT OR REPLACE INTO documents VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (sha256, patient_id, size, document_id, merkle_root, path, _now())
+        )
+
+    def finished(self, run_id, path, size, mtime_ns):
+        """Whether a file is recorded as done for the run and has not changed since"""
+        row = self.db.execute(
+            "SELECT size, mtime_ns, status FROM manifest WHERE run_id = ? AND path = ?",
+            (run_id, path)
+        ).fetchone()
+        return row is not None and row[0] == size and row[1] == mtime_ns and row[2] in FINISHED
+
+    def record(self, run_id, item, status, document_id=None, error=None):
+        self.db.execute(
+            "INSERT OR REPLACE INTO manifest VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (run_id, item.path, item.size, item.mtime_ns, item.sha256, status, document_id, error, _now())
+        )
+        self.db.commit()
+
+    def reset(self, run_id):
+        self.db.execute("DELETE FROM manifest WHERE run_id = ?", (run_id,))
+        self.db.commit()
+
+
+class _Item:
+    """One file of the run"""
+
+    def __init__(self, path, relpath, size=0, mtime_ns=0):
+        self.path = path
+        self.relpath = relpath
+        self.size = size
+        self.mtime_ns = mtime_ns
+        self.sha256 = None
+        self.document_id = None
+        self.error = None
+        self.attempts = 0
+
+
+class _Throttled(Exception):
+    """The server asked us to slow down"""
+
+    def __init__(self, status, retry_after):
+        super().__init__(f"HTTP {status}")
+        self.retry_after = retry_after
+
+
+def _retry_after(response):
+    try:
+        return max(0.0, float(response.headers.get('Retry-After', '')))
+    except ValueError:
+        return None
+
+
+class BulkUploader:
+    """
+    Uploads the files of a directory tree with dedup, backpressure and resume
+
+    Args:
+        api_url: API base URL
+        root: Directory to ingest
+        fields: Upload form fields shared by every file (patient_id, doc_type, ...)
+        index: UploadIndex holding the content index and manifests
+        metadata: Document metadata; each file's relative path and SHA-256 are added
+        patterns: Filename globs to include
+        hash_workers: Files hashed concurrently
+        upload_workers: Maximum concurrent uploads
+        max_in_flight: Maximum bytes being uploaded at once (one larger file may go alone)
+        timeout: Per-upload timeout in seconds
+        callback: Optional callback(uploader, item, status) after each file
+    """
+
+    def __init__(self, api_url, root, fields, index, metadata=None, patterns=('*',), hash_workers=4,
+                 upload_workers=8, max_in_flight=DEFAULT_MAX_IN_FLIGHT, timeout=300, callback=None):
+        self.api_url = api_url
+        self.root = os.path.abspath(root)
+        self.fields = fields
+        self.metadata = metadata or {}
+        self.index = index
+        self.patterns = patterns
+        self.hash_workers = max(1, hash_workers)
+        self.upload_workers = max(1, upload_workers)
+        self.max_in_flight = max_in_flight
+        self.timeout = timeout
+        self.callback = callback
+        self.session = get_session()
+
+        run_key = "\n".join([self.root, json.dumps(self.metadata, sort_keys=True)]
+                            + [f"{k}={fields.get(k)}" for k in sorted(fields)])
+        self.run_id = hashlib.sha256(run_key.encode('utf-8')).hexdigest()[:16]
+        self.counts = {'uploaded': 0, 'duplicate': 0, 'resumed': 0, 'failed': 0}
+        self.bytes_uploaded = 0
+        self.in_flight_bytes = 0
+        # Adaptive limit on concurrent uploads (AIMD)
+        self.concurrency = self.upload_workers
+        self._pause_until = 0.0
+
+        self._ready = deque()
+        self._hashing = {}
+        self._uploading = {}
+        # sha256 -> items with the same content waiting on an upload in progress
+        self._waiting = {}
+
+    def run(self):
+        """Ingest the directory; returns the elapsed time in seconds"""
+        started = time.perf_counter()
+        files = self._candidates()
+        exhausted = False
+        with ThreadPoolExecutor(max_workers=self.hash_workers) as hashers, \
+                ThreadPoolExecutor(max_workers=self.upload_workers) as uploaders:
+            while True:
+                # Hash ahead of the uploads, but not unboundedly far
+                while (not exhausted and len(self._hashing) < self.hash_workers * 2
+                       and len(self._ready) < self.upload_workers * 4):
+                    item = next(files, None)
+                    if item is None:
+                        exhausted = True
+                        break
+                    self._hashing[hashers.submit(hash_file, item.path)] = item
+
+                while self._ready and self._can_start(self._ready[0]):
+                    item = self._ready.popleft()
+                    self.in_flight_bytes += item.size
+                    self._uploading[uploaders.submit(self._upload, item)] = item
+
+                pending = list(self._hashing) + list(self._uploading)
+                if not pending:
+                    if exhausted and not self._ready:
+                        break
+                    # Only paused uploads are left
+                    time.sleep(max(0.05, self._pause_until - time.monotonic()))
+                    continue
+                done, _ = wait(pending, timeout=self._wait_timeout(), return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future in self._hashing:
+                        self._hashed(self._hashing.pop(future), future)
+                    else:
+                        self._uploaded(self._uploading.pop(future), future)
+        self.index.db.commit()
+        return time.perf_counter() - started
+
+    def _candidates(self):
+        for entry in walk_files(self.root, self.patterns):
+            item = _Item(os.path.abspath(entry.path), os.path.relpath(entry.path, self.root))
+            try:
+                stat = entry.stat()
+            except OSError as e:
+                self._fail(item, f"Could not stat file: {e}")
+                continue
+            item.size, item.mtime_ns = stat.st_size, stat.st_mtime_ns
+            if self.index.finished(self.run_id, item.path, item.size, item.mtime_ns):
+                self.counts['resumed'] += 1
+                self._notify(item, 'resumed')
+                continue
+            yield item
+
+    def _can_start(self, item):
+        if time.monotonic() < self._pause_until or len(self._uploading) >= self.concurrency:
+            return False
+        # A file larger than the budget may only go alone
+        return not self._uploading or self.in_flight_bytes + item.size <= self.max_in_flight
+
+    def _wait_timeout(self):
+        if self._ready and not self._uploading:
+            return max(0.05, self._pause_until - time.monotonic())
+        return None
+
+    def _hashed(self, item, future):
+        try:
+            item.sha256 = future.result()
+        except OSError as e:
+            self._fail(item, f"Could not read file: {e}")
+            return
+        patient_id = self.fields.get('patient_id', '')
+        document_id = self.index.lookup(item.sha256, patient_id)
+        if document_id is not None:
+            self._finish(item, 'duplicate', document_id)
+        elif item.sha256 in self._waiting:
+            # Same content as a file being uploaded now; settled when it finishes
+            self._waiting[item.sha256].append(item)
+        else:
+            self._waiting[item.sha256] = []
+            self._ready.append(item)
+
+    def _upload(self, item):
+        """Upload one file (worker thread); returns (status_code, body, sha256, merkle_root)"""
+        delay = self._pause_until - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        fields = dict(self.fields)
+        fields['description'] = fields.get('description') or item.relpath
+        fields['metadata'] = json.dumps(dict(self.metadata, source_path=item.relpath, sha256=item.sha256))
+        with open(item.path, 'rb') as f:
+            encoder = MultipartEncoder(fields, {'file': (os.path.basename(item.path), f)})
+            response = self.session.post(
+                f"{self.api_url}/api/document/upload", data=encoder,
+                headers={'Content-Type': encoder.content_type}, timeout=self.timeout
+            )
+        if response.status_code in THROTTLE_STATUSES:
+            raise _Throttled(response.status_code, _retry_after(response))
+        try:
+            body = response.json()
+        except ValueError:
+            body = {'error': response.text}
+        return response.status_code, body, encoder.digests['file'], encoder.merkle_roots['file']
+
+    def _uploaded(self, item, future):
+        self.in_flight_bytes -= item.size
+        item.attempts += 1
+        try:
+            status_code, body, sha256, merkle_root = future.result()
+        except _Throttled as e:
+            self._throttle(item, e.retry_after)
+            return
+        except Exception as e:
+            self._fail(item, str(e))
+            return
+
+        if not 200 <= status_code < 300:
+            error = body.get('error', body.get('message')) if isinstance(body, dict) else body
+            self._fail(item, f"HTTP {status_code}: {error}")
+            return
+        if sha256 != item.sha256:
+            self._fail(item, "File changed while it was being uploaded")
+            return
+
+        # Additive increase after a success
+        self.concurrency = min(self.upload_workers, self.concurrency + 1)
+        document_id = body.get('document_id')
+        self.index.add(item.sha256, self.fields.get('patient_id', ''), item.size, document_id,
+                       body.get('merkle_root', merkle_root), item.path)
+        self.bytes_uploaded += item.size
+        self._finish(item, 'uploaded', document_id)
+        for duplicate in self._waiting.pop(item.sha256, []):
+            self._finish(duplicate, 'duplicate', document_id)
+
+    def _throttle(self, item, retry_after):
+        # Multiplicative decrease, and a shared pause before the next upload
+        self.concurrency = max(1, self.concurrency // 2)
+        if item.attempts >= MAX_ATTEMPTS:
+            self._fail(item, f"Still throttled after {item.attempts} attempts")
+            return
+        delay = retry_after if retry_after is not None else min(
+            BACKOFF_MAX, BACKOFF_BASE * 2 ** (item.attempts - 1)
+        ) * random.uniform(0.5, 1.0)
+        self._pause_until = max(self._pause_until, time.monotonic() + delay)
+        self._ready.appendleft(item)
+
+    def _fail(self, item, error):
+        self._finish(item, 'failed', error=error)
+        waiting = self._waiting.pop(item.sha256, None) if item.sha256 else None
+        if waiting:
+            # Let the next file with the same content try instead
+            self._waiting[item.sha256] = waiting[1:]
+            self._ready.append(waiting[0])
+
+    def _finish(self, item, status, document_id=None, error=None):
+        self.counts[status] += 1
+        item.document_id = document_id
+        item.error = error
+        self.index.record(self.run_id, item, status, document_id, error)
+        self._notify(item, status)
+
+    def _notify(self, item, status):
+        if self.callback:
+            self.callback(self, item, status)
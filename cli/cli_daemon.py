@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+Warm daemon for ZK Health CLI
+
+Keeps click, rich, every command module and the pooled HTTP session loaded in
+one long-lived process, and runs commands sent by zk_health_client.py over a
+Unix socket. Each request carries the client's argv, environment, working
+directory and its stdin/stdout/stderr file descriptors; the descriptors are
+installed as this process's 0/1/2 while the command runs, so output goes
+straight to the client's terminal or pipes with no copying, and terminal
+detection, colours and widths behave as in a normal run.
+
+Requests run one at a time, because the environment, working directory and
+standard streams are process-wide; concurrent clients wait their turn. The
+daemon exits after ZK_CLI_DAEMON_IDLE seconds (default 900) without requests.
+It is normally started by the client; to run one by hand:
+
+    python cli_daemon.py [SOCKET_PATH]
+"""
+
+import os
+import sys
+import json
+import fcntl
+import signal
+import socket
+import struct
+import threading
+
+CLI_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, CLI_DIR)
+
+import dotenv
+from rich.console import Console
+
+import zk_health_cli
+from zk_health_client import socket_path, HEADER
+# Commands that import these lazily would pay for it on every first use
+import demo  # noqa: F401
+
+IDLE_TIMEOUT = float(os.getenv('ZK_CLI_DAEMON_IDLE', '900'))
+MAX_HEADER = 16 * 1024 * 1024
+
+
+def _interrupt_main():
+    """Deliver SIGINT to the main thread, breaking out of blocking calls"""
+    signal.pthread_kill(threading.main_thread().ident, signal.SIGINT)
+
+
+def _recv_request(conn):
+    """Read one length-prefixed JSON message and any file descriptors sent with it"""
+    data, fds, _, _ = socket.recv_fds(conn, 65536, 3)
+    if len(data) < HEADER.size:
+        raise ValueError("Truncated request")
+    (length,) = HEADER.unpack_from(data)
+    if length > MAX_HEADER:
+        raise ValueError("Request too large")
+    data = data[HEADER.size:]
+    while len(data) < length:
+        chunk = conn.recv(length - len(data))
+        if not chunk:
+            raise ValueError("Truncated request")
+        data += chunk
+    return json.loads(data.decode('utf-8')), fds
+
+
+def _same_user(conn):
+    """Only serve clients running as the daemon's user"""
+    if not hasattr(socket, 'SO_PEERCRED'):
+        return True
+    creds = conn.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize('3i'))
+    _, uid, _ = struct.unpack('3i', creds)
+    return uid == os.getuid()
+
+
+def _cli_consoles():
+    """Module-level rich Consoles of the CLI modules"""
+    for module in list(sys.modules.values()):
+        module_file = getattr(module, '__file__', None) or ''
+        if os.path.dirname(os.path.abspath(module_file)) != CLI_DIR:
+            continue
+        for value in list(vars(module).values()):
+            if isinstance(value, Console):
+                yield value
+
+
+class _Streams:
+    """Installs a client's stdin/stdout/stderr as this process's for one request"""
+
+    def __init__(self, fds):
+        self.fds = list(fds)
+
+    def close_fds(self):
+        while self.fds:
+            os.close(self.fds.pop())
+
+    def __enter__(self):
+        for stream in (sys.stdout, sys.stderr):
+            stream.flush()
+        self.saved_fds = [os.dup(fd) for fd in (0, 1, 2)]
+        self.saved_streams = (sys.stdin, sys.stdout, sys.stderr)
+        try:
+            for target, fd in enumerate(self.fds):
+                os.dup2(fd, target)
+            sys.stdin = open(0, 'r', closefd=False)
+            sys.stdout = open(1, 'w', closefd=False, buffering=1 if os.isatty(1) else -1)
+            sys.stderr = open(2, 'w', closefd=False, buffering=1)
+            # Consoles detect terminal, size and colour support when created
+            for console in _cli_consoles():
+                console.__init__(stderr=console.stderr)
+        except BaseException:
+            self.__exit__()
+            raise
+        return self
+
+    def __exit__(self, *exc):
+        for stream in (sys.stdin, sys.stdout, sys.stderr):
+            if stream in self.saved_streams:
+                continue
+            try:
+                stream.close()
+            except (OSError, ValueError):
+                pass
+        sys.stdin, sys.stdout, sys.stderr = self.saved_streams
+        for target, fd in enumerate(self.saved_fds):
+            os.dup2(fd, target)
+            os.close(fd)
+        self.close_fds()
+        return False
+
+
+class _Environment:
+    """Applies a client's environment and working directory for one request"""
+
+    def __init__(self, env, cwd):
+        self.env = env
+        self.cwd = cwd
+
+    def __enter__(self):
+        self.saved_env = dict(os.environ)
+        self.saved_cwd = os.getcwd()
+        os.environ.clear()
+        os.environ.update(self.env)
+        os.chdir(self.cwd)
+        # As zk_health_cli.py does on start-up
+        dotenv.load_dotenv(os.path.join(CLI_DIR, '.env'))
+        return self
+
+    def __exit__(self, *exc):
+        os.chdir(self.saved_cwd)
+        os.environ.clear()
+        os.environ.update(self.saved_env)
+        return False
+
+
+class _InterruptWatcher:
+    """Raises KeyboardInterrupt in the command when the client sends Ctrl-C or goes away"""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.running = True
+        self.lock = threading.Lock()
+        self.thread = threading.Thread(target=self._watch, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def _watch(self):
+        while True:
+            try:
+                data = self.conn.recv(1)
+            except OSError:
+                data = b''
+            with self.lock:
+                if not self.running:
+                    return
+                if data == b'I' or not data:
+                    _interrupt_main()
+                if not data:
+                    return
+
+    def __exit__(self, *exc):
+        with self.lock:
+            self.running = False
+        return False
+
+
+def run_command(argv):
+    """Run one CLI command in this process; returns its exit code"""
+    try:
+        zk_health_cli.cli.main(args=argv, prog_name='zk_health_cli.py', standalone_mode=True)
+    except SystemExit as e:
+        if e.code is None:
+            return 0
+        if isinstance(e.code, int):
+            return e.code
+        print(e.code, file=sys.stderr)
+        return 1
+    except KeyboardInterrupt:
+        return 130
+    return 0
+
+
+class Daemon:
+    def __init__(self, path):
+        self.path = path
+        self.requests = 0
+        self.running = True
+
+    def serve(self):
+        # One daemon per socket: the lock is held for the daemon's lifetime
+        lock_file = open(f"{self.path}.lock", 'w')
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            return
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        old_umask = os.umask(0o177)
+        try:
+            server.bind(self.path)
+        finally:
+            os.umask(old_umask)
+        server.listen(16)
+        server.settimeout(IDLE_TIMEOUT)
+        # Spawned from a background job, SIGINT may have been inherited as ignored
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+        signal.signal(signal.SIGTERM, self._terminate)
+        try:
+            while self.running:
+                try:
+                    conn, _ = server.accept()
+                except socket.timeout:
+                    break
+                try:
+                    with conn:
+                        conn.settimeout(None)
+                        self.handle(conn)
+                except KeyboardInterrupt:
+                    # A late Ctrl-C from a client whose command already finished
+                    continue
+                except OSError as e:
+                    # e.g. the client went away before its exit code was sent
+                    print(f"Connection error: {e}", file=sys.stderr)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.close()
+            if os.path.exists(self.path):
+                os.unlink(self.path)
+            lock_file.close()
+
+    def _terminate(self, *_):
+        self.running = False
+        raise KeyboardInterrupt
+
+    def handle(self, conn):
+        fds = []
+        try:
+            request, fds = _recv_request(conn)
+            if not _same_user(conn):
+                raise PermissionError("Client runs as a different user")
+        except (OSError, ValueError) as e:
+            for fd in fds:
+                os.close(fd)
+            print(f"Rejected request: {e}", file=sys.stderr)
+            return
+
+        if 'control' in request:
+            self.running = request['control'] != 'stop'
+            conn.sendall(json.dumps({'pid': os.getpid(), 'requests': self.requests}).encode() + b'\n')
+            return
+        if len(fds) != 3:
+            for fd in fds:
+                os.close(fd)
+            conn.sendall(json.dumps({'exit': 1, 'error': 'Missing standard streams'}).encode() + b'\n')
+            return
+
+        self.requests += 1
+        streams = _Streams(fds)
+        try:
+            # Environment first: consoles read NO_COLOR, COLUMNS etc. when they are reset
+            with _Environment(request['env'], request['cwd']), streams:
+                with _InterruptWatcher(conn):
+                    code = run_command(request['argv'])
+        except Exception as e:
+            print(f"Request failed: {e!r}", file=sys.stderr)
+            code = 1
+        finally:
+            streams.close_fds()
+        conn.sendall(json.dumps({'exit': code}).encode() + b'\n')
+
+
+if __name__ == "__main__":
+    Daemon(sys.argv[1] if len(sys.argv) > 1 else socket_path()).serve()
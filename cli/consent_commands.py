@@ -9,10 +9,22 @@ from rich.console import Console
 from rich.table import Table
 from rich.panel import Panel
 
+from pagination import paginate, render_rows, PageError, OUTPUT_FORMATS, DEFAULT_PAGE_SIZE
 from utils import make_api_request, handle_api_error
 
 console = Console()
 
+# (header, getter[, status colors]) for consent list output
+CONSENT_COLUMNS = [
+    ("Consent ID", lambda consent: consent.get('consent_id')),
+    ("Patient ID", lambda consent: consent.get('patient_id')),
+    ("Type", lambda consent: consent.get('consent_type')),
+    ("Status", lambda consent: consent.get('status'),
+     {'pending': 'yellow', 'active': 'green', 'expired': 'dim', 'revoked': 'red'}),
+    ("Created", lambda consent: consent.get('created_at')),
+    ("Expires", lambda consent: consent.get('expiry_date')),
+]
+
 @click.group(name="consent")
 def consent_group():
     """Manage consent agreements"""
@@ -139,7 +151,11 @@ def revoke_consent(consent_id, party_id, zk_proof, reason):
 @click.option('--party-id', help='Filter by party ID (participant)')
 @click.option('--status', type=click.Choice(['pending', 'active', 'expired', 'revoked']), 
               help='Filter by consent status')
-def list_consents(patient_id, party_id, status):
+@click.option('--output', '-o', 'output_format', type=click.Choice(OUTPUT_FORMATS), default='table',
+              show_default=True, help='Output format')
+@click.option('--page-size', type=int, default=DEFAULT_PAGE_SIZE, show_default=True,
+              help='Rows fetched per request')
+def list_consents(patient_id, party_id, status, output_format, page_size):
     """List consent agreements"""
     api_url = os.getenv('API_URL', 'http://localhost:8080')
     
@@ -152,44 +168,10 @@ def list_consents(patient_id, party_id, status):
         if status:
             params['status'] = status
             
-        response = make_api_request(f"{api_url}/api/consent/list", method="GET", params=params)
-        
-        if response.ok:
-            data = response.json()
-            consents = data.get('consents', [])
-            
-            if not consents:
-                console.print("[yellow]No consent agreements found.[/yellow]")
-                return
-                
-            table = Table(show_header=True, header_style="bold blue")
-            table.add_column("Consent ID")
-            table.add_column("Patient ID")
-            table.add_column("Type")
-            table.add_column("Status")
-            table.add_column("Created")
-            table.add_column("Expires")
-            
-            for consent in consents:
-                status_color = {
-                    'pending': 'yellow',
-                    'active': 'green',
-                    'expired': 'dim',
-                    'revoked': 'red'
-                }.get(consent.get('status', ''), 'white')
-                
-                table.add_row(
-                    consent.get('consent_id', 'N/A'),
-                    consent.get('patient_id', 'N/A'),
-                    consent.get('consent_type', 'N/A'),
-                    f"[{status_color}]{consent.get('status', 'N/A')}[/{status_color}]",
-                    consent.get('created_at', 'N/A'),
-                    consent.get('expiry_date', 'N/A')
-                )
-            
-            console.print(table)
-        else:
-            handle_api_error(response)
+        rows = paginate(f"{api_url}/api/consent/list", 'consents', params, page_size)
+        render_rows(rows, CONSENT_COLUMNS, output_format, console, "No consent agreements found.")
+    except PageError as e:
+        handle_api_error(e.response)
     except Exception as e:
         console.print(f"[red]Error: {str(e)}[/red]")
 
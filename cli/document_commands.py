@@ -3,17 +3,34 @@ Document commands for ZK Health CLI
 """
 
 import os
+import sys
 import json
 import click
 from rich.console import Console
 from rich.table import Table
 from rich.panel import Panel
-from rich.progress import Progress
+from rich.progress import Progress, DownloadColumn, TransferSpeedColumn
 
+from pagination import paginate, render_rows, PageError, OUTPUT_FORMATS, DEFAULT_PAGE_SIZE
 from utils import make_api_request, handle_api_error
+from multipart import MultipartEncoder
+from downloads import RangedDownload, DEFAULT_CHUNK_SIZE, DEFAULT_CONNECTIONS
+from hashing import ChunkHasher, ALGORITHMS, DEFAULT_WORKERS
+from merkle import DEFAULT_LEAF_SIZE
+from bulk_upload import BulkUploader, UploadIndex, DEFAULT_INDEX_PATH, DEFAULT_MAX_IN_FLIGHT
 
 console = Console()
 
+# (header, getter) for document list output
+DOCUMENT_COLUMNS = [
+    ("Document ID", lambda doc: doc.get('document_id')),
+    ("Patient ID", lambda doc: doc.get('patient_id')),
+    ("Type", lambda doc: doc.get('doc_type')),
+    ("Description", lambda doc: doc.get('description')),
+    ("Uploaded By", lambda doc: doc.get('uploader_id')),
+    ("Uploaded At", lambda doc: doc.get('uploaded_at')),
+]
+
 @click.group(name="document")
 def document_group():
     """Manage secure medical documents"""
@@ -41,49 +58,148 @@ def upload_document(patient_id, uploader_id, doc_type, description, consent_id,
         if metadata:
             meta_data = json.loads(metadata)
             
-        # Get file size for progress reporting
-        file_size = os.path.getsize(file_path)
+        payload = {
+            'patient_id': patient_id,
+            'uploader_id': uploader_id,
+            'doc_type': doc_type,
+            'description': description,
+            'consent_id': consent_id,
+            'metadata': json.dumps(meta_data),
+            'zk_proof': zk_proof
+        }
         
-        # Prepare multipart form data
+        # Stream the file in chunks; it is hashed in the same pass
         with open(file_path, 'rb') as f:
-            files = {'file': (os.path.basename(file_path), f)}
-            
-            payload = {
-                'patient_id': patient_id,
-                'uploader_id': uploader_id,
-                'doc_type': doc_type,
-                'description': description,
-                'consent_id': consent_id,
-                'metadata': json.dumps(meta_data),
-                'zk_proof': zk_proof
-            }
-            
-            with Progress() as progress:
-                upload_task = progress.add_task("[green]Uploading document...", total=100)
+            with Progress(
+                *Progress.get_default_columns(), DownloadColumn(), TransferSpeedColumn(),
+                console=console
+            ) as progress:
+                upload_task = progress.add_task("[green]Uploading document...", total=None)
                 
-                # Custom callback for upload progress
                 def upload_progress(monitor):
-                    progress.update(upload_task, completed=int(100 * monitor.bytes_read / file_size))
+                    progress.update(upload_task, completed=monitor.bytes_read, total=monitor.len)
                 
+                encoder = MultipartEncoder(
+                    fields=payload,
+                    files={'file': (os.path.basename(file_path), f)},
+                    callback=upload_progress
+                )
                 response = make_api_request(
                     f"{api_url}/api/document/upload", 
                     method="POST", 
-                    data=payload,
-                    files=files,
-                    progress_callback=upload_progress
+                    data=encoder,
+                    headers={'Content-Type': encoder.content_type}
                 )
             
+            local_hash = encoder.digests['file']
+            local_root = encoder.merkle_roots['file']
+            
             if response.ok:
                 data = response.json()
                 console.print(f"[green]Document uploaded successfully![/green]")
                 console.print(f"Document ID: {data.get('document_id', 'N/A')}")
                 console.print(f"Merkle Root: {data.get('merkle_root', 'N/A')}")
                 console.print(f"File Hash: {data.get('file_hash', 'N/A')}")
+                console.print(f"Local SHA-256: {local_hash}")
+                console.print(f"Local Merkle Root: {local_root}")
+                if data.get('file_hash') and data['file_hash'] != local_hash:
+                    console.print("[yellow]Warning: server file hash does not match the local SHA-256[/yellow]")
+                if data.get('merkle_root') and data['merkle_root'] != local_root:
+                    console.print("[yellow]Warning: server Merkle root does not match the local Merkle root[/yellow]")
+                elif data.get('merkle_root'):
+                    console.print("[green]✓ Server Merkle root matches the uploaded file[/green]")
             else:
                 handle_api_error(response)
     except Exception as e:
         console.print(f"[red]Error: {str(e)}[/red]")
 
+@document_group.command(name="upload-dir")
+@click.argument('directory', type=click.Path(exists=True, file_okay=False))
+@click.option('--patient-id', required=True, help='ID of the patient the documents belong to')
+@click.option('--uploader-id', required=True, help='ID of the party uploading the documents')
+@click.option('--doc-type', required=True, 
+              type=click.Choice(['medical_record', 'lab_result', 'prescription', 'image', 'scan']),
+              help='Type of the documents')
+@click.option('--consent-id', required=True, help='ID of the consent agreement authorizing the uploads')
+@click.option('--zk-proof', required=True, help='ZK proof of the uploader')
+@click.option('--description', help='Description for every document (default: its relative path)')
+@click.option('--metadata', help='Additional metadata as JSON string')
+@click.option('--pattern', multiple=True, default=('*',), show_default=True,
+              help='Filename glob to include (repeatable)')
+@click.option('--workers', type=int, default=8, show_default=True, help='Maximum concurrent uploads')
+@click.option('--hash-workers', type=int, default=4, show_default=True, help='Files hashed concurrently')
+@click.option('--max-in-flight', type=int, default=DEFAULT_MAX_IN_FLIGHT // (1024 * 1024), show_default=True,
+              help='Maximum MiB being uploaded at once')
+@click.option('--index', 'index_path', default=DEFAULT_INDEX_PATH, show_default=True,
+              help='SQLite upload index and manifest')
+@click.option('--restart', is_flag=True, help='Ignore the manifest of an earlier run of this command')
+def upload_directory(directory, patient_id, uploader_id, doc_type, consent_id, zk_proof, description,
+                     metadata, pattern, workers, hash_workers, max_in_flight, index_path, restart):
+    """Upload every file in a directory tree, skipping content already uploaded
+    
+    Running the same command again resumes an interrupted run.
+    """
+    api_url = os.getenv('API_URL', 'http://localhost:8080')
+    
+    try:
+        meta_data = json.loads(metadata) if metadata else {}
+        fields = {
+            'patient_id': patient_id,
+            'uploader_id': uploader_id,
+            'doc_type': doc_type,
+            'description': description,
+            'consent_id': consent_id,
+            'zk_proof': zk_proof
+        }
+        index = UploadIndex(index_path)
+    except Exception as e:
+        console.print(f"[red]Error: {str(e)}[/red]")
+        sys.exit(1)
+    
+    try:
+        with Progress(
+            *Progress.get_default_columns()[:1], DownloadColumn(), TransferSpeedColumn(),
+            console=console
+        ) as progress:
+            task = progress.add_task("[green]Uploading documents...", total=None)
+            
+            def on_file(uploader, item, status):
+                if status == 'failed':
+                    progress.console.print(f"[red]✗ {item.relpath}: {item.error}[/red]")
+                counts = uploader.counts
+                progress.update(
+                    task, completed=uploader.bytes_uploaded,
+                    description=(f"[green]{counts['uploaded']} uploaded, {counts['duplicate']} duplicate, "
+                                 f"{counts['resumed']} resumed, {counts['failed']} failed")
+                )
+            
+            uploader = BulkUploader(
+                api_url, directory, fields, index, metadata=meta_data, patterns=pattern,
+                hash_workers=hash_workers, upload_workers=workers,
+                max_in_flight=max_in_flight * 1024 * 1024, callback=on_file
+            )
+            if restart:
+                index.reset(uploader.run_id)
+            elapsed = uploader.run()
+    except KeyboardInterrupt:
+        console.print("[yellow]Interrupted; run the same command again to resume[/yellow]")
+        sys.exit(130)
+    except Exception as e:
+        console.print(f"[red]Error: {str(e)}[/red]")
+        sys.exit(1)
+    finally:
+        index.close()
+    
+    counts = uploader.counts
+    console.print(
+        f"[bold]{sum(counts.values())}[/bold] files in {elapsed:.2f}s: "
+        f"[green]{counts['uploaded']} uploaded[/green] ({uploader.bytes_uploaded / (1024 * 1024):.1f} MiB), "
+        f"{counts['duplicate']} already uploaded, {counts['resumed']} done in an earlier run, "
+        f"[red]{counts['failed']} failed[/red]"
+    )
+    if counts['failed']:
+        sys.exit(1)
+
 @document_group.command(name="verify")
 @click.option('--document-id', required=True, help='ID of the document to verify')
 def verify_document(document_id):
@@ -113,7 +229,11 @@ def verify_document(document_id):
 @click.option('--patient-id', help='Filter by patient ID')
 @click.option('--doc-type', help='Filter by document type')
 @click.option('--uploader-id', help='Filter by uploader ID')
-def list_documents(patient_id, doc_type, uploader_id):
+@click.option('--output', '-o', 'output_format', type=click.Choice(OUTPUT_FORMATS), default='table',
+              show_default=True, help='Output format')
+@click.option('--page-size', type=int, default=DEFAULT_PAGE_SIZE, show_default=True,
+              help='Rows fetched per request')
+def list_documents(patient_id, doc_type, uploader_id, output_format, page_size):
     """List documents in the archive"""
     api_url = os.getenv('API_URL', 'http://localhost:8080')
     
@@ -126,37 +246,10 @@ def list_documents(patient_id, doc_type, uploader_id):
         if uploader_id:
             params['uploader_id'] = uploader_id
             
-        response = make_api_request(f"{api_url}/api/document/list", method="GET", params=params)
-        
-        if response.ok:
-            data = response.json()
-            documents = data.get('documents', [])
-            
-            if not documents:
-                console.print("[yellow]No documents found.[/yellow]")
-                return
-                
-            table = Table(show_header=True, header_style="bold blue")
-            table.add_column("Document ID")
-            table.add_column("Patient ID")
-            table.add_column("Type")
-            table.add_column("Description")
-            table.add_column("Uploaded By")
-            table.add_column("Uploaded At")
-            
-            for doc in documents:
-                table.add_row(
-                    doc.get('document_id', 'N/A'),
-                    doc.get('patient_id', 'N/A'),
-                    doc.get('doc_type', 'N/A'),
-                    doc.get('description', 'N/A'),
-                    doc.get('uploader_id', 'N/A'),
-                    doc.get('uploaded_at', 'N/A')
-                )
-            
-            console.print(table)
-        else:
-            handle_api_error(response)
+        rows = paginate(f"{api_url}/api/document/list", 'documents', params, page_size)
+        render_rows(rows, DOCUMENT_COLUMNS, output_format, console, "No documents found.")
+    except PageError as e:
+        handle_api_error(e.response)
     except Exception as e:
         console.print(f"[red]Error: {str(e)}[/red]")
 
@@ -204,8 +297,18 @@ def get_document(document_id):
 @click.option('--zk-proof', required=True, help='ZK proof of the requester')
 @click.option('--output-dir', required=True, type=click.Path(exists=True), 
               help='Directory to save the downloaded file')
-def download_document(document_id, requester_id, zk_proof, output_dir):
-    """Download a document from the archive"""
+@click.option('--connections', type=int, default=DEFAULT_CONNECTIONS, show_default=True,
+              help='Parallel range requests')
+@click.option('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE // (1024 * 1024), show_default=True,
+              help='Range chunk size in MiB')
+def download_document(document_id, requester_id, zk_proof, output_dir, connections, chunk_size):
+    """Download a document from the archive
+    
+    Large documents are fetched in parallel ranges; an interrupted download
+    resumes when the same command is run again. The file hash and Merkle root
+    are computed while downloading and checked against the document record,
+    which takes one metadata request after the download.
+    """
     api_url = os.getenv('API_URL', 'http://localhost:8080')
     
     try:
@@ -214,51 +317,79 @@ def download_document(document_id, requester_id, zk_proof, output_dir):
             'zk_proof': zk_proof
         }
         
-        with Progress() as progress:
-            download_task = progress.add_task("[green]Downloading document...", total=100)
+        with Progress(
+            *Progress.get_default_columns(), DownloadColumn(), TransferSpeedColumn(),
+            console=console
+        ) as progress:
+            download_task = progress.add_task("[green]Downloading document...", total=None)
             
-            # Custom callback for download progress
-            def download_progress(monitor):
-                if monitor.total_bytes:
-                    progress.update(download_task, completed=int(100 * monitor.bytes_read / monitor.total_bytes))
+            def download_progress(bytes_done, total_bytes):
+                progress.update(download_task, completed=bytes_done, total=total_bytes)
             
-            response = make_api_request(
-                f"{api_url}/api/document/{document_id}/download", 
-                method="GET", 
+            download = RangedDownload(
+                f"{api_url}/api/document/{document_id}/download",
+                output_dir,
                 params=params,
-                stream=True,
-                progress_callback=download_progress
+                connections=connections,
+                chunk_size=chunk_size * 1024 * 1024,
+                progress=download_progress
             )
+            result = download.run()
         
-        if response.ok:
-            # Get filename from Content-Disposition header
-            content_disposition = response.headers.get('Content-Disposition', '')
-            filename = 'downloaded_file'
-            if 'filename=' in content_disposition:
-                filename = content_disposition.split('filename=')[1].strip('"')
-            
-            output_path = os.path.join(output_dir, filename)
-            
-            # Save the file
-            with open(output_path, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    if chunk:
-                        f.write(chunk)
-            
-            console.print(f"[green]Document downloaded successfully![/green]")
-            console.print(f"Saved to: {output_path}")
-            
-            # Verify the downloaded file
-            console.print("[yellow]Verifying document integrity...[/yellow]")
-            
+        if 'response' in result:
+            handle_api_error(result['response'])
+            return
+        
+        console.print(f"[green]Document downloaded successfully![/green]")
+        console.print(f"Saved to: {result['path']}")
+        if result['resumed_bytes']:
+            console.print(f"Resumed: {result['resumed_bytes']} bytes were already on disk")
+        console.print(f"SHA-256: {result['sha256']}")
+        console.print(f"Merkle Root: {result['merkle_root']}")
+        
+        # Verify locally against the archived hash and root (both computed while downloading);
+        # the archived values come from the document record, one metadata request
+        console.print("[yellow]Verifying document integrity...[/yellow]")
+        
+        doc_response = make_api_request(f"{api_url}/api/document/{document_id}", method="GET")
+        doc = doc_response.json() if doc_response.ok else {}
+        expected = {'file hash': doc.get('file_hash'), 'Merkle root': doc.get('merkle_root')}
+        actual = {'file hash': result['sha256'], 'Merkle root': result['merkle_root']}
+        
+        mismatched = [name for name, value in expected.items() if value and value != actual[name]]
+        if mismatched:
+            console.print(f"[red]⚠ Warning: Downloaded document does not match the archived {' and '.join(mismatched)}![/red]")
+        elif any(expected.values()):
+            checked = ' and '.join(name for name, value in expected.items() if value)
+            console.print(f"[green]✓ Downloaded document matches the archived {checked}![/green]")
+        else:
             verify_response = make_api_request(f"{api_url}/api/document/{document_id}/verify", method="GET")
             
             if verify_response.ok and verify_response.json().get('verified', False):
                 console.print(f"[green]✓ Downloaded document integrity verified![/green]")
             else:
                 console.print(f"[red]⚠ Warning: Could not verify document integrity![/red]")
-        else:
-            handle_api_error(response)
+    except Exception as e:
+        console.print(f"[red]Error: {str(e)}[/red]")
+
+@document_group.command(name="hash")
+@click.argument('file_path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--algorithm', type=click.Choice(ALGORITHMS), default='sha256', show_default=True,
+              help='Hash algorithm (only sha256 roots match the archive)')
+@click.option('--leaf-size', type=int, default=DEFAULT_LEAF_SIZE // 1024, show_default=True,
+              help='Merkle leaf size in KiB')
+@click.option('--workers', type=int, default=DEFAULT_WORKERS, show_default=True,
+              help='Hashing workers')
+@click.option('--processes', is_flag=True, help='Hash in worker processes instead of threads')
+def hash_document(file_path, algorithm, leaf_size, workers, processes):
+    """Compute a local file's Merkle root on all cores"""
+    try:
+        hasher = ChunkHasher(algorithm, leaf_size * 1024, workers, use_processes=processes)
+        result = hasher.hash_file(file_path)
+        console.print(f"File: {file_path}")
+        console.print(f"Size: {result.size} bytes ({len(result.leaves)} leaves)")
+        console.print(f"Merkle Root ({algorithm}): {result.root}")
+        console.print(f"Hashed in {result.elapsed:.3f}s ({result.throughput / 1e9:.2f} GB/s, {hasher.workers} workers)")
     except Exception as e:
         console.print(f"[red]Error: {str(e)}[/red]")
 
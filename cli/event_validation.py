@@ -0,0 +1,244 @@
+"""
+Bulk oracle event validation for ZK Health CLI
+
+Streams a JSONL file of execution events and validates them concurrently
+against /api/oracle/validate, writing one NDJSON result per event in
+completion order. Each input line is an event object:
+
+    {"event_id": "e1", "event_type": "...", "agreement_id": "...",
+     "clause_ids": ["c1", "c2"], "signer_id": "...", "zk_proof": "...", "context": {...}}
+
+agreement_id, signer_id and zk_proof may be left out when defaults are given.
+
+Progress is checkpointed to a small JSON file: the byte offset of the first
+line not yet finished, plus the finished lines after it (at most the number
+of events in flight). A resumed run seeks to that offset and skips those
+lines, so each event is validated once; a crash between writing a result and
+saving the checkpoint can repeat at most the results written since the last
+checkpoint.
+"""
+
+import os
+import json
+import time
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from utils import get_session
+
+# Seconds between checkpoint writes
+CHECKPOINT_INTERVAL = 1.0
+
+# Latencies kept for the live percentiles
+LATENCY_WINDOW = 1000
+
+
+class EventError(Exception):
+    """An input line that is not a valid event"""
+
+
+def build_payload(event, defaults):
+    """Validation request body for one event"""
+    if not isinstance(event, dict):
+        raise EventError("Line must be a JSON object")
+    payload = dict(defaults)
+    payload.update({key: value for key, value in event.items() if value is not None})
+    clause_ids = payload.get('clause_ids')
+    if isinstance(clause_ids, str):
+        payload['clause_ids'] = [clause_id.strip() for clause_id in clause_ids.split(',') if clause_id.strip()]
+    missing = [field for field in ('event_id', 'event_type', 'agreement_id', 'clause_ids', 'signer_id', 'zk_proof')
+               if not payload.get(field)]
+    if missing:
+        raise EventError(f"Missing fields: {', '.join(missing)}")
+    payload.setdefault('context', {})
+    return payload
+
+
+class Checkpoint:
+    """Resume position in the input file"""
+
+    def __init__(self, path, input_path):
+        self.path = path
+        self.input_path = os.path.abspath(input_path)
+        self.offset = 0
+        self.line = 0
+        self.done_after = set()
+        self._saved_at = 0.0
+
+    def load(self):
+        """Restore the last saved position; returns False when there is none for this input"""
+        try:
+            with open(self.path) as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if state.get('input') != self.input_path:
+            return False
+        self.offset = state.get('offset', 0)
+        self.line = state.get('line', 0)
+        self.done_after = set(state.get('done_after', []))
+        return True
+
+    def save(self, offset, line, done_after, force=False):
+        now = time.monotonic()
+        if not force and now - self._saved_at < CHECKPOINT_INTERVAL:
+            return
+        self._saved_at = now
+        state = {'input': self.input_path, 'offset': offset, 'line': line, 'done_after': sorted(done_after)}
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, 'w') as f:
+            json.dump(state, f)
+        os.replace(temp_path, self.path)
+
+    def remove(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class EventValidationRunner:
+    """
+    Validates events from a JSONL file over a bounded pool of workers
+
+    Args:
+        api_url: API base URL
+        defaults: Fields applied to events that lack them
+        workers: Requests in flight at once
+        timeout: Per-request timeout in seconds
+        checkpoint: Optional Checkpoint to resume from and update
+        callback: Optional callback(runner) after each event
+    """
+
+    def __init__(self, api_url, defaults=None, workers=16, timeout=30.0, checkpoint=None, callback=None):
+        self.api_url = api_url
+        self.defaults = defaults or {}
+        self.workers = max(1, workers)
+        self.timeout = timeout
+        self.checkpoint = checkpoint
+        self.callback = callback
+        self.max_pending = self.workers * 4
+        self.session = get_session()
+
+        self.counts = {'valid': 0, 'invalid': 0, 'error': 0}
+        self.skipped = 0
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.started = None
+        self._lock = threading.Lock()
+
+        # line number -> offset after that line, for lines read but not yet finished
+        self._pending = {}
+        self._done = set()
+        self._watermark = (0, 0)
+
+    @property
+    def completed(self):
+        return sum(self.counts.values())
+
+    def rate(self):
+        """Events finished per second in this run"""
+        elapsed = time.perf_counter() - self.started if self.started else 0
+        return self.completed / elapsed if elapsed else 0.0
+
+    def latency_percentiles(self):
+        """(p50, p95) latency in ms over the recent window, or (None, None)"""
+        with self._lock:
+            window = sorted(self.latencies)
+        if not window:
+            return None, None
+        return window[len(window) // 2], window[min(len(window) - 1, int(len(window) * 0.95))]
+
+    def run(self, input_path, emit):
+        """Validate every event in input_path, passing each result record to emit"""
+        self.started = time.perf_counter()
+        offset, line_number, skip = 0, 0, set()
+        if self.checkpoint and self.checkpoint.load():
+            offset, line_number, skip = self.checkpoint.offset, self.checkpoint.line, self.checkpoint.done_after
+        self._watermark = (line_number, offset)
+
+        running = {}
+        with open(input_path, 'rb') as f, ThreadPoolExecutor(max_workers=self.workers) as executor:
+            f.seek(offset)
+            try:
+                for raw in iter(f.readline, b''):
+                    line_number += 1
+                    offset += len(raw)
+                    self._pending[line_number] = offset
+                    if line_number in skip or not raw.strip():
+                        if line_number in skip:
+                            self.skipped += 1
+                        self._mark_done(line_number)
+                        continue
+
+                    while len(running) >= self.max_pending:
+                        self._drain(running, emit, block=True)
+                    running[executor.submit(self._validate, line_number, raw)] = line_number
+                    self._drain(running, emit, block=False)
+
+                while running:
+                    self._drain(running, emit, block=True)
+            finally:
+                if self.checkpoint:
+                    self._save_checkpoint(force=True)
+        if self.checkpoint:
+            self.checkpoint.remove()
+        return time.perf_counter() - self.started
+
+    def _validate(self, line_number, raw):
+        started = time.perf_counter()
+        record = {'line': line_number}
+        try:
+            event = json.loads(raw)
+            payload = build_payload(event, self.defaults)
+            record['event_id'] = payload['event_id']
+            response = self.session.post(f"{self.api_url}/api/oracle/validate", json=payload, timeout=self.timeout)
+            record['http_status'] = response.status_code
+            try:
+                body = response.json()
+            except ValueError:
+                body = response.text
+            if response.ok and isinstance(body, dict):
+                record['status'] = 'valid' if body.get('valid', False) else 'invalid'
+                record['result'] = body
+            else:
+                record['status'] = 'error'
+                record['error'] = body.get('error', body.get('message')) if isinstance(body, dict) else body
+        except (ValueError, EventError) as e:
+            record['status'] = 'error'
+            record['error'] = f"Invalid line: {e}"
+        except Exception as e:
+            record['status'] = 'error'
+            record['error'] = str(e)
+        record['elapsed_ms'] = round((time.perf_counter() - started) * 1000, 2)
+        return record
+
+    def _drain(self, running, emit, block):
+        if not running:
+            return
+        done, _ = wait(list(running), timeout=None if block else 0, return_when=FIRST_COMPLETED)
+        for future in done:
+            line_number = running.pop(future)
+            record = future.result()
+            emit(record)
+            self.counts[record['status']] += 1
+            if 'http_status' in record:
+                with self._lock:
+                    self.latencies.append(record['elapsed_ms'])
+            self._mark_done(line_number)
+            if self.callback:
+                self.callback(self)
+        if done and self.checkpoint:
+            self._save_checkpoint()
+
+    def _mark_done(self, line_number):
+        self._done.add(line_number)
+        # Advance the watermark over the contiguous run of finished lines
+        line, offset = self._watermark
+        while line + 1 in self._done:
+            line += 1
+            self._done.discard(line)
+            offset = self._pending.pop(line)
+        self._watermark = (line, offset)
+
+    def _save_checkpoint(self, force=False):
+        line, offset = self._watermark
+        self.checkpoint.save(offset, line, self._done, force=force)
@@ -0,0 +1,259 @@
+"""
+Parallel chunk hashing for ZK Health CLI
+
+A single SHA-256 over a file is inherently sequential, but the leaves of the
+document Merkle tree are independent, so they can be hashed on several cores
+at once. hashlib releases the GIL while hashing large buffers, so a thread
+pool over memory-mapped leaves scales across cores without copying; a process
+pool is available for interpreters where that does not hold. Leaf hashes are
+combined in order with MerkleBuilder, so roots are identical to the serial
+(and, for SHA-256, the Go) implementation.
+"""
+
+import os
+import math
+import mmap
+import time
+import hashlib
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+from merkle import MerkleBuilder, merkle_root, DEFAULT_LEAF_SIZE
+
+ALGORITHMS = ('sha256', 'blake2b')
+DEFAULT_WORKERS = os.cpu_count() or 1
+
+# Bytes of a file mapped at once; rounded to whole leaves
+MAP_WINDOW = 256 * 1024 * 1024
+
+# Leaves hashed per task in a process pool, to amortize pickling and IPC
+PROCESS_BATCH = 16
+
+
+def _hash_leaf(algorithm, data):
+    return hashlib.new(algorithm, data).hexdigest()
+
+
+def _hash_range(path, algorithm, offset, length, leaf_size):
+    """Leaf hashes of one range of a file (process pool task)"""
+    with open(path, 'rb') as f:
+        granularity = mmap.ALLOCATIONGRANULARITY
+        start = offset - offset % granularity
+        with mmap.mmap(f.fileno(), length + offset - start, offset=start,
+                       access=mmap.ACCESS_READ) as mapped:
+            view = memoryview(mapped)
+            try:
+                base = offset - start
+                return [
+                    _hash_leaf(algorithm, view[base + i:base + min(i + leaf_size, length)])
+                    for i in range(0, length, leaf_size)
+                ]
+            finally:
+                view.release()
+
+
+class FileDigest:
+    """Result of hashing one file"""
+
+    def __init__(self, path, size, algorithm, leaf_size, leaves, root, elapsed):
+        self.path = path
+        self.size = size
+        self.algorithm = algorithm
+        self.leaf_size = leaf_size
+        self.leaves = leaves
+        self.root = root
+        self.elapsed = elapsed
+
+    @property
+    def throughput(self):
+        """Hashing speed in bytes per second"""
+        return self.size / self.elapsed if self.elapsed else 0.0
+
+    def to_dict(self):
+        return {
+            'path': self.path,
+            'size': self.size,
+            'algorithm': self.algorithm,
+            'leaf_size': self.leaf_size,
+            'leaf_count': len(self.leaves),
+            'merkle_root': self.root,
+            'elapsed': self.elapsed
+        }
+
+
+class ChunkHasher:
+    """
+    Hashes fixed-size leaves of files on a pool of workers
+
+    Args:
+        algorithm: hashlib algorithm for the leaves and nodes (sha256 or blake2b)
+        leaf_size: Bytes per leaf
+        workers: Concurrent hashing workers (default: one per core)
+        use_processes: Hash in worker processes instead of threads
+    """
+
+    def __init__(self, algorithm='sha256', leaf_size=DEFAULT_LEAF_SIZE, workers=None,
+                 use_processes=False):
+        if algorithm not in ALGORITHMS:
+            raise ValueError(f"Unsupported hash algorithm '{algorithm}' (use one of {', '.join(ALGORITHMS)})")
+        self.algorithm = algorithm
+        self.leaf_size = leaf_size
+        self.workers = max(1, workers or DEFAULT_WORKERS)
+        self.use_processes = use_processes
+
+    def _window(self):
+        # Whole leaves, and a multiple of the mmap offset granularity
+        granularity = mmap.ALLOCATIONGRANULARITY
+        unit = self.leaf_size * granularity // math.gcd(self.leaf_size, granularity)
+        return max(unit, MAP_WINDOW - MAP_WINDOW % unit)
+
+    def hash_file(self, path):
+        """
+        Hash a file's leaves in parallel
+
+        Returns:
+            FileDigest with the leaf hashes and Merkle root
+        """
+        started = time.perf_counter()
+        size = os.path.getsize(path)
+        if self.use_processes:
+            leaves = self._hash_file_processes(path, size)
+        else:
+            leaves = self._hash_file_threads(path, size)
+        root = merkle_root(leaves, self.algorithm)
+        return FileDigest(path, size, self.algorithm, self.leaf_size, leaves, root,
+                          time.perf_counter() - started)
+
+    def _hash_file_threads(self, path, size):
+        leaves = []
+        if size == 0:
+            return leaves
+        window = self._window()
+        with open(path, 'rb') as f, ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for window_offset in range(0, size, window):
+                length = min(window, size - window_offset)
+                with mmap.mmap(f.fileno(), length, offset=window_offset, access=mmap.ACCESS_READ) as mapped:
+                    view = memoryview(mapped)
+                    slices = [view[i:i + self.leaf_size] for i in range(0, length, self.leaf_size)]
+                    try:
+                        leaves.extend(executor.map(_hash_leaf, [self.algorithm] * len(slices), slices))
+                    finally:
+                        # The map cannot be closed while views of it exist
+                        for piece in slices:
+                            piece.release()
+                        view.release()
+        return leaves
+
+    def _hash_file_processes(self, path, size):
+        batch = self.leaf_size * PROCESS_BATCH
+        ranges = [(offset, min(batch, size - offset)) for offset in range(0, size, batch)]
+        leaves = []
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            futures = [
+                executor.submit(_hash_range, path, self.algorithm, offset, length, self.leaf_size)
+                for offset, length in ranges
+            ]
+            for future in futures:
+                leaves.extend(future.result())
+        return leaves
+
+    def hash_file_serial(self, path):
+        """Hash a file's leaves on the calling thread (the baseline for benchmarks)"""
+        started = time.perf_counter()
+        tree = MerkleBuilder(self.leaf_size, algorithm=self.algorithm)
+        size = 0
+        with open(path, 'rb') as f:
+            while True:
+                chunk = f.read(self.leaf_size)
+                if not chunk:
+                    break
+                tree.update(chunk)
+                size += len(chunk)
+        return FileDigest(path, size, self.algorithm, self.leaf_size, tree.all_leaves(), tree.root(),
+                          time.perf_counter() - started)
+
+    def stream(self):
+        """LeafStream hashing data as it is produced, e.g. while it is sent"""
+        return LeafStream(self)
+
+
+class LeafStream:
+    """
+    Merkle tree of a byte stream with its leaves hashed in the background
+
+    update() cuts the data into leaves and hands complete ones to a thread
+    pool, so the producer (e.g. the upload's send loop) only copies partial
+    leaves. At most two leaves per worker are in flight, which bounds memory.
+    Call root() once all data has been added; it waits for the workers.
+    """
+
+    def __init__(self, hasher):
+        self.algorithm = hasher.algorithm
+        self.leaf_size = hasher.leaf_size
+        self._executor = ThreadPoolExecutor(max_workers=hasher.workers)
+        self._slots = threading.BoundedSemaphore(hasher.workers * 2)
+        self._futures = deque()
+        self._tree = MerkleBuilder(self.leaf_size, keep_leaves=False, algorithm=self.algorithm)
+        self._partial = bytearray()
+        self._root = None
+        self._closed = False
+
+    def update(self, data):
+        """Add the next bytes of the data"""
+        if self._closed:
+            raise ValueError("Merkle root already computed")
+        view = memoryview(data)
+        if self._partial:
+            take = min(len(view), self.leaf_size - len(self._partial))
+            self._partial += view[:take]
+            view = view[take:]
+            if len(self._partial) == self.leaf_size:
+                self._submit(bytes(self._partial))
+                self._partial = bytearray()
+        while len(view) >= self.leaf_size:
+            # The slice keeps data alive until the leaf is hashed; no copy
+            self._submit(view[:self.leaf_size])
+            view = view[self.leaf_size:]
+        if len(view):
+            self._partial += view
+
+    def _submit(self, leaf):
+        self._slots.acquire()
+        try:
+            future = self._executor.submit(_hash_leaf, self.algorithm, leaf)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        self._futures.append(future)
+        # Fold finished leaves into the tree, in order
+        while self._futures and self._futures[0].done():
+            self._tree.add_leaf_hash(self._futures.popleft().result())
+
+    def root(self):
+        """
+        Merkle root of all data added (ends the stream)
+
+        Returns:
+            Hex root hash, or None when no data was added
+        """
+        if not self._closed:
+            self._closed = True
+            try:
+                while self._futures:
+                    self._tree.add_leaf_hash(self._futures.popleft().result())
+                if self._partial:
+                    self._tree.add_leaf_hash(_hash_leaf(self.algorithm, bytes(self._partial)))
+                    self._partial = bytearray()
+                self._root = self._tree.root()
+            finally:
+                self._executor.shutdown(wait=True)
+        return self._root
+
+    def close(self):
+        """Stop the workers without computing the root"""
+        self._closed = True
+        for future in self._futures:
+            future.cancel()
+        self._executor.shutdown(wait=True)
@@ -6,12 +6,20 @@ import os
 import json
 import click
 from rich.console import Console
-from rich.table import Table
 
+from pagination import paginate, render_rows, PageError, OUTPUT_FORMATS, DEFAULT_PAGE_SIZE
 from utils import make_api_request, handle_api_error
 
 console = Console()
 
+# (header, getter) for identity list output
+IDENTITY_COLUMNS = [
+    ("Party ID", lambda identity: identity.get('party_id')),
+    ("Claim", lambda identity: identity.get('claim')),
+    ("Name", lambda identity: (identity.get('metadata') or {}).get('name')),
+    ("Created At", lambda identity: identity.get('created_at')),
+]
+
 @click.group(name="identity")
 def identity_group():
     """Manage ZK Identities"""
@@ -82,7 +90,11 @@ def verify_identity(party_id, zk_proof):
 
 @identity_group.command(name="list")
 @click.option('--claim', help='Filter by claim type')
-def list_identities(claim):
+@click.option('--output', '-o', 'output_format', type=click.Choice(OUTPUT_FORMATS), default='table',
+              show_default=True, help='Output format')
+@click.option('--page-size', type=int, default=DEFAULT_PAGE_SIZE, show_default=True,
+              help='Rows fetched per request')
+def list_identities(claim, output_format, page_size):
     """List registered identities"""
     api_url = os.getenv('API_URL', 'http://localhost:8080')
     
@@ -91,35 +103,10 @@ def list_identities(claim):
         if claim:
             params['claim'] = claim
             
-        response = make_api_request(f"{api_url}/api/identity/list", method="GET", params=params)
-        
-        if response.ok:
-            data = response.json()
-            identities = data.get('identities', [])
-            
-            if not identities:
-                console.print("[yellow]No identities found.[/yellow]")
-                return
-                
-            table = Table(show_header=True, header_style="bold blue")
-            table.add_column("Party ID")
-            table.add_column("Claim")
-            table.add_column("Name")
-            table.add_column("Created At")
-            
-            for identity in identities:
-                metadata = identity.get('metadata', {})
-                name = metadata.get('name', 'N/A')
-                table.add_row(
-                    identity.get('party_id', 'N/A'),
-                    identity.get('claim', 'N/A'),
-                    name,
-                    identity.get('created_at', 'N/A')
-                )
-            
-            console.print(table)
-        else:
-            handle_api_error(response)
+        rows = paginate(f"{api_url}/api/identity/list", 'identities', params, page_size)
+        render_rows(rows, IDENTITY_COLUMNS, output_format, console, "No identities found.")
+    except PageError as e:
+        handle_api_error(e.response)
     except Exception as e:
         console.print(f"[red]Error: {str(e)}[/red]")
 
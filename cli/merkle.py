@@ -0,0 +1,141 @@
+"""
+Merkle trees compatible with pkg/merkletree for ZK Health CLI
+
+Hashes match the Go implementation exactly: a leaf is the hex SHA-256 of its
+data, and a parent is the hex SHA-256 of the concatenated hex strings of its
+children. NewMerkleTree duplicates the last leaf when the leaf count is odd
+(and above one), then promotes the last node of any odd level unchanged.
+
+For documents the leaves are fixed-size chunks of the file (DEFAULT_LEAF_SIZE
+unless the server says otherwise), so a tree can be built while the file is
+streamed, without a second pass. Any hashlib algorithm can replace SHA-256
+for local use (e.g. blake2b); only SHA-256 trees match the server.
+"""
+
+import hashlib
+
+DEFAULT_LEAF_SIZE = 1024 * 1024
+
+
+def leaf_hash(data, algorithm='sha256'):
+    """Hex SHA-256 of a leaf's data (sha256Hash(item) in Go)"""
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    return hashlib.new(algorithm, data).hexdigest()
+
+
+def node_hash(left, right, algorithm='sha256'):
+    """Hex SHA-256 of two child hashes (sha256Hash(left.Hash + right.Hash) in Go)"""
+    return hashlib.new(algorithm, (left + right).encode('ascii')).hexdigest()
+
+
+class MerkleBuilder:
+    """
+    Incremental equivalent of merkletree.NewMerkleTree over fixed-size leaves
+
+    Feed the data in pieces of any size with update(); it is cut into
+    ``leaf_size`` leaves as it arrives. Only one pending node per tree level is
+    kept (plus the leaf hashes when ``keep_leaves`` is set), so memory is
+    O(log n) in the data size.
+    """
+
+    def __init__(self, leaf_size=DEFAULT_LEAF_SIZE, keep_leaves=True, algorithm='sha256'):
+        self.leaf_size = leaf_size
+        self.keep_leaves = keep_leaves
+        self.algorithm = algorithm
+        self.leaves = []
+        self.leaf_count = 0
+        self._levels = []
+        self._last_leaf = None
+        self._leaf = hashlib.new(algorithm)
+        self._leaf_bytes = 0
+
+    def update(self, data):
+        """Add the next bytes of the data"""
+        view = memoryview(data)
+        while len(view):
+            take = min(len(view), self.leaf_size - self._leaf_bytes)
+            self._leaf.update(view[:take])
+            self._leaf_bytes += take
+            view = view[take:]
+            if self._leaf_bytes == self.leaf_size:
+                self._finish_leaf()
+
+    def add_leaf_hash(self, hash_hex):
+        """Add a leaf whose hash is already known"""
+        self.leaf_count += 1
+        self._last_leaf = hash_hex
+        if self.keep_leaves:
+            self.leaves.append(hash_hex)
+        self._push(hash_hex)
+
+    def _finish_leaf(self):
+        self.add_leaf_hash(self._leaf.hexdigest())
+        self._leaf = hashlib.new(self.algorithm)
+        self._leaf_bytes = 0
+
+    def _push(self, node):
+        # Binary-counter merge: two nodes at a level become one at the next
+        level = 0
+        while True:
+            if level == len(self._levels):
+                self._levels.append(None)
+            if self._levels[level] is None:
+                self._levels[level] = node
+                return
+            node = node_hash(self._levels[level], node, self.algorithm)
+            self._levels[level] = None
+            level += 1
+
+    def root(self):
+        """
+        Merkle root of the data so far, as merkletree.NewMerkleTree computes it
+
+        Returns:
+            Hex root hash, or None when no data was added
+        """
+        levels = list(self._levels)
+        leaf_count = self.leaf_count
+        last_leaf = self._last_leaf
+        if self._leaf_bytes:
+            # Trailing partial leaf
+            last_leaf = self._leaf.copy().hexdigest()
+            levels = self._pushed(levels, last_leaf)
+            leaf_count += 1
+        if leaf_count == 0:
+            return None
+        if leaf_count > 1 and leaf_count % 2:
+            # NewMerkleTree duplicates the last leaf of an odd leaf level
+            levels = self._pushed(levels, last_leaf)
+
+        # Unpaired nodes are promoted unchanged; they join the pending node one level up
+        carry = None
+        for node in levels:
+            if node is None:
+                continue
+            carry = node if carry is None else node_hash(node, carry, self.algorithm)
+        return carry
+
+    def _pushed(self, levels, node):
+        saved, self._levels = self._levels, levels
+        try:
+            self._push(node)
+            return self._levels
+        finally:
+            self._levels = saved
+
+    def all_leaves(self):
+        """Leaf hashes including a trailing partial leaf (needs keep_leaves)"""
+        if not self.keep_leaves:
+            raise ValueError("Leaf hashes were not kept")
+        if self._leaf_bytes:
+            return self.leaves + [self._leaf.copy().hexdigest()]
+        return list(self.leaves)
+
+
+def merkle_root(leaf_hashes, algorithm='sha256'):
+    """Root of merkletree.NewMerkleTree for the given leaf hashes"""
+    builder = MerkleBuilder(keep_leaves=False, algorithm=algorithm)
+    for hash_hex in leaf_hashes:
+        builder.add_leaf_hash(hash_hex)
+    return builder.root()
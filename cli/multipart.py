@@ -0,0 +1,187 @@
+"""
+Streaming multipart/form-data encoder for ZK Health CLI uploads
+
+requests builds multipart bodies in memory. The encoder here is a file-like
+body instead: it yields the form fields, then each file in fixed-size chunks
+(memory-mapped when the file supports it), so memory use does not depend on
+file size. It reports the bytes actually handed to the socket, and hashes each
+file and builds its Merkle tree in the same pass; the Merkle leaves are hashed
+on a worker pool so the send loop only pays for the file digest.
+"""
+
+import io
+import os
+import mmap
+import uuid
+import hashlib
+
+from merkle import DEFAULT_LEAF_SIZE
+from hashing import ChunkHasher
+
+# Bytes handed to the socket per read
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+
+# Bytes of a file mapped at once
+MAP_WINDOW = 16 * 1024 * 1024
+
+
+def _field_header(boundary, name, filename=None, content_type=None):
+    disposition = f'form-data; name="{name}"'
+    if filename is not None:
+        disposition += f'; filename="{filename}"'
+    header = f"--{boundary}\r\nContent-Disposition: {disposition}\r\n"
+    if content_type:
+        header += f"Content-Type: {content_type}\r\n"
+    return (header + "\r\n").encode('utf-8')
+
+
+def _file_size(fileobj):
+    try:
+        return os.fstat(fileobj.fileno()).st_size - fileobj.tell()
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        position = fileobj.tell()
+        fileobj.seek(0, os.SEEK_END)
+        size = fileobj.tell() - position
+        fileobj.seek(position)
+        return size
+
+
+class _FilePart:
+    """One file of the form, read in chunks and hashed as it is sent"""
+
+    def __init__(self, name, filename, fileobj, content_type, hash_name, leaf_size):
+        self.name = name
+        self.filename = filename
+        self.fileobj = fileobj
+        self.content_type = content_type
+        self.size = _file_size(fileobj)
+        self.hash = hashlib.new(hash_name)
+        self.tree = ChunkHasher(leaf_size=leaf_size).stream()
+
+    def chunks(self, chunk_size):
+        """Yield the file contents, updating the hash on the way"""
+        if self._can_map():
+            # Map a bounded window at a time so resident memory stays flat on huge files
+            start = self.fileobj.tell()
+            window = max(MAP_WINDOW - MAP_WINDOW % mmap.ALLOCATIONGRANULARITY, mmap.ALLOCATIONGRANULARITY)
+            for window_offset in range(0, self.size, window):
+                length = min(window, self.size - window_offset)
+                with mmap.mmap(self.fileobj.fileno(), length, offset=start + window_offset,
+                               access=mmap.ACCESS_READ) as mapped:
+                    for offset in range(0, length, chunk_size):
+                        chunk = mapped[offset:offset + chunk_size]
+                        self.hash.update(chunk)
+                        self.tree.update(chunk)
+                        yield chunk
+            return
+
+        while True:
+            chunk = self.fileobj.read(chunk_size)
+            if not chunk:
+                return
+            self.hash.update(chunk)
+            self.tree.update(chunk)
+            yield chunk
+
+    def _can_map(self):
+        """Whether the rest of the file can be memory-mapped"""
+        try:
+            offset = self.fileobj.tell()
+            self.fileobj.fileno()
+        except (AttributeError, OSError, io.UnsupportedOperation):
+            return False
+        return self.size > 0 and offset % mmap.ALLOCATIONGRANULARITY == 0
+
+
+class MultipartEncoder:
+    """
+    File-like multipart/form-data body that streams files in chunks
+
+    Pass it as ``data`` with ``Content-Type: encoder.content_type``. The total
+    length is known up front, so requests sends a Content-Length rather than a
+    chunked body. ``callback(encoder)`` is called after every chunk with
+    ``encoder.bytes_read`` updated; once the body has been sent,
+    ``encoder.digests`` maps each file field to the hex digest of its contents
+    and ``encoder.merkle_roots`` to its pkg/merkletree-compatible root over
+    ``leaf_size`` chunks.
+
+    Args:
+        fields: Form fields ({name: value}); values are sent as text
+        files: {name: (filename, fileobj[, content_type])}; fileobj is read from its current position
+        callback: Optional progress callback
+        chunk_size: Bytes per read
+        hash_name: hashlib algorithm used for the file digests
+        leaf_size: Merkle leaf size in bytes
+    """
+
+    def __init__(self, fields=None, files=None, callback=None, chunk_size=DEFAULT_CHUNK_SIZE,
+                 hash_name='sha256', leaf_size=DEFAULT_LEAF_SIZE):
+        self.boundary = uuid.uuid4().hex
+        self.content_type = f"multipart/form-data; boundary={self.boundary}"
+        self.callback = callback
+        self.chunk_size = chunk_size
+        self.bytes_read = 0
+
+        self._preamble = b"".join(
+            _field_header(self.boundary, name) + str(value).encode('utf-8') + b"\r\n"
+            for name, value in (fields or {}).items() if value is not None
+        )
+        self.parts = []
+        for name, spec in (files or {}).items():
+            filename, fileobj = spec[0], spec[1]
+            content_type = spec[2] if len(spec) > 2 else 'application/octet-stream'
+            self.parts.append(_FilePart(name, filename, fileobj, content_type, hash_name, leaf_size))
+        self._closing = f"--{self.boundary}--\r\n".encode('utf-8')
+
+        self.len = len(self._preamble) + len(self._closing) + sum(
+            len(self._part_header(part)) + part.size + 2 for part in self.parts
+        )
+        self._chunks = self._generate()
+        self._pending = b""
+
+    def _part_header(self, part):
+        return _field_header(self.boundary, part.name, part.filename, part.content_type)
+
+    def _generate(self):
+        yield self._preamble
+        for part in self.parts:
+            yield self._part_header(part)
+            for chunk in part.chunks(self.chunk_size):
+                yield chunk
+            yield b"\r\n"
+        yield self._closing
+
+    def __len__(self):
+        return self.len
+
+    @property
+    def digests(self):
+        """Hex digest of each file field's contents (complete once the body is sent)"""
+        return {part.name: part.hash.hexdigest() for part in self.parts}
+
+    @property
+    def merkle_roots(self):
+        """Merkle root of each file field's contents (complete once the body is sent)"""
+        return {part.name: part.tree.root() for part in self.parts}
+
+    def read(self, size=-1):
+        """
+        Next piece of the body
+
+        Returns at most ``max(size, chunk_size)`` bytes, so that large chunks go to
+        the socket in one call even when the caller asks for small blocks.
+        """
+        limit = self.chunk_size if size is None or size < 0 else max(size, self.chunk_size)
+        chunk = self._pending
+        while not chunk:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                return b""
+        if len(chunk) > limit:
+            chunk, self._pending = chunk[:limit], chunk[limit:]
+        else:
+            self._pending = b""
+        self.bytes_read += len(chunk)
+        if self.callback:
+            self.callback(self)
+        return chunk
@@ -3,14 +3,18 @@ Oracle Chain Validator commands for ZK Health CLI
 """
 
 import os
+import sys
 import json
+import time
 import click
 from rich.console import Console
 from rich.table import Table
 from rich.panel import Panel
 from rich.syntax import Syntax
+from rich.live import Live
 
-from utils import make_api_request, handle_api_error
+from utils import make_api_request, handle_api_error, POOL_SIZE
+from event_validation import EventValidationRunner, Checkpoint
 
 console = Console()
 
@@ -263,6 +267,87 @@ def validate_event(agreement_id, event_id, event_type, clause_ids, signer_id, zk
     except Exception as e:
         console.print(f"[red]Error: {str(e)}[/red]")
 
+@oracle_group.command(name="validate-events")
+@click.argument('input_file', type=click.Path(exists=True, dir_okay=False))
+@click.option('--output', '-o', type=click.Path(dir_okay=False),
+              help='NDJSON results file (default: stdout; required for resuming)')
+@click.option('--agreement-id', help='Agreement ID for events that lack one')
+@click.option('--signer-id', help='Signer ID for events that lack one')
+@click.option('--zk-proof', help='ZK proof for events that lack one')
+@click.option('--workers', type=int, default=min(16, POOL_SIZE), show_default=True,
+              help='Validations run concurrently')
+@click.option('--timeout', type=float, default=30.0, show_default=True,
+              help='Per-request timeout in seconds')
+@click.option('--checkpoint', 'checkpoint_path', type=click.Path(dir_okay=False),
+              help='Checkpoint file (default: <output>.checkpoint)')
+@click.option('--restart', is_flag=True, help='Ignore an existing checkpoint and start over')
+def validate_events(input_file, output, agreement_id, signer_id, zk_proof, workers, timeout,
+                    checkpoint_path, restart):
+    """Validate execution events from a JSONL file concurrently
+    
+    Results are written as NDJSON, one line per event. With --output, an
+    interrupted run resumes from its checkpoint when run again.
+    """
+    api_url = os.getenv('API_URL', 'http://localhost:8080')
+    status_console = Console(stderr=True)
+    defaults = {key: value for key, value in
+                (('agreement_id', agreement_id), ('signer_id', signer_id), ('zk_proof', zk_proof)) if value}
+    
+    checkpoint = None
+    resuming = False
+    if output or checkpoint_path:
+        checkpoint = Checkpoint(checkpoint_path or f"{output}.checkpoint", input_file)
+        if restart:
+            checkpoint.remove()
+        resuming = checkpoint.load()
+    
+    out = open(output, 'a' if resuming else 'w') if output else sys.stdout
+    if resuming:
+        status_console.print(f"[yellow]Resuming from line {checkpoint.line + 1} of {input_file}[/yellow]")
+    
+    def summary(runner):
+        p50, p95 = runner.latency_percentiles()
+        latency = f"p50 {p50:.1f}ms, p95 {p95:.1f}ms" if p50 is not None else "p50 -, p95 -"
+        return (f"[bold]{runner.completed}[/bold] events, {runner.rate():.1f}/s, {latency}: "
+                f"[green]{runner.counts['valid']} valid[/green], "
+                f"[yellow]{runner.counts['invalid']} invalid[/yellow], "
+                f"[red]{runner.counts['error']} errors[/red]")
+    
+    def emit(record):
+        out.write(json.dumps(record) + "\n")
+        out.flush()
+    
+    runner = EventValidationRunner(api_url, defaults, workers=workers, timeout=timeout, checkpoint=checkpoint)
+    try:
+        with Live(console=status_console, refresh_per_second=4, transient=True) as live:
+            last_update = [0.0]
+            
+            def on_event(runner):
+                # Rendering is throttled; Live repaints at its own rate
+                now = time.monotonic()
+                if now - last_update[0] >= 0.2:
+                    last_update[0] = now
+                    live.update(summary(runner))
+            
+            runner.callback = on_event
+            elapsed = runner.run(input_file, emit)
+    except KeyboardInterrupt:
+        status_console.print(summary(runner))
+        if checkpoint:
+            status_console.print("[yellow]Interrupted; run the same command again to resume[/yellow]")
+        sys.exit(130)
+    except Exception as e:
+        status_console.print(f"[red]Error: {str(e)}[/red]")
+        sys.exit(1)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    
+    status_console.print(summary(runner) + f" in {elapsed:.2f}s"
+                         + (f" ({runner.skipped} done before resuming)" if runner.skipped else ""))
+    if runner.counts['error']:
+        sys.exit(1)
+
 @oracle_group.command(name="create-example")
 @click.option('--output-file', required=True, type=click.Path(), 
               help='Path to save the example agreement JSON file')
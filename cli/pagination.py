@@ -0,0 +1,234 @@
+"""
+Streaming, paginated list output for ZK Health CLI
+
+List endpoints are fetched page by page: ``limit`` and ``cursor`` are sent
+with each request, and the next page is requested while the response carries
+a ``next_cursor``. Each response body is parsed incrementally, so rows are
+yielded as they arrive instead of after the whole body is loaded; servers that
+ignore the paging parameters still stream their single page. Rows then flow
+through a generator pipeline into NDJSON, CSV or paged tables, so memory use
+does not grow with the number of rows.
+"""
+
+import sys
+import csv
+import json
+import codecs
+
+from rich.table import Table
+
+from utils import get_session
+
+DEFAULT_PAGE_SIZE = 500
+# Rows per rendered table page
+TABLE_PAGE_ROWS = 50
+# NDJSON/CSV rows between flushes (the first row is flushed at once)
+FLUSH_ROWS = 1000
+OUTPUT_FORMATS = ('table', 'ndjson', 'csv')
+
+READ_SIZE = 64 * 1024
+WHITESPACE = ' \t\n\r'
+
+
+class PageError(Exception):
+    """A page request failed"""
+
+    def __init__(self, response):
+        super().__init__(f"HTTP {response.status_code}")
+        self.response = response
+
+
+class _StreamParser:
+    """Incremental reader over a stream of text chunks"""
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _more(self):
+        chunk = next(self.chunks, None)
+        if chunk is None:
+            self.eof = True
+            return False
+        # Drop what has been consumed so the buffer stays small
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """Next non-whitespace character, or '' at the end"""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._more():
+                return ''
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise ValueError(f"Expected '{char}' in response at position {self.pos}")
+        self.pos += 1
+
+    def value(self):
+        """Decode the next complete JSON value"""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if not self._more():
+                    raise
+                continue
+            if end == len(self.buffer) and not self.eof and self._more():
+                # A number may continue in the next chunk
+                continue
+            self.pos = end
+            return value
+
+
+def iter_json_items(chunks, key, envelope):
+    """
+    Yield the items of the array under ``key`` of a streamed JSON object
+
+    Args:
+        chunks: Iterator of decoded text chunks of the response body
+        key: Name of the top-level array field
+        envelope: dict filled with the object's other top-level fields
+    """
+    parser = _StreamParser(chunks)
+    parser.expect('{')
+    if parser.peek() == '}':
+        return
+    while True:
+        name = parser.value()
+        parser.expect(':')
+        if name == key and parser.peek() == '[':
+            parser.expect('[')
+            if parser.peek() != ']':
+                while True:
+                    yield parser.value()
+                    if parser.peek() != ',':
+                        break
+                    parser.expect(',')
+            parser.expect(']')
+        else:
+            envelope[name] = parser.value()
+        if parser.peek() != ',':
+            break
+        parser.expect(',')
+    parser.expect('}')
+
+
+def _text_chunks(response):
+    decoder = codecs.getincrementaldecoder(response.encoding or 'utf-8')()
+    for chunk in response.iter_content(chunk_size=READ_SIZE):
+        text = decoder.decode(chunk)
+        if text:
+            yield text
+    tail = decoder.decode(b'', final=True)
+    if tail:
+        yield tail
+
+
+def paginate(url, key, params=None, page_size=DEFAULT_PAGE_SIZE, timeout=60):
+    """
+    Yield every item of a list endpoint, one page at a time
+
+    Raises:
+        PageError: when a page request does not succeed
+    """
+    session = get_session()
+    params = dict(params or {})
+    params['limit'] = page_size
+    cursor = None
+    while True:
+        if cursor:
+            params['cursor'] = cursor
+        response = session.get(url, params=params, stream=True, timeout=timeout)
+        with response:
+            if not response.ok:
+                # Read the error body before the connection is released
+                response.content
+                raise PageError(response)
+            envelope = {}
+            yield from iter_json_items(_text_chunks(response), key, envelope)
+        next_cursor = envelope.get('next_cursor')
+        if not next_cursor or next_cursor == cursor:
+            return
+        cursor = next_cursor
+
+
+def _cell(column, row):
+    value = column[1](row)
+    return 'N/A' if value is None or value == '' else str(value)
+
+
+def _chunked(rows, size):
+    page = []
+    for row in rows:
+        page.append(row)
+        if len(page) == size:
+            yield page
+            page = []
+    if page:
+        yield page
+
+
+def render_rows(rows, columns, output, console, empty_message, out=None):
+    """
+    Write rows as they are produced
+
+    Args:
+        rows: Iterable of row dicts (consumed lazily)
+        columns: (header, getter[, colors]) tuples; getter(row) gives the cell
+            value and colors optionally maps a value to a table style
+        output: 'table', 'ndjson' or 'csv'
+        console: Console for table output and messages
+        empty_message: Shown in table mode when there are no rows
+        out: Text stream for ndjson/csv (default: stdout)
+
+    Returns:
+        Number of rows written
+    """
+    out = out or sys.stdout
+    count = 0
+    if output == 'ndjson':
+        for row in rows:
+            out.write(json.dumps(row) + "\n")
+            count += 1
+            if count % FLUSH_ROWS == 1:
+                out.flush()
+        out.flush()
+        return count
+
+    if output == 'csv':
+        writer = csv.writer(out)
+        writer.writerow([column[0] for column in columns])
+        for row in rows:
+            writer.writerow([_cell(column, row) for column in columns])
+            count += 1
+            if count % FLUSH_ROWS == 1:
+                out.flush()
+        out.flush()
+        return count
+
+    for page in _chunked(rows, TABLE_PAGE_ROWS):
+        table = Table(show_header=True, header_style="bold blue")
+        for column in columns:
+            table.add_column(column[0])
+        for row in page:
+            cells = []
+            for column in columns:
+                value = _cell(column, row)
+                color = column[2].get(value, 'white') if len(column) > 2 else None
+                cells.append(f"[{color}]{value}[/{color}]" if color else value)
+            table.add_row(*cells)
+        console.print(table)
+        count += len(page)
+    if count == 0:
+        console.print(f"[yellow]{empty_message}[/yellow]")
+    return count
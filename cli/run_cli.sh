@@ -17,5 +17,10 @@ if [ ! -f ".requirements_installed" ]; then
     touch .requirements_installed
 fi
 
+# Set ZK_CLI_DAEMON=1 to run commands through the warm CLI daemon
+if [ "${ZK_CLI_DAEMON:-0}" = "1" ]; then
+    exec python3 zk_health_client.py "$@"
+fi
+
 # Run the CLI tool
 python3 zk_health_cli.py "$@"
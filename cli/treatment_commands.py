@@ -11,10 +11,23 @@ from rich.panel import Panel
 from rich.progress import track
 from rich import box
 
+from pagination import paginate, render_rows, PageError, OUTPUT_FORMATS, DEFAULT_PAGE_SIZE
 from utils import make_api_request, handle_api_error
 
 console = Console()
 
+# (header, getter[, status colors]) for treatment list output
+TREATMENT_COLUMNS = [
+    ("Vector ID", lambda vector: vector.get('vector_id')),
+    ("Patient ID", lambda vector: vector.get('patient_id')),
+    ("Symptom", lambda vector: vector.get('symptom')),
+    ("Doctor ID", lambda vector: vector.get('doctor_id')),
+    ("Status", lambda vector: vector.get('status'),
+     {'active': 'yellow', 'completed': 'green', 'abandoned': 'red'}),
+    ("Started", lambda vector: vector.get('start_date')),
+    ("Steps", lambda vector: vector.get('steps_completed', 0)),
+]
+
 @click.group(name="treatment")
 def treatment_group():
     """Manage treatment vectors and AI recommendations"""
@@ -287,7 +300,11 @@ def get_treatment(vector_id):
 @click.option('--doctor-id', help='Filter by doctor ID')
 @click.option('--status', type=click.Choice(['active', 'completed', 'abandoned']), 
               help='Filter by treatment status')
-def list_treatments(patient_id, doctor_id, status):
+@click.option('--output', '-o', 'output_format', type=click.Choice(OUTPUT_FORMATS), default='table',
+              show_default=True, help='Output format')
+@click.option('--page-size', type=int, default=DEFAULT_PAGE_SIZE, show_default=True,
+              help='Rows fetched per request')
+def list_treatments(patient_id, doctor_id, status, output_format, page_size):
     """List treatment vectors"""
     api_url = os.getenv('API_URL', 'http://localhost:8080')
     
@@ -300,45 +317,10 @@ def list_treatments(patient_id, doctor_id, status):
         if status:
             params['status'] = status
             
-        response = make_api_request(f"{api_url}/api/treatment/list", method="GET", params=params)
-        
-        if response.ok:
-            data = response.json()
-            vectors = data.get('vectors', [])
-            
-            if not vectors:
-                console.print("[yellow]No treatment vectors found.[/yellow]")
-                return
-                
-            table = Table(show_header=True, header_style="bold blue")
-            table.add_column("Vector ID")
-            table.add_column("Patient ID")
-            table.add_column("Symptom")
-            table.add_column("Doctor ID")
-            table.add_column("Status")
-            table.add_column("Started")
-            table.add_column("Steps")
-            
-            for vector in vectors:
-                status_color = {
-                    'active': 'yellow',
-                    'completed': 'green',
-                    'abandoned': 'red'
-                }.get(vector.get('status', ''), 'white')
-                
-                table.add_row(
-                    vector.get('vector_id', 'N/A'),
-                    vector.get('patient_id', 'N/A'),
-                    vector.get('symptom', 'N/A'),
-                    vector.get('doctor_id', 'N/A'),
-                    f"[{status_color}]{vector.get('status', 'N/A')}[/{status_color}]",
-                    vector.get('start_date', 'N/A'),
-                    str(vector.get('steps_completed', 0))
-                )
-            
-            console.print(table)
-        else:
-            handle_api_error(response)
+        rows = paginate(f"{api_url}/api/treatment/list", 'vectors', params, page_size)
+        render_rows(rows, TREATMENT_COLUMNS, output_format, console, "No treatment vectors found.")
+    except PageError as e:
+        handle_api_error(e.response)
     except Exception as e:
         console.print(f"[red]Error: {str(e)}[/red]")
 
@@ -4,13 +4,75 @@ Utility functions for ZK Health CLI
 
 import os
 import json
+import threading
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from rich.console import Console
 
+from multipart import MultipartEncoder
+
 console = Console()
 
+# Connection pool and retry settings for the shared session
+POOL_SIZE = int(os.getenv('ZK_CLI_POOL_SIZE', '32'))
+MAX_RETRIES = int(os.getenv('ZK_CLI_RETRIES', '3'))
+RETRY_BACKOFF = float(os.getenv('ZK_CLI_RETRY_BACKOFF', '0.2'))
+
+# Only methods that are safe to send twice are retried
+IDEMPOTENT_METHODS = frozenset(['GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'])
+
+_session = None
+_session_lock = threading.Lock()
+
+def new_session(retries=MAX_RETRIES):
+    """
+    Create a pooled HTTP session
+    
+    Connections are kept alive and reused across calls (up to POOL_SIZE per
+    host). Idempotent requests are retried with backoff on connection errors
+    and 502/503/504 responses; POST is never retried. The X-ZK-API-Key header
+    is set once from ZK_API_TOKEN.
+    
+    Args:
+        retries: Retries per idempotent request (0 reports every failure as is)
+        
+    Returns:
+        requests.Session
+    """
+    retry = Retry(
+        total=retries,
+        backoff_factor=RETRY_BACKOFF,
+        status_forcelist=(502, 503, 504),
+        allowed_methods=IDEMPOTENT_METHODS,
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE, max_retries=retry)
+    session = requests.Session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.headers['Connection'] = 'keep-alive'
+    api_token = os.getenv('ZK_API_TOKEN')
+    if api_token:
+        session.headers['X-ZK-API-Key'] = api_token
+    return session
+
+def get_session():
+    """
+    Return the process-wide pooled HTTP session (see new_session)
+    
+    Returns:
+        requests.Session shared by every caller in the process
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = new_session()
+    return _session
+
 def make_api_request(url, method="GET", params=None, data=None, json=None, files=None, 
-                    stream=False, progress_callback=None):
+                    stream=False, progress_callback=None, headers=None, timeout=None):
     """
     Make an API request with proper error handling
     
@@ -20,37 +82,37 @@ def make_api_request(url, method="GET", params=None, data=None, json=None, files
         params: URL parameters
         data: Form data
         json: JSON payload
-        files: Multipart files
+        files: Multipart files (streamed from disk, see multipart.MultipartEncoder)
         stream: Whether to stream the response
         progress_callback: Optional callback for upload/download progress
+        headers: Extra headers for this request
+        timeout: Request timeout in seconds
         
     Returns:
         Response object
     """
     
-    # Add authentication token if available in environment
-    headers = {}
-    api_token = os.getenv('ZK_API_TOKEN')
-    if api_token:
-        headers['X-ZK-API-Key'] = api_token
+    # Pooled session (authentication header already set on it)
+    session = get_session()
     
     # Make the request
     try:
-        if progress_callback and files:
-            # Custom implementation for upload progress
-            return requests.request(
+        if files:
+            # Stream the multipart body in chunks, reporting bytes sent
+            encoder = MultipartEncoder(fields=data, files=files, callback=progress_callback)
+            headers = dict(headers or {}, **{'Content-Type': encoder.content_type})
+            return session.request(
                 method, 
                 url, 
                 params=params, 
-                data=data, 
-                json=json,
-                files=files, 
+                data=encoder, 
                 headers=headers,
-                stream=stream
+                stream=stream,
+                timeout=timeout
             )
         elif progress_callback and stream:
             # Download with progress
-            response = requests.request(
+            response = session.request(
                 method, 
                 url, 
                 params=params, 
@@ -58,7 +120,8 @@ def make_api_request(url, method="GET", params=None, data=None, json=None, files
                 json=json,
                 files=files, 
                 headers=headers,
-                stream=True
+                stream=True,
+                timeout=timeout
             )
             
             # Create a wrapper for progress tracking
@@ -78,7 +141,7 @@ def make_api_request(url, method="GET", params=None, data=None, json=None, files
             response.iter_content = wrapper.iter_content
             return response
         else:
-            return requests.request(
+            return session.request(
                 method, 
                 url, 
                 params=params, 
@@ -86,7 +149,8 @@ def make_api_request(url, method="GET", params=None, data=None, json=None, files
                 json=json,
                 files=files, 
                 headers=headers,
-                stream=stream
+                stream=stream,
+                timeout=timeout
             )
     except requests.exceptions.ConnectionError:
         console.print("[red]Error: Could not connect to the API. Is the server running?[/red]")
@@ -123,7 +187,7 @@ def check_service_status(url):
         (status, details) tuple
     """
     try:
-        response = requests.get(url, timeout=5)
+        response = get_session().get(url, timeout=5)
         if response.ok:
             try:
                 data = response.json()
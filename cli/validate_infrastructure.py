@@ -16,6 +16,8 @@ import time
 from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 
+from utils import get_session
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -27,6 +29,9 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Pooled keep-alive session for all HTTP checks
+session = get_session()
+
 # Infrastructure API endpoints
 BASE_URL = "http://localhost:8080"
 HEALTH_ENDPOINT = f"{BASE_URL}/health"
@@ -105,7 +110,7 @@ class ValidationContext:
 def http_get(url, headers=None):
     """Make HTTP GET request with error handling"""
     try:
-        response = requests.get(url, headers=headers, timeout=10)
+        response = session.get(url, headers=headers, timeout=10)
         return response
     except requests.exceptions.RequestException as e:
         logger.error(f"Error making GET request to {url}: {e}")
@@ -116,7 +121,7 @@ def http_post(url, payload, headers=None):
     try:
         if headers is None:
             headers = {"Content-Type": "application/json"}
-        response = requests.post(url, json=payload, headers=headers, timeout=10)
+        response = session.post(url, json=payload, headers=headers, timeout=10)
         return response
     except requests.exceptions.RequestException as e:
         logger.error(f"Error making POST request to {url}: {e}")
@@ -20,6 +20,7 @@ from oracle_commands import oracle_group
 from document_commands import document_group
 from treatment_commands import treatment_group
 from gateway_commands import gateway_group
+from batch_commands import batch_command
 
 # Load environment variables from .env file if it exists
 dotenv.load_dotenv()
@@ -105,6 +106,7 @@ def showcase():
     console.print("  • zk_health_cli.py document --help")
     console.print("  • zk_health_cli.py treatment --help")
     console.print("  • zk_health_cli.py gateway --help")
+    console.print("  • zk_health_cli.py batch --help")
     
     console.print("\n[bold]Example workflow:[/bold]")
     console.print("  1. Create identities for doctor and patient")
@@ -127,6 +129,7 @@ cli.add_command(oracle_group)
 cli.add_command(document_group)
 cli.add_command(treatment_group)
 cli.add_command(gateway_group)
+cli.add_command(batch_command)
 
 if __name__ == "__main__":
     cli()
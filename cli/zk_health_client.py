@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Thin client for the warm ZK Health CLI daemon
+
+Runs ``zk_health_cli.py`` commands through a long-lived daemon (see
+cli_daemon.py) instead of starting a fresh interpreter each time:
+
+    python zk_health_client.py document list -o ndjson
+
+The client only uses the standard library, so it starts in a few tens of
+milliseconds. It sends its argv, environment and working directory to the
+daemon over a Unix socket, together with its stdin, stdout and stderr file
+descriptors, so the command reads and writes the caller's terminal or pipes
+directly, then exits with the command's exit code. Ctrl-C is forwarded.
+
+A daemon is started automatically when none is running and exits after
+ZK_CLI_DAEMON_IDLE seconds without requests. Settings read once at import
+time (ZK_API_TOKEN, pool and retry settings) and the CLI source files are
+part of the socket name, so changing them starts a fresh daemon rather
+than reusing a stale one. Without Unix sockets the CLI runs directly.
+
+``python zk_health_client.py daemon stop`` stops the daemon for the current
+settings, and ``daemon status`` reports whether it is running.
+"""
+
+import os
+import sys
+import json
+import time
+import socket
+import struct
+import hashlib
+
+CLI_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Environment read by the CLI modules at import time
+IMPORT_TIME_ENV = (
+    'ZK_API_TOKEN', 'ZK_CLI_POOL_SIZE', 'ZK_CLI_RETRIES', 'ZK_CLI_RETRY_BACKOFF',
+    'ZK_CLI_STATE_DIR', 'ZK_HASH_BENCHMARK_SIZE_MB'
+)
+
+SPAWN_TIMEOUT = 15.0
+HEADER = struct.Struct('!I')
+
+
+def socket_dir():
+    """Private directory holding the daemon sockets"""
+    base = os.getenv('XDG_RUNTIME_DIR') or os.path.expanduser(os.getenv('ZK_CLI_STATE_DIR', '~/.zk_health'))
+    path = os.path.join(base, 'zk_health_cli')
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    return path
+
+
+def daemon_key(environ=None):
+    """Fingerprint of everything a warm daemon has already baked in"""
+    environ = os.environ if environ is None else environ
+    digest = hashlib.sha256()
+    digest.update(sys.executable.encode())
+    digest.update(CLI_DIR.encode())
+    for name in IMPORT_TIME_ENV:
+        digest.update(f"\0{name}={environ.get(name, '')}".encode())
+    # Code changes start a new daemon; old ones exit when idle
+    for entry in sorted(os.scandir(CLI_DIR), key=lambda entry: entry.name):
+        if entry.name.endswith('.py'):
+            digest.update(f"\0{entry.name}:{entry.stat().st_mtime_ns}".encode())
+    return digest.hexdigest()[:16]
+
+
+def socket_path(environ=None):
+    return os.path.join(socket_dir(), f"cli-{daemon_key(environ)}.sock")
+
+
+def _connect(path):
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(path)
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
+
+def _spawn(path):
+    """Start a daemon for path and wait until it accepts connections"""
+    import subprocess
+    log_path = os.path.join(socket_dir(), 'daemon.log')
+    with open(log_path, 'ab') as log:
+        subprocess.Popen(
+            [sys.executable, os.path.join(CLI_DIR, 'cli_daemon.py'), path],
+            stdin=subprocess.DEVNULL, stdout=log, stderr=log,
+            cwd=CLI_DIR, start_new_session=True, close_fds=True
+        )
+    deadline = time.monotonic() + SPAWN_TIMEOUT
+    while time.monotonic() < deadline:
+        try:
+            return _connect(path)
+        except OSError:
+            time.sleep(0.02)
+    raise OSError(f"CLI daemon did not start; see {log_path}")
+
+
+def _run_direct(argv):
+    """Run the CLI in this process's place (no daemon)"""
+    script = os.path.join(CLI_DIR, 'zk_health_cli.py')
+    os.execv(sys.executable, [sys.executable, script] + argv)
+
+
+def _send(sock, message, fds=()):
+    data = json.dumps(message).encode('utf-8')
+    data = HEADER.pack(len(data)) + data
+    sent = socket.send_fds(sock, [data], list(fds)) if fds else sock.send(data)
+    if sent < len(data):
+        sock.sendall(data[sent:])
+
+
+def _wait_for_exit(sock):
+    buffer = b''
+    interrupted = False
+    while b'\n' not in buffer:
+        try:
+            chunk = sock.recv(4096)
+        except KeyboardInterrupt:
+            if interrupted:
+                # Second Ctrl-C: stop waiting for the command to wind down
+                return 130
+            interrupted = True
+            sock.sendall(b'I')
+            continue
+        if not chunk:
+            return 1 if not interrupted else 130
+        buffer += chunk
+    return json.loads(buffer.split(b'\n', 1)[0]).get('exit', 1)
+
+
+def daemon_command(action):
+    path = socket_path()
+    try:
+        sock = _connect(path)
+    except OSError:
+        print("CLI daemon is not running")
+        return 0 if action == 'stop' else 1
+    with sock:
+        _send(sock, {'control': action})
+        reply = json.loads(sock.makefile().readline() or '{}')
+    if action == 'status':
+        print(f"CLI daemon running (pid {reply.get('pid')}, {reply.get('requests', 0)} requests served, "
+              f"socket {path})")
+    else:
+        print("CLI daemon stopped")
+    return 0
+
+
+def main(argv):
+    if argv[:1] == ['daemon'] and argv[1:2] in (['stop'], ['status']):
+        return daemon_command(argv[1])
+    if not hasattr(socket, 'AF_UNIX') or not hasattr(socket, 'send_fds'):
+        _run_direct(argv)
+
+    path = socket_path()
+    try:
+        try:
+            sock = _connect(path)
+        except OSError:
+            sock = _spawn(path)
+    except OSError as e:
+        print(f"Warning: {e}; running without the daemon", file=sys.stderr)
+        _run_direct(argv)
+
+    with sock:
+        for stream in (sys.stdout, sys.stderr):
+            stream.flush()
+        _send(sock, {'argv': argv, 'cwd': os.getcwd(), 'env': dict(os.environ)}, fds=(0, 1, 2))
+        return _wait_for_exit(sock)
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -12,13 +12,14 @@ from utils.auth import (
     get_password_hash, verify_password, create_access_token, 
     get_current_active_user
 )
+from utils.clients import clients
 from utils.api_client import ZKIdentityClient, ZKGatewayClient
 from utils.config import settings
 
 router = APIRouter()
 templates = Jinja2Templates(directory="templates")
-identity_client = ZKIdentityClient()
-gateway_client = ZKGatewayClient()
+identity_client = clients.get(ZKIdentityClient)
+gateway_client = clients.get(ZKGatewayClient)
 
 @router.get("/login")
 async def login_page(request: Request):
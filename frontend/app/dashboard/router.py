@@ -10,17 +10,19 @@ from utils.api_client import (
     ZKIdentityClient, ZKConsentClient, ZKDocumentClient,
     ZKTreatmentClient, ZKOracleClient, ZKPolicyClient
 )
+from utils.clients import clients
+from utils.policy_table import allowed_actions_table
 
 router = APIRouter()
 templates = Jinja2Templates(directory="templates")
 
 # Initialize API clients
-identity_client = ZKIdentityClient()
-consent_client = ZKConsentClient()
-document_client = ZKDocumentClient()
-treatment_client = ZKTreatmentClient()
-oracle_client = ZKOracleClient()
-policy_client = ZKPolicyClient()
+identity_client = clients.get(ZKIdentityClient)
+consent_client = clients.get(ZKConsentClient)
+document_client = clients.get(ZKDocumentClient)
+treatment_client = clients.get(ZKTreatmentClient)
+oracle_client = clients.get(ZKOracleClient)
+policy_client = clients.get(ZKPolicyClient)
 
 @router.get("/")
 async def dashboard(
@@ -32,8 +34,8 @@ async def dashboard(
     role = current_user.get("role", "")
     country = current_user.get("country", "")
     
-    # Get allowed actions for current role and location
-    policy_response = await policy_client.get_allowed_actions(role, country)
+    # Get allowed actions for current role and location (precomputed table)
+    policy_response = await allowed_actions_table.get_allowed_actions(role, country)
     allowed_actions = policy_response.get("actions", [])
     
     # Get recent patient consultations (if doctor)
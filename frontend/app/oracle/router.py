@@ -3,21 +3,25 @@ Oracle Agreement router for ZK Health HMS
 """
 from fastapi import APIRouter, Depends, Request, Form, HTTPException, status, File, UploadFile
 from fastapi.templating import Jinja2Templates
-from fastapi.responses import RedirectResponse, JSONResponse
+from fastapi.responses import RedirectResponse
 from typing import Dict, List, Optional
 import json
 import uuid
 from datetime import datetime
 
 from utils.auth import get_current_active_user
+from utils.clients import clients
+from utils.fastjson import FastJSONResponse
+from utils.config import settings
+from utils.loaders import IdentityLoader, get_identity_loader, resolve_names
 from utils.api_client import ZKOracleClient, ZKPolicyClient
 
 router = APIRouter()
 templates = Jinja2Templates(directory="templates")
 
 # Initialize API clients
-oracle_client = ZKOracleClient()
-policy_client = ZKPolicyClient()
+oracle_client = clients.get(ZKOracleClient)
+policy_client = clients.get(ZKPolicyClient)
 
 @router.get("/")
 async def oracle_dashboard(
@@ -221,39 +225,8 @@ async def create_agreement(
         status_code=status.HTTP_303_SEE_OTHER
     )
 
-@router.get("/{agreement_id}")
-async def agreement_detail(
-    request: Request,
-    agreement_id: str,
-    current_user: Dict = Depends(get_current_active_user)
-):
-    """Agreement detail view"""
-    # Verify policy permission
-    policy_request = {
-        "actor": {
-            "id": current_user.get("id"),
-            "role": current_user.get("role"),
-            "attributes": {"country": current_user.get("country")}
-        },
-        "action": "view_oracle_agreement",
-        "location": current_user.get("country"),
-        "resource": {"type": "oracle_agreement", "id": agreement_id}
-    }
-    
-    policy_response = await policy_client.validate_action(policy_request)
-    
-    if not policy_response.get("allowed", False):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Policy restriction: You are not authorized to view this oracle agreement"
-        )
-    
-    # Get agreement details from Oracle API
-    # In a real implementation, you'd fetch actual agreement data
-    # For demo, we'll return mock data for the specified agreement ID
-    
-    # Mock agreement data (would come from API in real implementation)
-    agreement = None
+def _get_agreement(agreement_id: str, current_user: Dict) -> Dict:
+    """Mock agreement data (would come from API in real implementation)"""
     if agreement_id == "ora101":
         agreement = {
             "id": "ora101",
@@ -331,6 +304,42 @@ async def agreement_detail(
             ]
         }
     
+    return agreement
+
+@router.get("/{agreement_id}")
+async def agreement_detail(
+    request: Request,
+    agreement_id: str,
+    current_user: Dict = Depends(get_current_active_user),
+    identities: IdentityLoader = Depends(get_identity_loader)
+):
+    """Agreement detail view"""
+    # Verify policy permission
+    policy_request = {
+        "actor": {
+            "id": current_user.get("id"),
+            "role": current_user.get("role"),
+            "attributes": {"country": current_user.get("country")}
+        },
+        "action": "view_oracle_agreement",
+        "location": current_user.get("country"),
+        "resource": {"type": "oracle_agreement", "id": agreement_id}
+    }
+    
+    policy_response = await policy_client.validate_action(policy_request)
+    
+    if not policy_response.get("allowed", False):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Policy restriction: You are not authorized to view this oracle agreement"
+        )
+    
+    # Get agreement details from Oracle API
+    # In a real implementation, you'd fetch actual agreement data
+    # For demo, we'll return mock data for the specified agreement ID
+    
+    agreement = _get_agreement(agreement_id, current_user)
+    
     # Get validation history
     validation_history = [
         {
@@ -363,6 +372,8 @@ async def agreement_detail(
         }
     ]
     
+    await resolve_names(identities, validation_history, ("actor_id", "actor_name"))
+    
     return templates.TemplateResponse(
         "oracle/detail.html",
         {
@@ -438,9 +449,14 @@ async def validate_agreement(
     action: str = Form(...),
     resource_id: str = Form(...),
     resource_type: str = Form(...),
+    mode: Optional[str] = Form(None),
     current_user: Dict = Depends(get_current_active_user)
 ):
-    """Handle agreement validation form submission"""
+    """Handle agreement validation form submission
+    
+    With ``mode=clauses`` each clause is validated concurrently and the
+    response includes per-clause results and latency.
+    """
     # Prepare validation data
     validation_data = {
         "agreement_id": agreement_id,
@@ -460,6 +476,19 @@ async def validate_agreement(
         "timestamp": datetime.now().isoformat()
     }
     
+    # Clause-level mode: fan out independent clause checks, stop on first mandatory failure
+    if mode == "clauses":
+        agreement = _get_agreement(agreement_id, current_user)
+        response = await oracle_client.validate_clauses(
+            agreement_id,
+            validation_data,
+            agreement["clauses"],
+            max_concurrency=settings.ORACLE_CLAUSE_CONCURRENCY
+        )
+        response["validation_id"] = f"val_{uuid.uuid4().hex[:8]}"
+        response["timestamp"] = datetime.now().isoformat()
+        return FastJSONResponse(content=response)
+    
     # In a real implementation, you'd call the Oracle API to validate the agreement
     # response = await oracle_client.validate_agreement(agreement_id, validation_data)
     
@@ -478,7 +507,7 @@ async def validate_agreement(
         }
     }
     
-    return JSONResponse(content=response)
+    return FastJSONResponse(content=response)
 
 @router.get("/templates")
 async def agreement_templates(
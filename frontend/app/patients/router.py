@@ -10,6 +10,8 @@ import uuid
 from datetime import datetime
 
 from utils.auth import get_current_active_user
+from utils.clients import clients
+from utils.loaders import IdentityLoader, get_identity_loader, resolve_names
 from utils.api_client import (
     ZKIdentityClient, ZKConsentClient, ZKDocumentClient, 
     ZKTreatmentClient, ZKPolicyClient
@@ -19,17 +21,18 @@ router = APIRouter()
 templates = Jinja2Templates(directory="templates")
 
 # Initialize API clients
-identity_client = ZKIdentityClient()
-consent_client = ZKConsentClient()
-document_client = ZKDocumentClient()
-treatment_client = ZKTreatmentClient()
-policy_client = ZKPolicyClient()
+identity_client = clients.get(ZKIdentityClient)
+consent_client = clients.get(ZKConsentClient)
+document_client = clients.get(ZKDocumentClient)
+treatment_client = clients.get(ZKTreatmentClient)
+policy_client = clients.get(ZKPolicyClient)
 
 @router.get("/")
 async def patients_list(
     request: Request, 
     search: Optional[str] = None,
-    current_user: Dict = Depends(get_current_active_user)
+    current_user: Dict = Depends(get_current_active_user),
+    identities: IdentityLoader = Depends(get_identity_loader)
 ):
     """List patients view"""
     # Verify policy permission
@@ -87,6 +90,8 @@ async def patients_list(
         }
     ]
     
+    await resolve_names(identities, patients, ("id", "full_name"))
+    
     # Filter by search term if provided
     if search:
         patients = [p for p in patients if search.lower() in p["full_name"].lower()]
@@ -3,21 +3,30 @@ Policies router for ZK Health HMS
 """
 from fastapi import APIRouter, Depends, Request, Form, HTTPException, status
 from fastapi.templating import Jinja2Templates
-from fastapi.responses import RedirectResponse, JSONResponse
+from fastapi.responses import RedirectResponse, StreamingResponse
 from typing import Dict, List, Optional
+import asyncio
 import json
+import time
 import uuid
 from datetime import datetime
 
 from utils.auth import get_current_active_user
 from utils.api_client import ZKPolicyClient, ZKOracleClient
+from utils.clients import clients
+from utils import fastjson
+from utils.fastjson import FastJSONResponse
+from utils.config import settings
+from utils.policy_catalog import COUNTRIES, ROLES, ACTIONS
+from utils.policy_matrix import policy_matrix
+from utils.policy_table import allowed_actions_table
 
 router = APIRouter()
 templates = Jinja2Templates(directory="templates")
 
 # Initialize API clients
-policy_client = ZKPolicyClient()
-oracle_client = ZKOracleClient()
+policy_client = clients.get(ZKPolicyClient)
+oracle_client = clients.get(ZKOracleClient)
 
 @router.get("/")
 async def policy_dashboard(
@@ -32,35 +41,6 @@ async def policy_dashboard(
             detail="You don't have permission to access the policy dashboard"
         )
     
-    # Get list of supported countries
-    countries = [
-        {"code": "IN", "name": "India", "flag_emoji": "🇮🇳"},
-        {"code": "US", "name": "United States", "flag_emoji": "🇺🇸"},
-        {"code": "CA", "name": "Canada", "flag_emoji": "🇨🇦"},
-        {"code": "GB", "name": "United Kingdom", "flag_emoji": "🇬🇧"},
-        {"code": "AU", "name": "Australia", "flag_emoji": "🇦🇺"}
-    ]
-    
-    # Get list of defined roles
-    roles = [
-        {"id": "general_doctor", "name": "General Physician", "strength": 5},
-        {"id": "specialist", "name": "Specialist", "strength": 8},
-        {"id": "nurse", "name": "Nurse", "strength": 3},
-        {"id": "admin", "name": "Administrator", "strength": 2},
-        {"id": "researcher", "name": "Researcher", "strength": 4},
-        {"id": "compliance_officer", "name": "Compliance Officer", "strength": 6}
-    ]
-    
-    # Get list of actions
-    actions = [
-        {"id": "prescribe", "name": "Prescribe Medication", "min_strength": 5},
-        {"id": "diagnose", "name": "Diagnose Patient", "min_strength": 5},
-        {"id": "issue_certificate", "name": "Issue Medical Certificate", "min_strength": 8},
-        {"id": "refer", "name": "Refer Patient", "min_strength": 5},
-        {"id": "access_records", "name": "Access Medical Records", "min_strength": 3},
-        {"id": "edit_records", "name": "Edit Medical Records", "min_strength": 5}
-    ]
-    
     # Get validator organizations
     validators = [
         {"id": "mci_validator", "name": "Medical Council of India", "country": "IN"},
@@ -76,9 +56,9 @@ async def policy_dashboard(
             "request": request,
             "title": "Policy Management Dashboard",
             "user": current_user,
-            "countries": countries,
-            "roles": roles,
-            "actions": actions,
+            "countries": COUNTRIES,
+            "roles": ROLES,
+            "actions": ACTIONS,
             "validators": validators
         }
     )
@@ -136,9 +116,16 @@ async def simulate_validation(
     action: str = Form(...),
     country: str = Form(...),
     cross_jurisdiction: Optional[str] = Form(None),
+    mode: Optional[str] = Form(None),
     current_user: Dict = Depends(get_current_active_user)
 ):
-    """Simulate policy validation"""
+    """Simulate policy validation
+    
+    ``mode`` selects how policy and oracle validation are combined: ``serial``
+    (policy, then oracle if allowed), ``speculative`` (both concurrently, oracle
+    discarded on deny) or ``combined`` (single /validate/oracle call, falling
+    back to serial when its response carries no policy result).
+    """
     # Prepare validation request
     validation_request = {
         "actor": {
@@ -162,31 +149,176 @@ async def simulate_validation(
     if cross_jurisdiction:
         validation_request["cross_jurisdiction"] = cross_jurisdiction
     
-    # Validate against policy engine
-    policy_response = await policy_client.validate_action(validation_request)
+    combined_response = await _run_simulation(
+        validation_request, mode or settings.POLICY_SIMULATION_MODE
+    )
     
-    # For demonstration purposes, integrate with Oracle Chain Validator
-    if policy_response.get("allowed", False):
-        oracle_validation_request = {
-            "policy_request": validation_request,
-            "agreement_id": f"oracle_agreement_{country}_{action}",
-            "clause_ids": [f"clause_{country}_{action}_1", f"clause_{country}_{action}_2"]
-        }
+    return FastJSONResponse(content=combined_response)
+
+async def _timed(coro):
+    """Await a coroutine and return (result, elapsed ms)"""
+    started = time.perf_counter()
+    result = await coro
+    return result, (time.perf_counter() - started) * 1000
+
+def _combined_policy_result(oracle_response: Dict) -> Optional[Dict]:
+    """Policy decision carried by a /validate/oracle response, or None without one"""
+    if not isinstance(oracle_response, dict) or oracle_response.get("success") is False:
+        return None
+    policy_result = oracle_response.get("policy_result", oracle_response.get("PolicyResult"))
+    if not isinstance(policy_result, dict) or "allowed" not in policy_result:
+        return None
+    return policy_result
+
+def _oracle_request_for(validation_request: Dict) -> Dict:
+    """Oracle validation request for a simulated policy request"""
+    country = validation_request["location"]
+    action = validation_request["action"]
+    return {
+        "policy_request": validation_request,
+        "agreement_id": f"oracle_agreement_{country}_{action}",
+        "clause_ids": [f"clause_{country}_{action}_1", f"clause_{country}_{action}_2"]
+    }
+
+async def _run_simulation(validation_request: Dict, mode: str = "serial") -> Dict:
+    """Run policy and oracle validation for the simulator and report timing"""
+    started = time.perf_counter()
+    oracle_validation_request = _oracle_request_for(validation_request)
+    timing = {"mode": mode}
+    
+    precheck = policy_client.precheck
+    certainly_denied = precheck is not None and precheck.is_denied(
+        validation_request["actor"]["role"], validation_request["action"]
+    )
+    
+    policy_response = None
+    if mode == "combined" and not certainly_denied:
+        # Single call, used only when the oracle endpoint returns the policy result too
+        oracle_response, oracle_ms = await _timed(
+            policy_client.validate_policy_with_oracle(oracle_validation_request)
+        )
+        policy_response = _combined_policy_result(oracle_response)
+        if policy_response is None:
+            # Not a decision (error body or no policy result): validate serially instead
+            timing["combined_fallback"] = {
+                "reason": "oracle response has no policy result",
+                "oracle_ms": round(oracle_ms, 2)
+            }
+        else:
+            timing["oracle_ms"] = round(oracle_ms, 2)
+            if not policy_response.get("allowed", False):
+                oracle_response = None
+    
+    if policy_response is None and mode == "speculative" and not certainly_denied:
+        # Issue both concurrently; the oracle result only counts if policy allows
+        policy_task = asyncio.create_task(_timed(policy_client.validate_action(validation_request)))
+        oracle_task = asyncio.create_task(
+            _timed(policy_client.validate_policy_with_oracle(oracle_validation_request))
+        )
+        try:
+            policy_response, policy_ms = await policy_task
+        except Exception:
+            oracle_task.cancel()
+            raise
+        timing["policy_ms"] = round(policy_ms, 2)
         
-        oracle_response = await policy_client.validate_policy_with_oracle(oracle_validation_request)
+        if policy_response.get("allowed", False):
+            oracle_response, oracle_ms = await oracle_task
+            timing["oracle_ms"] = round(oracle_ms, 2)
+            wall_ms = (time.perf_counter() - started) * 1000
+            # Serial path would have paid both round trips back to back
+            timing["saved_ms"] = round(max(0.0, policy_ms + oracle_ms - wall_ms), 2)
+        else:
+            oracle_task.cancel()
+            oracle_response = None
+            timing["oracle_discarded"] = True
+            timing["saved_ms"] = 0.0
+    
+    elif policy_response is None:
+        # Validate against policy engine
+        policy_response, policy_ms = await _timed(policy_client.validate_action(validation_request))
+        timing["policy_ms"] = round(policy_ms, 2)
         
-        # Combine responses for display
-        combined_response = {
-            "policy_validation": policy_response,
-            "oracle_validation": oracle_response
+        # For demonstration purposes, integrate with Oracle Chain Validator
+        oracle_response = None
+        if policy_response.get("allowed", False):
+            oracle_response, oracle_ms = await _timed(
+                policy_client.validate_policy_with_oracle(oracle_validation_request)
+            )
+            timing["oracle_ms"] = round(oracle_ms, 2)
+    
+    timing["wall_ms"] = round((time.perf_counter() - started) * 1000, 2)
+    
+    # Combine responses for display
+    return {
+        "policy_validation": policy_response,
+        "oracle_validation": oracle_response,
+        "timing": timing
+    }
+
+@router.get("/matrix")
+async def policy_matrix_view(
+    request: Request,
+    current_user: Dict = Depends(get_current_active_user)
+):
+    """What-if matrix of every role x action x country"""
+    if current_user.get("role") not in ["admin", "compliance_officer"]:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You don't have permission to access the policy matrix"
+        )
+    
+    return templates.TemplateResponse(
+        "policies/matrix.html",
+        {
+            "request": request,
+            "title": "Policy What-If Matrix",
+            "user": current_user,
+            "countries": COUNTRIES,
+            "roles": ROLES,
+            "actions": ACTIONS,
+            "policy_version": policy_matrix.version()
         }
-    else:
-        combined_response = {
-            "policy_validation": policy_response,
-            "oracle_validation": None
+    )
+
+@router.get("/matrix/events")
+async def policy_matrix_events(
+    request: Request,
+    cross_border: bool = False,
+    current_user: Dict = Depends(get_current_active_user)
+):
+    """Server-sent events stream of matrix cells as they are decided"""
+    if current_user.get("role") not in ["admin", "compliance_officer"]:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You don't have permission to access the policy matrix"
+        )
+    
+    async def event_stream():
+        started = time.perf_counter()
+        cells = allowed = errors = 0
+        stream = policy_matrix.stream(cross_border)
+        try:
+            async for cell in stream:
+                cells += 1
+                allowed += cell["allowed"]
+                errors += cell["error"] is not None
+                yield f"event: cell\ndata: {fastjson.dumps_str(cell)}\n\n"
+                if await request.is_disconnected():
+                    break
+        finally:
+            await stream.aclose()
+        
+        summary = {
+            "policy_version": policy_matrix.version(),
+            "cells": cells,
+            "allowed": allowed,
+            "errors": errors,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 2)
         }
+        yield f"event: done\ndata: {fastjson.dumps_str(summary)}\n\n"
     
-    return JSONResponse(content=combined_response)
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
 
 @router.get("/allowed-actions")
 async def get_allowed_actions(
@@ -196,11 +328,31 @@ async def get_allowed_actions(
     current_user: Dict = Depends(get_current_active_user)
 ):
     """Get allowed actions for a role in a country"""
-    # Call policy client to get allowed actions
-    response = await policy_client.get_allowed_actions(role, country)
+    # Served from the precomputed table; unknown pairs fall back to the policy client
+    response = await allowed_actions_table.get_allowed_actions(role, country)
     
     return response
 
+@router.post("/allowed-actions/refresh")
+async def refresh_allowed_actions(
+    request: Request,
+    current_user: Dict = Depends(get_current_active_user)
+):
+    """Policy-update hook: refresh the precomputed allowed-actions table"""
+    if current_user.get("role") not in ["admin", "compliance_officer"]:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You don't have permission to refresh policy data"
+        )
+    
+    allowed_actions_table.request_refresh()
+    policy_matrix.invalidate()
+    
+    return FastJSONResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content={"success": True, "message": "Allowed-actions refresh scheduled"}
+    )
+
 @router.get("/cross-border")
 async def cross_border_rules(
     request: Request, 
@@ -214,15 +366,6 @@ async def cross_border_rules(
             detail="You don't have permission to access cross-border rules"
         )
     
-    # Get list of supported countries
-    countries = [
-        {"code": "IN", "name": "India", "flag_emoji": "🇮🇳"},
-        {"code": "US", "name": "United States", "flag_emoji": "🇺🇸"},
-        {"code": "CA", "name": "Canada", "flag_emoji": "🇨🇦"},
-        {"code": "GB", "name": "United Kingdom", "flag_emoji": "🇬🇧"},
-        {"code": "AU", "name": "Australia", "flag_emoji": "🇦🇺"}
-    ]
-    
     # Example cross-border rules (in a real implementation, these would come from your ZK Policy Engine)
     cross_border_rules = [
         {
@@ -257,7 +400,7 @@ async def cross_border_rules(
             "request": request,
             "title": "Cross-Border Policy Rules",
             "user": current_user,
-            "countries": countries,
+            "countries": COUNTRIES,
             "cross_border_rules": cross_border_rules
         }
     )
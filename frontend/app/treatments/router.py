@@ -3,13 +3,19 @@ Treatments router for ZK Health HMS
 """
 from fastapi import APIRouter, Depends, Request, Form, HTTPException, status
 from fastapi.templating import Jinja2Templates
-from fastapi.responses import RedirectResponse
+from fastapi.responses import RedirectResponse, StreamingResponse
 from typing import Dict, List, Optional
+import asyncio
 import json
 import uuid
 from datetime import datetime, timedelta
 
 from utils.auth import get_current_active_user
+from utils.clients import clients
+from utils import fastjson
+from utils.fastjson import FastJSONResponse
+from utils.jobs import validation_jobs, QueueFull
+from utils.loaders import IdentityLoader, get_identity_loader, resolve_names
 from utils.api_client import (
     ZKTreatmentClient, ZKPolicyClient, ZKConsentClient, ZKOracleClient
 )
@@ -18,16 +24,17 @@ router = APIRouter()
 templates = Jinja2Templates(directory="templates")
 
 # Initialize API clients
-treatment_client = ZKTreatmentClient()
-policy_client = ZKPolicyClient()
-consent_client = ZKConsentClient()
-oracle_client = ZKOracleClient()
+treatment_client = clients.get(ZKTreatmentClient)
+policy_client = clients.get(ZKPolicyClient)
+consent_client = clients.get(ZKConsentClient)
+oracle_client = clients.get(ZKOracleClient)
 
 @router.get("/")
 async def treatment_list(
     request: Request, 
     status_filter: Optional[str] = None,
-    current_user: Dict = Depends(get_current_active_user)
+    current_user: Dict = Depends(get_current_active_user),
+    identities: IdentityLoader = Depends(get_identity_loader)
 ):
     """List treatments view"""
     # Verify policy permission
@@ -95,6 +102,11 @@ async def treatment_list(
     if status_filter:
         treatments = [t for t in treatments if t["status"].lower() == status_filter.lower()]
     
+    # Resolve every patient and doctor name on the page in one round of lookups
+    await resolve_names(
+        identities, treatments, ("patient_id", "patient_name"), ("doctor_id", "doctor_name")
+    )
+    
     return templates.TemplateResponse(
         "treatments/list.html",
         {
@@ -177,7 +189,63 @@ async def create_treatment(
     notes: Optional[str] = Form(None),
     current_user: Dict = Depends(get_current_active_user)
 ):
-    """Handle treatment plan creation form submission"""
+    """Handle treatment plan creation form submission
+    
+    Policy/oracle validation, consent checks and vector creation run as a
+    background job; the response carries a job ID to poll for completion.
+    With several server workers the job is awaited and its result returned,
+    since a status poll may reach a worker that does not hold the job.
+    """
+    # Generate treatment vector ID
+    treatment_id = f"TV{uuid.uuid4().hex[:8].upper()}"
+    
+    treatment_form = {
+        "patient_id": patient_id,
+        "condition": condition,
+        "description": description,
+        "treatment_plan": treatment_plan,
+        "medications": medications,
+        "start_date": start_date,
+        "estimated_end_date": estimated_end_date,
+        "next_appointment": next_appointment,
+        "notes": notes
+    }
+    
+    try:
+        job = validation_jobs.submit(
+            "create_treatment",
+            lambda: _validate_and_create_treatment(current_user, treatment_id, treatment_form),
+            owner=current_user.get("id")
+        )
+    except QueueFull:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Treatment validation queue is full, please retry shortly",
+            headers={"Retry-After": "2"}
+        )
+    
+    if not validation_jobs.pollable:
+        # Other workers cannot see this job, so answer once it has finished
+        await job.done.wait()
+        if job.status != "succeeded":
+            raise HTTPException(status_code=job.error["status_code"], detail=job.error["detail"])
+        return job.result
+    
+    return FastJSONResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content={
+            "job_id": job.id,
+            "treatment_id": treatment_id,
+            "status": job.status,
+            "status_url": f"/treatments/jobs/{job.id}",
+            "events_url": f"/treatments/jobs/{job.id}/events"
+        }
+    )
+
+async def _validate_and_create_treatment(current_user: Dict, treatment_id: str, treatment_form: Dict) -> Dict:
+    """Validate a treatment plan against policy/oracle and create its vector"""
+    patient_id = treatment_form["patient_id"]
+    
     # Verify policy permission
     policy_request = {
         "actor": {
@@ -222,7 +290,7 @@ async def create_treatment(
             "patient_id": patient_id,
             "provider_id": current_user.get("id"),
             "scope": "treatment_plan",
-            "purpose": f"Treatment for {condition}",
+            "purpose": f"Treatment for {treatment_form['condition']}",
             "valid_from": datetime.now().isoformat(),
             "valid_until": None,  # No expiration
             "data_use_policy": "Treatment and follow-up care"
@@ -233,22 +301,11 @@ async def create_treatment(
         # For demo purposes, we'll proceed as if consent was granted
         # In a real implementation, you'd wait for patient approval
     
-    # Generate treatment vector ID
-    treatment_id = f"TV{uuid.uuid4().hex[:8].upper()}"
-    
     # Create treatment vector using ZK Treatment API
     treatment_data = {
         "id": treatment_id,
-        "patient_id": patient_id,
+        **treatment_form,
         "provider_id": current_user.get("id"),
-        "condition": condition,
-        "description": description,
-        "treatment_plan": treatment_plan,
-        "medications": medications,
-        "start_date": start_date,
-        "estimated_end_date": estimated_end_date,
-        "next_appointment": next_appointment,
-        "notes": notes,
         "status": "Active",
         "country": current_user.get("country"),
         "zk_proof": f"proof_{uuid.uuid4().hex}"  # In real implementation, this would be generated
@@ -262,17 +319,54 @@ async def create_treatment(
             detail=f"Failed to create treatment vector: {treatment_response.get('error', 'Unknown error')}"
         )
     
-    # Redirect to treatment detail page
-    return RedirectResponse(
-        url=f"/treatments/{treatment_id}", 
-        status_code=status.HTTP_303_SEE_OTHER
-    )
+    return {"treatment_id": treatment_id, "redirect_url": f"/treatments/{treatment_id}"}
+
+def _get_owned_job(job_id: str, current_user: Dict):
+    """Look up a job, hiding jobs submitted by other users"""
+    job = validation_jobs.get(job_id)
+    if job is None or job.owner != current_user.get("id"):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    return job
+
+@router.get("/jobs/{job_id}")
+async def treatment_job_status(
+    job_id: str,
+    current_user: Dict = Depends(get_current_active_user)
+):
+    """Status of a background treatment creation job"""
+    return _get_owned_job(job_id, current_user).to_dict()
+
+@router.get("/jobs/{job_id}/events")
+async def treatment_job_events(
+    request: Request,
+    job_id: str,
+    current_user: Dict = Depends(get_current_active_user)
+):
+    """Server-sent events stream reporting job status until it finishes"""
+    job = _get_owned_job(job_id, current_user)
+    
+    async def event_stream():
+        last_status = None
+        while True:
+            if job.status != last_status:
+                last_status = job.status
+                yield f"event: status\ndata: {fastjson.dumps_str(job.to_dict())}\n\n"
+            if job.done.is_set() or await request.is_disconnected():
+                break
+            try:
+                await asyncio.wait_for(job.done.wait(), timeout=15.0)
+            except asyncio.TimeoutError:
+                # Keep-alive comment so proxies don't close the stream
+                yield ": keep-alive\n\n"
+    
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
 
 @router.get("/{treatment_id}")
 async def treatment_detail(
     request: Request,
     treatment_id: str,
-    current_user: Dict = Depends(get_current_active_user)
+    current_user: Dict = Depends(get_current_active_user),
+    identities: IdentityLoader = Depends(get_identity_loader)
 ):
     """Treatment detail view"""
     # Verify policy permission
@@ -317,6 +411,10 @@ async def treatment_detail(
         "last_updated": "2025-04-15"
     }
     
+    await resolve_names(
+        identities, [treatment], ("patient_id", "patient_name"), ("doctor_id", "doctor_name")
+    )
+    
     # Get treatment history/updates
     treatment_updates = [
         {
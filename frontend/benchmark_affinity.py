@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Patient-affinity routing benchmark for the ZK Health HMS frontend
+
+Runs the real API client and node pool against a local stand-in for a
+multi-node ZK API cluster. Each stand-in node keeps an LRU cache of per-patient
+data, answers cache hits quickly and misses slowly. The same skewed patient
+workload is replayed with power-of-two-choices routing and with consistent-hash
+patient affinity, and cache hit rate, latency and per-node load are compared.
+Halfway through each run one node goes down, to exercise ring fallback.
+
+Usage:
+    python benchmark_affinity.py [--nodes 4] [--patients 2000] [--requests 20000]
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections import OrderedDict
+from typing import Dict, List
+
+import httpx
+
+from utils.api_client import ZKConsentClient
+from utils.load_balancer import ApiNode, NodePool
+
+
+class StandInNode:
+    """One simulated API node with a per-patient LRU cache"""
+
+    def __init__(self, cache_size: int, hit_ms: float, miss_ms: float):
+        self.cache: "OrderedDict[str, bool]" = OrderedDict()
+        self.cache_size = cache_size
+        self.hit_ms = hit_ms
+        self.miss_ms = miss_ms
+        self.hits = 0
+        self.misses = 0
+        self.down = False
+
+    async def handle(self, patient_id: str) -> httpx.Response:
+        if patient_id in self.cache:
+            self.cache.move_to_end(patient_id)
+            self.hits += 1
+            await asyncio.sleep(self.hit_ms / 1000)
+        else:
+            self.misses += 1
+            await asyncio.sleep(self.miss_ms / 1000)
+            self.cache[patient_id] = True
+            if len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+        return httpx.Response(200, json={"user_id": patient_id, "consents": []})
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def patient_workload(patients: int, requests: int, skew: float, seed: int) -> List[str]:
+    """Zipf-like patient IDs: a few patients are requested far more often"""
+    rng = random.Random(seed)
+    weights = [1 / (rank + 1) ** skew for rank in range(patients)]
+    return [f"pat{index}" for index in rng.choices(range(patients), weights=weights, k=requests)]
+
+
+async def run_routing(routing: str, workload: List[str], args) -> Dict:
+    """Replay the workload through the API client with one routing policy"""
+    stand_ins = {
+        f"node-{i}": StandInNode(args.cache_size, args.hit_ms, args.miss_ms)
+        for i in range(args.nodes)
+    }
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        node = stand_ins[request.url.host]
+        if node.down:
+            raise httpx.ConnectError("node down", request=request)
+        return await node.handle(request.url.path.rsplit("/", 1)[-1])
+
+    pool = NodePool("http://localhost:8080", "", routing=routing, eject_after=1, eject_seconds=3600)
+    pool.set_nodes([ApiNode(f"http://{host}:8080", host) for host in stand_ins])
+
+    client = ZKConsentClient()
+    client.base_url = "http://localhost:8080/api/consent"
+    client.use_node_pool(pool)
+    client.transport = httpx.MockTransport(handler)
+
+    semaphore = asyncio.Semaphore(args.concurrency)
+    latencies = []
+    failures = 0
+    fail_at = len(workload) // 2
+
+    async def call(patient_id: str):
+        nonlocal failures
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                await client.list_user_consents(patient_id)
+            except httpx.HTTPError:
+                failures += 1
+            else:
+                latencies.append((time.perf_counter() - started) * 1000)
+            if len(latencies) + failures == fail_at:
+                stand_ins["node-0"].down = True
+
+    started = time.perf_counter()
+    await asyncio.gather(*(call(patient_id) for patient_id in workload))
+    elapsed = time.perf_counter() - started
+
+    hits = sum(node.hits for node in stand_ins.values())
+    misses = sum(node.misses for node in stand_ins.values())
+    served = {host: node.hits + node.misses for host, node in stand_ins.items()}
+    return {
+        "hit_rate": round(hits / max(1, hits + misses), 4),
+        "req_per_sec": round(len(latencies) / elapsed, 1),
+        "mean_ms": round(sum(latencies) / max(1, len(latencies)), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+        "failures": failures,
+        "served_per_node": served,
+        "affinity_spilled": pool.affinity_spilled
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark patient-affinity routing")
+    parser.add_argument("--nodes", type=int, default=4, help="Stand-in API nodes")
+    parser.add_argument("--patients", type=int, default=2000, help="Distinct patients")
+    parser.add_argument("--requests", type=int, default=20000, help="Requests to replay")
+    parser.add_argument("--concurrency", type=int, default=32, help="Concurrent requests")
+    parser.add_argument("--cache-size", type=int, default=300, help="Patients cached per node")
+    parser.add_argument("--skew", type=float, default=0.8, help="Zipf exponent of patient popularity")
+    parser.add_argument("--hit-ms", type=float, default=1.0, help="Node latency on a cache hit")
+    parser.add_argument("--miss-ms", type=float, default=8.0, help="Node latency on a cache miss")
+    parser.add_argument("--seed", type=int, default=42, help="Workload random seed")
+    parser.add_argument("--output", default="benchmark_affinity_results.json", help="Results file")
+    args = parser.parse_args()
+
+    workload = patient_workload(args.patients, args.requests, args.skew, args.seed)
+    results = {}
+    for routing in ("p2c", "affinity"):
+        print(f"Replaying {len(workload)} requests with {routing} routing...")
+        random.seed(args.seed)
+        results[routing] = asyncio.run(run_routing(routing, workload, args))
+
+    print()
+    print(f"{'Routing':<10} {'hit rate':>9} {'req/s':>9} {'mean ms':>9} {'p99 ms':>9} {'failures':>9}  served per node")
+    for routing, stats in results.items():
+        print(
+            f"{routing:<10} {stats['hit_rate']:>9.1%} {stats['req_per_sec']:>9.1f} "
+            f"{stats['mean_ms']:>9.2f} {stats['p99_ms']:>9.2f} {stats['failures']:>9}  "
+            f"{list(stats['served_per_node'].values())}"
+        )
+
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+JSON serialization micro-benchmark for the ZK Health HMS frontend
+
+Compares the standard library JSON path with utils.fastjson (orjson) on
+realistic oracle agreement and treatment payloads, for the three places the
+frontend serializes JSON: rendering responses, encoding backend request bodies
+and decoding backend response bodies.
+
+Usage:
+    python benchmark_json.py [--iterations 2000] [--treatments 200]
+"""
+import argparse
+import json
+import random
+import timeit
+from typing import Callable, Dict, List
+
+from fastapi.responses import JSONResponse
+
+from utils import fastjson
+from utils.fastjson import FastJSONResponse
+
+
+def agreement_payload(clauses: int = 40) -> Dict:
+    """Oracle agreement with clause-level validation results"""
+    return {
+        "id": "ora102",
+        "name": "Cross-Border Telemedicine Agreement",
+        "description": "Agreement governing telemedicine consultations between India and the United States.",
+        "type": "legal_compliance",
+        "country": "IN",
+        "cross_jurisdiction": "US",
+        "created_by": "admin",
+        "created_date": "2025-02-22",
+        "status": "Active",
+        "clauses": [
+            {
+                "id": f"clause{i}",
+                "text": f"Clause {i}: practitioner credentials and patient consent are verified "
+                        f"under both jurisdictions before consultation.",
+                "mandatory": i % 3 != 0,
+                "validators": ["Medical Council of India", "US HHS"]
+            }
+            for i in range(1, clauses + 1)
+        ],
+        "validation": {
+            "valid": True,
+            "validated_clauses": [f"clause{i}" for i in range(1, clauses + 1)],
+            "failed_clauses": [],
+            "clause_latency_ms": {f"clause{i}": round(random.uniform(5, 80), 3) for i in range(1, clauses + 1)},
+            "zk_proof": "0x" + "ab12cd34" * 64
+        }
+    }
+
+
+def treatment_payload(count: int = 200) -> List[Dict]:
+    """Treatment vectors with medications and vitals history"""
+    conditions = ["Hypertension", "Diabetes Type 2", "Asthma", "Fractured Wrist", "Migraine"]
+    return [
+        {
+            "id": f"tr{1000 + i}",
+            "patient_id": f"pat{2000 + i}",
+            "doctor_id": f"doc{300 + i % 25}",
+            "condition": conditions[i % len(conditions)],
+            "start_date": "2025-02-01",
+            "end_date": None,
+            "status": "Active",
+            "medications": [
+                {"name": "Lisinopril", "dose": "10mg", "frequency": "once daily"},
+                {"name": "Metformin", "dose": "500mg", "frequency": "twice daily"}
+            ],
+            "vitals": [
+                {"day": day, "systolic": random.randint(110, 150), "diastolic": random.randint(70, 95),
+                 "heart_rate": random.randint(60, 100), "temperature": round(random.uniform(36.1, 37.5), 1)}
+                for day in range(30)
+            ],
+            "vector": [round(random.random(), 6) for _ in range(64)],
+            "notes": "Monitor blood pressure weekly; review medication at next appointment."
+        }
+        for i in range(count)
+    ]
+
+
+def stdlib_decode(body: bytes):
+    """What httpx's Response.json() does: decode to str, then parse"""
+    return json.loads(body.decode("utf-8"))
+
+
+def measure(func: Callable, iterations: int) -> float:
+    """Best-of-3 microseconds per call"""
+    return min(timeit.repeat(func, number=iterations, repeat=3)) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark JSON serialization paths")
+    parser.add_argument("--iterations", type=int, default=2000, help="Calls per measurement")
+    parser.add_argument("--treatments", type=int, default=200, help="Treatment vectors in the list payload")
+    parser.add_argument("--output", default="benchmark_json_results.json", help="Results file")
+    args = parser.parse_args()
+
+    random.seed(42)
+    payloads = {
+        "agreement": agreement_payload(),
+        "treatments": treatment_payload(args.treatments)
+    }
+
+    print(f"Fast JSON backend: {fastjson.BACKEND}")
+    results = {}
+    for name, payload in payloads.items():
+        body = fastjson.dumps(payload)
+        cases = {
+            "response render": (
+                lambda: JSONResponse(payload).body,
+                lambda: FastJSONResponse(payload).body
+            ),
+            "request encode": (
+                lambda: json.dumps(payload).encode("utf-8"),
+                lambda: fastjson.dumps(payload)
+            ),
+            "response decode": (
+                lambda: stdlib_decode(body),
+                lambda: fastjson.loads(body)
+            )
+        }
+
+        results[name] = {"bytes": len(body)}
+        for case, (stdlib_func, fast_func) in cases.items():
+            stdlib_us = measure(stdlib_func, args.iterations)
+            fast_us = measure(fast_func, args.iterations)
+            results[name][case] = {
+                "stdlib_us": round(stdlib_us, 2),
+                "fast_us": round(fast_us, 2),
+                "speedup": round(stdlib_us / fast_us, 2) if fast_us else None
+            }
+
+    print()
+    print(f"{'Payload':<12} {'Operation':<16} {'stdlib us':>10} {'fast us':>10} {'speedup':>8}")
+    for name, cases in results.items():
+        for case, stats in cases.items():
+            if case == "bytes":
+                continue
+            print(
+                f"{name:<12} {case:<16} {stats['stdlib_us']:>10.2f} "
+                f"{stats['fast_us']:>10.2f} {stats['speedup']:>7.2f}x"
+            )
+        print(f"{name:<12} {'payload size':<16} {cases['bytes']:>10} bytes")
+
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
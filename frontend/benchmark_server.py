@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Server runtime benchmark for the ZK Health HMS frontend
+
+Starts the frontend under each launcher configuration and measures requests/sec
+and latency percentiles on /health and on the templated landing page.
+
+Usage:
+    python benchmark_server.py [--requests 5000] [--concurrency 64] [--workers 4]
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+import httpx
+
+from utils.server import detect_runtime
+
+ENDPOINTS = {
+    "health": "/health",
+    "templated_page": "/"
+}
+
+
+def server_configurations(workers: int) -> List[Dict]:
+    """Launcher configurations to compare"""
+    python = sys.executable
+    configurations = [
+        {
+            "name": "uvicorn asyncio/h11 x1",
+            "command": [python, "-m", "uvicorn", "main:app", "--loop", "asyncio", "--http", "h11"]
+        }
+    ]
+
+    runtime = detect_runtime()
+    if runtime["loop"] == "uvloop" or runtime["http"] == "httptools":
+        configurations.append({
+            "name": f"uvicorn {runtime['loop']}/{runtime['http']} x1",
+            "command": [python, "-m", "uvicorn", "main:app",
+                        "--loop", runtime["loop"], "--http", runtime["http"]]
+        })
+
+    configurations.append({
+        "name": f"production {runtime['loop']}/{runtime['http']} x{workers}",
+        "command": [python, "main.py", "--production", "--workers", str(workers)]
+    })
+    return configurations
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+async def wait_until_ready(base_url: str, timeout: float = 30.0):
+    """Poll /health until the server answers"""
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            try:
+                response = await client.get(f"{base_url}/health", timeout=1.0)
+                if response.status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"Server at {base_url} did not become ready")
+
+
+async def load_endpoint(base_url: str, path: str, total_requests: int, concurrency: int) -> Dict:
+    """Fire total_requests at path with a fixed number of concurrent clients"""
+    latencies: List[float] = []
+    errors = 0
+    remaining = total_requests
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits) as client:
+        async def worker():
+            nonlocal remaining, errors
+            while remaining > 0:
+                remaining -= 1
+                start = time.perf_counter()
+                try:
+                    response = await client.get(path, timeout=10.0)
+                    if response.status_code >= 400:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append((time.perf_counter() - start) * 1000)
+
+        # Warm up connections and templates before measuring
+        await asyncio.gather(*(client.get(path) for _ in range(concurrency)))
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "req_per_sec": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 50),
+        "p99_ms": percentile(latencies, 99)
+    }
+
+
+def run_configuration(configuration: Dict, port: int, total_requests: int, concurrency: int) -> Dict:
+    """Start one server configuration, benchmark every endpoint, then stop it"""
+    env = dict(os.environ, HOST="127.0.0.1", PORT=str(port), DEBUG="false")
+    command = configuration["command"]
+    if "uvicorn" in command:
+        command = command + ["--host", "127.0.0.1", "--port", str(port), "--no-access-log"]
+
+    process = subprocess.Popen(command, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        asyncio.run(wait_until_ready(base_url))
+        return {
+            name: asyncio.run(load_endpoint(base_url, path, total_requests, concurrency))
+            for name, path in ENDPOINTS.items()
+        }
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark frontend server runtimes")
+    parser.add_argument("--requests", type=int, default=5000, help="Requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=64, help="Concurrent clients")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Workers for the production configuration")
+    parser.add_argument("--port", type=int, default=8765, help="Port to bind during the benchmark")
+    parser.add_argument("--output", default="benchmark_server_results.json", help="Results file")
+    args = parser.parse_args()
+
+    results = {}
+    for configuration in server_configurations(args.workers):
+        print(f"Benchmarking {configuration['name']}...")
+        results[configuration["name"]] = run_configuration(
+            configuration, args.port, args.requests, args.concurrency
+        )
+
+    print()
+    print(f"{'Configuration':<36} {'Endpoint':<16} {'req/s':>10} {'p50 ms':>9} {'p99 ms':>9} {'errors':>7}")
+    for name, endpoints in results.items():
+        for endpoint, stats in endpoints.items():
+            print(
+                f"{name:<36} {endpoint:<16} {stats['req_per_sec']:>10.1f} "
+                f"{stats['p50_ms']:>9.2f} {stats['p99_ms']:>9.2f} {stats['errors']:>7}"
+            )
+
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,34 +6,49 @@ a secure and privacy-focused interface for hospital management.
 """
 
 import os
-import uvicorn
+import time
+
+_import_started = time.perf_counter()
+
 from fastapi import FastAPI, Request, Depends, HTTPException, status
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from datetime import datetime, timedelta
 
-# Import routers
-from app.auth import router as auth_router
-from app.dashboard import router as dashboard_router
-from app.patients import router as patients_router
-from app.consultations import router as consultations_router
-from app.documents import router as documents_router
-from app.treatments import router as treatments_router
-from app.policies import router as policies_router
-from app.oracle import router as oracle_router
-from app.analytics import router as analytics_router
-from app.admin import router as admin_router
-
 # Import config and utilities
 from utils.config import settings
 from utils.auth import get_current_user
+from utils.bulkhead import Bulkhead, BulkheadMiddleware
+from utils.fastjson import FastJSONResponse
+from utils.metrics import metrics_registry
+from utils.policy_table import allowed_actions_table
+from utils.jobs import validation_jobs
+from utils.load_balancer import api_nodes
+from utils.routers import RouterSpec, RouterRegistry
+from utils.timeouts import api_timeouts
+
+# Router registry: modules are resolved at startup, missing ones are skipped
+ROUTERS = [
+    RouterSpec("app.auth.router", "/auth", ["Authentication"]),
+    RouterSpec("app.dashboard.router", "/dashboard", ["Dashboard"]),
+    RouterSpec("app.patients.router", "/patients", ["Patient Management"]),
+    RouterSpec("app.consultations.router", "/consultations", ["Consultations"]),
+    RouterSpec("app.documents.router", "/documents", ["Document Management"]),
+    RouterSpec("app.treatments.router", "/treatments", ["Treatment Plans"]),
+    RouterSpec("app.policies.router", "/policies", ["Policy Management"]),
+    RouterSpec("app.oracle.router", "/oracle", ["Oracle Agreements"]),
+    RouterSpec("app.analytics.router", "/analytics", ["Analytics"]),
+    RouterSpec("app.admin.router", "/admin", ["Administration"]),
+]
 
 # Create FastAPI app
 app = FastAPI(
     title="ZK Health - Hospital Management System",
     description="A secure, privacy-focused hospital management system using ZK-Proof technology",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=FastJSONResponse
 )
 
 # Configure CORS
@@ -45,23 +60,75 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Admission control: isolate heavy routes so they cannot starve login and patient pages
+bulkheads = {
+    name: metrics_registry.register(Bulkhead(
+        name,
+        max_in_flight=max_in_flight,
+        max_queue=settings.BULKHEAD_MAX_QUEUE,
+        queue_timeout=settings.BULKHEAD_QUEUE_TIMEOUT
+    ))
+    for name, max_in_flight in [
+        ("auth", settings.BULKHEAD_AUTH_MAX_IN_FLIGHT),
+        ("patients", settings.BULKHEAD_PATIENTS_MAX_IN_FLIGHT),
+        ("heavy", settings.BULKHEAD_HEAVY_MAX_IN_FLIGHT),
+        ("default", settings.BULKHEAD_DEFAULT_MAX_IN_FLIGHT)
+    ]
+}
+
+app.add_middleware(
+    BulkheadMiddleware,
+    pools=bulkheads,
+    routes=[
+        ("/auth", "auth"),
+        ("/patients", "patients"),
+        ("/treatments/analytics", "heavy"),
+        ("/policies/simulate", "heavy"),
+        ("/policies/matrix/events", "heavy"),
+        ("/health", None),
+        ("/metrics", None),
+        ("/static", None)
+    ],
+    default_pool="default",
+    retry_after=settings.BULKHEAD_RETRY_AFTER
+)
+
 # Set up static files
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
 # Set up templates
 templates = Jinja2Templates(directory="templates")
 
-# Include routers
-app.include_router(auth_router.router, prefix="/auth", tags=["Authentication"])
-app.include_router(dashboard_router.router, prefix="/dashboard", tags=["Dashboard"])
-app.include_router(patients_router.router, prefix="/patients", tags=["Patient Management"])
-app.include_router(consultations_router.router, prefix="/consultations", tags=["Consultations"])
-app.include_router(documents_router.router, prefix="/documents", tags=["Document Management"])
-app.include_router(treatments_router.router, prefix="/treatments", tags=["Treatment Plans"])
-app.include_router(policies_router.router, prefix="/policies", tags=["Policy Management"])
-app.include_router(oracle_router.router, prefix="/oracle", tags=["Oracle Agreements"])
-app.include_router(analytics_router.router, prefix="/analytics", tags=["Analytics"])
-app.include_router(admin_router.router, prefix="/admin", tags=["Administration"])
+# Include routers (lazy mode imports each router on its first request)
+router_registry = RouterRegistry(ROUTERS)
+router_registry.install(app, lazy=settings.LAZY_ROUTERS)
+app.state.router_registry = router_registry
+
+@app.on_event("startup")
+async def discover_api_nodes():
+    """Discover ZK API nodes before other startup work calls the API"""
+    if settings.LB_ENABLED:
+        await api_nodes.start()
+
+@app.on_event("shutdown")
+async def stop_api_node_discovery():
+    """Stop background API node discovery"""
+    await api_nodes.stop()
+
+@app.on_event("startup")
+async def warm_policy_tables():
+    """Precompute allowed actions for every (role, country) pair"""
+    await allowed_actions_table.start()
+
+@app.on_event("shutdown")
+async def stop_policy_tables():
+    """Stop background policy table refresh"""
+    await allowed_actions_table.stop()
+
+@app.on_event("shutdown")
+async def stop_job_workers():
+    """Stop background job workers"""
+    await validation_jobs.stop()
 
 @app.get("/")
 async def root(request: Request):
@@ -80,11 +147,52 @@ async def health():
         "version": "1.0.0"
     }
 
+@app.get("/metrics")
+async def metrics():
+    """Metrics endpoint (Prometheus text format)"""
+    return PlainTextResponse(metrics_registry.render())
+
+if settings.DEBUG:
+    # Exposes internal operation names and latencies, so only in debug mode
+    @app.get("/debug/timeouts")
+    async def debug_timeouts():
+        """Current adaptive API timeouts and observed latency per client operation"""
+        return {
+            "adaptive": settings.API_TIMEOUT_ADAPTIVE,
+            "multiplier": api_timeouts.multiplier,
+            "bounds_seconds": [api_timeouts.minimum, api_timeouts.maximum],
+            "default_seconds": api_timeouts.default,
+            "operations": api_timeouts.snapshot()
+        }
+
+# Time spent importing dependencies and building the app
+startup_seconds = time.perf_counter() - _import_started
+
+def profile_startup():
+    """Report app setup time and per-router import time"""
+    router_registry.preload()
+    print(f"{startup_seconds * 1000:9.2f} ms  main (module load, including eager router imports)")
+    for line in router_registry.report():
+        print(line)
+
 if __name__ == "__main__":
+    import argparse
+    from utils.server import run_development, run_production
+    
+    parser = argparse.ArgumentParser(description="ZK Health HMS frontend server")
+    parser.add_argument("--production", action="store_true",
+                        help="Run multi-worker production server (gunicorn + uvicorn workers)")
+    parser.add_argument("--workers", type=int, help="Number of worker processes")
+    parser.add_argument("--max-requests", type=int,
+                        help="Recycle each worker after this many requests (0 disables)")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="Report per-module import time and exit")
+    args = parser.parse_args()
+    
     # Run the application
-    uvicorn.run(
-        "main:app",
-        host=settings.HOST,
-        port=settings.PORT,
-        reload=settings.DEBUG
-    )
+    if args.profile_startup:
+        profile_startup()
+    elif args.production:
+        run_production("main:app", workers=args.workers, max_requests=args.max_requests)
+    else:
+        run_development("main:app")
@@ -1,11 +1,17 @@
 """
 API Client utilities for interacting with ZK Health Infrastructure
 """
+import asyncio
 import json
+import time
 import httpx
 from typing import Dict, List, Any, Optional
+from utils import fastjson
 from utils.config import settings
 
+# Request fields identifying the patient/owner a request is about (for node affinity)
+AFFINITY_FIELDS = ("patient_id", "owner_id", "user_id")
+
 class ZKBaseClient:
     """Base client for ZK Health API interactions"""
     
@@ -15,25 +21,79 @@ class ZKBaseClient:
             "Content-Type": "application/json",
             "Accept": "application/json"
         }
+        self.node_pool = None
+        self.base_path = None
+        # Optional httpx transport (e.g. httpx.MockTransport for local stand-ins)
+        self.transport = None
+        self.hedge_policy = None
+        self.timeouts = None
+    
+    def use_node_pool(self, node_pool):
+        """Spread requests over the nodes of a utils.load_balancer.NodePool
+        
+        Only clients whose base URL sits under the pool's seed URL are balanced;
+        the remainder of the URL (e.g. /api/identity) is kept as the path prefix.
+        """
+        if self.base_url.startswith(node_pool.seed_url):
+            self.node_pool = node_pool
+            self.base_path = self.base_url[len(node_pool.seed_url):]
+    
+    def use_hedging(self, hedge_policy):
+        """Hedge slow idempotent GETs with a utils.hedging.HedgePolicy"""
+        self.hedge_policy = hedge_policy
+    
+    def use_adaptive_timeouts(self, timeouts):
+        """Take per-operation timeouts from a utils.timeouts.AdaptiveTimeouts"""
+        self.timeouts = timeouts
+    
+    @staticmethod
+    def _affinity_key(data: Any, params: Optional[Dict]) -> Optional[str]:
+        """Patient/owner ID carried in the request body or query, if any"""
+        for source in (data, params):
+            if isinstance(source, dict):
+                for field in AFFINITY_FIELDS:
+                    if source.get(field):
+                        return str(source[field])
+        return None
     
     async def _make_request(self, method: str, endpoint: str, data: Any = None, 
-                           params: Dict = None, headers: Dict = None) -> Dict:
-        """Make HTTP request to API"""
-        url = f"{self.base_url}{endpoint}"
+                           params: Dict = None, headers: Dict = None,
+                           affinity_key: Optional[str] = None,
+                           operation: Optional[str] = None, hedge: bool = False) -> Dict:
+        """Make HTTP request to API
+        
+        ``affinity_key`` (default: a patient/owner ID found in ``data`` or
+        ``params``) lets an affinity-routing node pool pin the patient to a node.
+        ``hedge`` marks an idempotent GET that may be hedged when hedging is
+        enabled. Latency (for hedging and adaptive timeouts) is tracked per
+        ``operation``; requests without one use the fixed 30s timeout.
+        """
         request_headers = self.headers.copy()
         
         if headers:
             request_headers.update(headers)
         
-        async with httpx.AsyncClient() as client:
-            response = await client.request(
-                method=method,
-                url=url,
-                json=data,
-                params=params,
-                headers=request_headers,
-                timeout=30.0
-            )
+        # Bodies are encoded/decoded as bytes to skip httpx's str round trip
+        content = fastjson.dumps(data) if data is not None else None
+        
+        if affinity_key is None:
+            affinity_key = self._affinity_key(data, params)
+        
+        operation_key = f"{type(self).__name__}.{operation}" if operation else None
+        
+        async with httpx.AsyncClient(transport=self.transport) as client:
+            def send(tried):
+                return self._send(
+                    client, method, endpoint, content, params, request_headers,
+                    affinity_key, tried, operation_key
+                )
+            
+            if hedge and method == "GET" and self.hedge_policy is not None:
+                response = await self.hedge_policy.run(
+                    operation_key or f"{type(self).__name__}.{endpoint}", send
+                )
+            else:
+                response = await send([])
             
             if response.status_code >= 400:
                 error_msg = f"API Error: {response.status_code} - {response.text}"
@@ -41,9 +101,71 @@ class ZKBaseClient:
                 return {"success": False, "error": error_msg}
             
             try:
-                return response.json()
+                return fastjson.loads(response.content)
             except:
                 return {"success": True, "data": response.text}
+    
+    async def _send(self, client: httpx.AsyncClient, method: str, endpoint: str,
+                    content: Optional[bytes], params: Optional[Dict], headers: Dict,
+                    affinity_key: Optional[str] = None, tried: Optional[List] = None,
+                    operation_key: Optional[str] = None) -> httpx.Response:
+        """Send one request, through the node pool when one is configured
+        
+        Nodes already in ``tried`` are avoided and every node used is appended to it.
+        """
+        if self.node_pool is None:
+            return await self._request(
+                client, method, f"{self.base_url}{endpoint}", content, params, headers, operation_key
+            )
+        
+        tried = [] if tried is None else tried
+        attempts = 0
+        while True:
+            node = self.node_pool.acquire(exclude=tried, affinity_key=affinity_key)
+            tried.append(node)
+            attempts += 1
+            started = time.perf_counter()
+            ok = False
+            try:
+                response = await self._request(
+                    client, method, f"{node.url}{self.base_path}{endpoint}",
+                    content, params, headers, operation_key
+                )
+                ok = response.status_code < 500
+                return response
+            except httpx.ConnectError:
+                # Nothing was sent, so any method can move to another node once
+                if attempts > 1 or len(self.node_pool.nodes) < 2:
+                    raise
+            except asyncio.CancelledError:
+                # Lost a hedge race: not the node's fault
+                self.node_pool.abandon(node)
+                node = None
+                raise
+            finally:
+                if node is not None:
+                    self.node_pool.release(node, time.perf_counter() - started, ok)
+    
+    async def _request(self, client: httpx.AsyncClient, method: str, url: str,
+                       content: Optional[bytes], params: Optional[Dict], headers: Dict,
+                       operation_key: Optional[str] = None) -> httpx.Response:
+        """Issue one HTTP request with the operation's timeout, recording its latency"""
+        if self.timeouts is None or operation_key is None:
+            return await client.request(
+                method=method, url=url, content=content, params=params, headers=headers, timeout=30.0
+            )
+        
+        timeout = self.timeouts.timeout_for(operation_key)
+        started = time.perf_counter()
+        try:
+            response = await client.request(
+                method=method, url=url, content=content, params=params, headers=headers, timeout=timeout
+            )
+        except httpx.TimeoutException:
+            self.timeouts.observe_timeout(operation_key, timeout)
+            raise
+        self.timeouts.observe(operation_key, time.perf_counter() - started)
+        return response
 
 
 class ZKIdentityClient(ZKBaseClient):
@@ -54,26 +176,35 @@ class ZKIdentityClient(ZKBaseClient):
     
     async def register_identity(self, user_data: Dict) -> Dict:
         """Register new identity"""
-        return await self._make_request("POST", "/register", data=user_data)
+        return await self._make_request(
+            "POST", "/register", data=user_data, operation="register_identity"
+        )
     
     async def verify_identity(self, user_id: str) -> Dict:
         """Verify identity"""
-        return await self._make_request("POST", "/verify", data={"user_id": user_id})
+        return await self._make_request(
+            "POST", "/verify", data={"user_id": user_id}, operation="verify_identity"
+        )
     
     async def get_identity(self, user_id: str) -> Dict:
         """Get identity details"""
-        return await self._make_request("GET", f"/{user_id}")
+        return await self._make_request(
+            "GET", f"/{user_id}", affinity_key=user_id, operation="get_identity", hedge=True
+        )
     
     async def update_identity(self, user_id: str, update_data: Dict) -> Dict:
         """Update identity"""
-        return await self._make_request("PUT", f"/{user_id}", data=update_data)
+        return await self._make_request(
+            "PUT", f"/{user_id}", data=update_data, affinity_key=user_id, operation="update_identity"
+        )
     
     async def generate_proof(self, user_id: str, proof_type: str) -> Dict:
         """Generate ZK proof for identity"""
         return await self._make_request(
             "POST", 
             "/proof/generate", 
-            data={"user_id": user_id, "proof_type": proof_type}
+            data={"user_id": user_id, "proof_type": proof_type},
+            operation="generate_proof"
         )
 
 
@@ -85,31 +216,39 @@ class ZKConsentClient(ZKBaseClient):
     
     async def create_consent(self, consent_data: Dict) -> Dict:
         """Create consent agreement"""
-        return await self._make_request("POST", "/create", data=consent_data)
+        return await self._make_request(
+            "POST", "/create", data=consent_data, operation="create_consent"
+        )
     
     async def approve_consent(self, consent_id: str, user_id: str) -> Dict:
         """Approve consent"""
         return await self._make_request(
             "POST", 
             "/approve", 
-            data={"consent_id": consent_id, "user_id": user_id}
+            data={"consent_id": consent_id, "user_id": user_id},
+            operation="approve_consent"
         )
     
     async def verify_consent(self, consent_id: str) -> Dict:
         """Verify consent status"""
-        return await self._make_request("GET", f"/verify/{consent_id}")
+        return await self._make_request(
+            "GET", f"/verify/{consent_id}", operation="verify_consent", hedge=True
+        )
     
     async def revoke_consent(self, consent_id: str, user_id: str) -> Dict:
         """Revoke consent"""
         return await self._make_request(
             "POST", 
             "/revoke", 
-            data={"consent_id": consent_id, "user_id": user_id}
+            data={"consent_id": consent_id, "user_id": user_id},
+            operation="revoke_consent"
         )
     
     async def list_user_consents(self, user_id: str) -> Dict:
         """List all consents for a user"""
-        return await self._make_request("GET", f"/user/{user_id}")
+        return await self._make_request(
+            "GET", f"/user/{user_id}", affinity_key=user_id, operation="list_user_consents"
+        )
 
 
 class ZKDocumentClient(ZKBaseClient):
@@ -125,23 +264,28 @@ class ZKDocumentClient(ZKBaseClient):
             "metadata": json.dumps(document_data),
             "file": document_file
         }
-        return await self._make_request("POST", "/upload", data=data, headers=headers)
+        return await self._make_request(
+            "POST", "/upload", data=data, headers=headers, operation="upload_document"
+        )
     
     async def verify_document(self, document_id: str) -> Dict:
         """Verify document authenticity"""
-        return await self._make_request("GET", f"/verify/{document_id}")
+        return await self._make_request(
+            "GET", f"/verify/{document_id}", operation="verify_document"
+        )
     
     async def get_document(self, document_id: str, user_id: str) -> Dict:
         """Get document"""
         return await self._make_request(
             "POST", 
             f"/{document_id}", 
-            data={"user_id": user_id}
+            data={"user_id": user_id},
+            operation="get_document"
         )
     
     async def search_documents(self, query: Dict) -> Dict:
         """Search documents"""
-        return await self._make_request("POST", "/search", data=query)
+        return await self._make_request("POST", "/search", data=query, operation="search_documents")
 
 
 class ZKTreatmentClient(ZKBaseClient):
@@ -152,19 +296,27 @@ class ZKTreatmentClient(ZKBaseClient):
     
     async def create_treatment_vector(self, treatment_data: Dict) -> Dict:
         """Create treatment vector"""
-        return await self._make_request("POST", "/vector/create", data=treatment_data)
+        return await self._make_request(
+            "POST", "/vector/create", data=treatment_data, operation="create_treatment_vector"
+        )
     
     async def update_treatment_vector(self, vector_id: str, update_data: Dict) -> Dict:
         """Update treatment vector"""
-        return await self._make_request("PUT", f"/vector/{vector_id}", data=update_data)
+        return await self._make_request(
+            "PUT", f"/vector/{vector_id}", data=update_data, operation="update_treatment_vector"
+        )
     
     async def get_treatment_vector(self, vector_id: str) -> Dict:
         """Get treatment vector"""
-        return await self._make_request("GET", f"/vector/{vector_id}")
+        return await self._make_request(
+            "GET", f"/vector/{vector_id}", operation="get_treatment_vector"
+        )
     
     async def analyze_treatment_vectors(self, analysis_params: Dict) -> Dict:
         """Analyze treatment vectors"""
-        return await self._make_request("POST", "/analyze", data=analysis_params)
+        return await self._make_request(
+            "POST", "/analyze", data=analysis_params, operation="analyze_treatment_vectors"
+        )
 
 
 class ZKOracleClient(ZKBaseClient):
@@ -175,49 +327,144 @@ class ZKOracleClient(ZKBaseClient):
     
     async def create_agreement(self, agreement_data: Dict) -> Dict:
         """Create oracle agreement"""
-        return await self._make_request("POST", "/agreement/create", data=agreement_data)
+        return await self._make_request(
+            "POST", "/agreement/create", data=agreement_data, operation="create_agreement"
+        )
     
     async def validate_agreement(self, agreement_id: str, validation_data: Dict) -> Dict:
         """Validate oracle agreement"""
         return await self._make_request(
             "POST", 
             f"/agreement/{agreement_id}/validate", 
-            data=validation_data
+            data=validation_data,
+            operation="validate_agreement"
         )
     
+    async def validate_clauses(self, agreement_id: str, validation_data: Dict,
+                               clauses: List[Dict], max_concurrency: int = 4) -> Dict:
+        """Validate agreement clauses independently and concurrently
+        
+        Each clause is validated with its own call, at most ``max_concurrency``
+        at a time. Validation stops at the first failed mandatory clause (clauses
+        are mandatory unless they set ``"mandatory": False``); clauses not yet
+        checked are reported as skipped. Per-clause latency is included.
+        """
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        started = time.perf_counter()
+        
+        async def validate_clause(clause: Dict) -> Dict:
+            clause_id = clause.get("id") or clause.get("clause_id")
+            async with semaphore:
+                clause_started = time.perf_counter()
+                try:
+                    response = await self._make_request(
+                        "POST",
+                        f"/agreement/{agreement_id}/validate",
+                        data={**validation_data, "clause_ids": [clause_id]},
+                        operation="validate_agreement_clause"
+                    )
+                except httpx.HTTPError as e:
+                    response = {"success": False, "error": str(e)}
+                latency_ms = (time.perf_counter() - clause_started) * 1000
+            return {
+                "clause_id": clause_id,
+                "valid": bool(response.get("valid", False)),
+                "mandatory": clause.get("mandatory", True),
+                "latency_ms": round(latency_ms, 2),
+                "response": response
+            }
+        
+        tasks = [asyncio.create_task(validate_clause(clause)) for clause in clauses]
+        results = []
+        stopped_at = None
+        try:
+            for next_result in asyncio.as_completed(tasks):
+                result = await next_result
+                results.append(result)
+                if result["mandatory"] and not result["valid"]:
+                    stopped_at = result["clause_id"]
+                    break
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        
+        checked = {result["clause_id"] for result in results}
+        failed_mandatory = [r["clause_id"] for r in results if r["mandatory"] and not r["valid"]]
+        skipped = [
+            clause.get("id") or clause.get("clause_id") for clause in clauses
+            if (clause.get("id") or clause.get("clause_id")) not in checked
+        ]
+        slowest = max(results, key=lambda r: r["latency_ms"], default=None)
+        
+        return {
+            "agreement_id": agreement_id,
+            "valid": not failed_mandatory and not skipped,
+            "validated_clauses": [r["clause_id"] for r in results if r["valid"]],
+            "failed_clauses": [r["clause_id"] for r in results if not r["valid"]],
+            "skipped_clauses": skipped,
+            "stopped_early_at": stopped_at,
+            "clause_results": {
+                r["clause_id"]: {"valid": r["valid"], "mandatory": r["mandatory"], "latency_ms": r["latency_ms"]}
+                for r in results
+            },
+            "clause_latency_ms": {r["clause_id"]: r["latency_ms"] for r in results},
+            "slowest_clause": slowest["clause_id"] if slowest else None,
+            "total_ms": round((time.perf_counter() - started) * 1000, 2)
+        }
+    
     async def get_agreement(self, agreement_id: str) -> Dict:
         """Get oracle agreement details"""
-        return await self._make_request("GET", f"/agreement/{agreement_id}")
+        return await self._make_request(
+            "GET", f"/agreement/{agreement_id}", operation="get_agreement", hedge=True
+        )
     
     async def list_agreements(self, query_params: Dict = None) -> Dict:
         """List oracle agreements"""
-        return await self._make_request("GET", "/agreements", params=query_params)
+        return await self._make_request(
+            "GET", "/agreements", params=query_params, operation="list_agreements"
+        )
 
 
 class ZKPolicyClient(ZKBaseClient):
     """Client for Policy API interactions"""
     
-    def __init__(self):
+    def __init__(self, precheck=None):
         super().__init__(settings.POLICY_API)
+        # Optional local pre-check (see utils.policy_precheck) that rejects
+        # certainly-denied requests without calling the policy API
+        self.precheck = precheck
     
     async def validate_action(self, validation_request: Dict) -> Dict:
         """Validate action against policy"""
-        return await self._make_request("POST", "/validate", data=validation_request)
+        if self.precheck:
+            denied = self.precheck.check(validation_request)
+            if denied is not None:
+                return denied
+        return await self._make_request(
+            "POST", "/validate", data=validation_request, operation="validate_action"
+        )
     
     async def get_allowed_actions(self, role: str, location: str) -> Dict:
         """Get allowed actions for role and location"""
         return await self._make_request(
             "GET", 
             "/actions", 
-            params={"role": role, "location": location}
+            params={"role": role, "location": location},
+            operation="get_allowed_actions"
         )
     
     async def validate_policy_with_oracle(self, validation_request: Dict) -> Dict:
         """Validate policy with oracle integration"""
+        if self.precheck:
+            denied = self.precheck.check(validation_request.get("policy_request", {}))
+            if denied is not None:
+                return {"policy_result": denied, "oracle_validated": False}
         return await self._make_request(
             "POST", 
             "/validate/oracle", 
-            data=validation_request
+            data=validation_request,
+            operation="validate_policy_with_oracle"
         )
 
 
@@ -229,14 +476,17 @@ class ZKGatewayClient(ZKBaseClient):
     
     async def generate_token(self, token_request: Dict) -> Dict:
         """Generate access token"""
-        return await self._make_request("POST", "/token/generate", data=token_request)
+        return await self._make_request(
+            "POST", "/token/generate", data=token_request, operation="generate_token"
+        )
     
     async def validate_token(self, token: str) -> Dict:
         """Validate access token"""
         return await self._make_request(
             "POST", 
             "/token/validate", 
-            data={"token": token}
+            data={"token": token},
+            operation="validate_token"
         )
     
     async def revoke_token(self, token: str) -> Dict:
@@ -244,5 +494,6 @@ class ZKGatewayClient(ZKBaseClient):
         return await self._make_request(
             "POST", 
             "/token/revoke", 
-            data={"token": token}
+            data={"token": token},
+            operation="revoke_token"
         )
@@ -12,6 +12,7 @@ from pydantic import BaseModel
 
 from utils.config import settings
 from utils.api_client import ZKIdentityClient
+from utils.clients import clients
 
 # OAuth2 scheme
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/token")
@@ -20,7 +21,7 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/token")
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 # Identity client
-identity_client = ZKIdentityClient()
+identity_client = clients.get(ZKIdentityClient)
 
 class TokenData(BaseModel):
     """Token data model"""
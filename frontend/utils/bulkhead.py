@@ -0,0 +1,112 @@
+"""
+Admission control and per-route concurrency bulkheads for the ZK Health HMS frontend
+"""
+import asyncio
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from fastapi.responses import JSONResponse
+
+from utils.metrics import Sample
+
+
+class Bulkhead:
+    """Concurrency pool with a max in-flight limit and a short bounded queue"""
+
+    def __init__(self, name: str, max_in_flight: int, max_queue: int = 0,
+                 queue_timeout: float = 1.0):
+        self.name = name
+        self.max_in_flight = max(1, max_in_flight)
+        self.max_queue = max(0, max_queue)
+        self.queue_timeout = queue_timeout
+        self.in_flight = 0
+        self.queued = 0
+        self.admitted = 0
+        self.shed = 0
+        self._slots = asyncio.Semaphore(self.max_in_flight)
+
+    async def acquire(self) -> bool:
+        """Take a slot, waiting in the queue if there is room; False means shed"""
+        if not self._slots.locked():
+            await self._slots.acquire()
+        else:
+            if self.queued >= self.max_queue:
+                self.shed += 1
+                return False
+
+            self.queued += 1
+            try:
+                await asyncio.wait_for(self._slots.acquire(), timeout=self.queue_timeout)
+            except asyncio.TimeoutError:
+                self.shed += 1
+                return False
+            finally:
+                self.queued -= 1
+
+        self.in_flight += 1
+        self.admitted += 1
+        return True
+
+    def release(self):
+        """Return a slot to the pool"""
+        self.in_flight -= 1
+        self._slots.release()
+
+    def collect(self) -> List[Sample]:
+        """Metrics samples for this pool"""
+        labels = {"pool": self.name}
+        return [
+            Sample("zk_bulkhead_in_flight", "gauge", "Requests currently executing", labels, self.in_flight),
+            Sample("zk_bulkhead_queue_depth", "gauge", "Requests waiting for a slot", labels, self.queued),
+            Sample("zk_bulkhead_max_in_flight", "gauge", "Configured in-flight limit", labels, self.max_in_flight),
+            Sample("zk_bulkhead_admitted_total", "counter", "Requests admitted", labels, self.admitted),
+            Sample("zk_bulkhead_shed_total", "counter", "Requests rejected with 503", labels, self.shed),
+        ]
+
+
+class BulkheadMiddleware:
+    """ASGI middleware that assigns requests to bulkheads by path prefix
+
+    Routes are matched by longest prefix. A route mapped to None, or a path with
+    no match and no default pool, bypasses admission control (health checks,
+    static files). Shed requests get a fast 503 with Retry-After.
+    """
+
+    def __init__(self, app, pools: Dict[str, Bulkhead],
+                 routes: Sequence[Tuple[str, Optional[str]]],
+                 default_pool: Optional[str] = None, retry_after: int = 1):
+        self.app = app
+        self.pools = pools
+        self.routes = sorted(routes, key=lambda route: len(route[0]), reverse=True)
+        self.default_pool = default_pool
+        self.retry_after = retry_after
+
+    def pool_for(self, path: str) -> Optional[Bulkhead]:
+        """Resolve the bulkhead for a request path"""
+        for prefix, pool_name in self.routes:
+            if path == prefix or path.startswith(prefix.rstrip("/") + "/"):
+                return self.pools.get(pool_name) if pool_name else None
+        return self.pools.get(self.default_pool) if self.default_pool else None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        pool = self.pool_for(scope["path"])
+        if pool is None:
+            await self.app(scope, receive, send)
+            return
+
+        if not await pool.acquire():
+            response = JSONResponse(
+                status_code=503,
+                content={"detail": f"Server busy ({pool.name}), please retry"},
+                headers={"Retry-After": str(self.retry_after)}
+            )
+            await response(scope, receive, send)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            pool.release()
@@ -0,0 +1,74 @@
+"""
+Shared API client registry for the ZK Health Hospital Management System
+"""
+from typing import Callable, Dict, List, Type, TypeVar
+
+from utils.api_client import ZKPolicyClient
+from utils.config import settings
+from utils.hedging import hedge_policy
+from utils.load_balancer import api_nodes
+from utils.metrics import metrics_registry
+from utils.policy_catalog import ROLES, ACTIONS
+from utils.policy_precheck import RoleStrengthPrecheck
+from utils.timeouts import api_timeouts
+
+T = TypeVar("T")
+
+
+class ClientRegistry:
+    """Process-wide registry handing out one shared instance per client class
+
+    Clients are created on first use, so importing a router no longer builds its
+    own set of clients and every router shares the same configured instance.
+    """
+
+    def __init__(self):
+        self._factories: Dict[type, Callable] = {}
+        self._clients: Dict[type, object] = {}
+        self._configurers: List[Callable] = []
+
+    def register(self, client_class: Type[T], factory: Callable[[], T]):
+        """Register a custom factory for a client class"""
+        self._factories[client_class] = factory
+
+    def configure(self, configurer: Callable[[object], None]):
+        """Apply configurer to every client created from now on"""
+        self._configurers.append(configurer)
+
+    def get(self, client_class: Type[T]) -> T:
+        """Return the shared instance of client_class, creating it if needed"""
+        client = self._clients.get(client_class)
+        if client is None:
+            factory = self._factories.get(client_class, client_class)
+            client = self._clients[client_class] = factory()
+            for configurer in self._configurers:
+                configurer(client)
+        return client
+
+    def instances(self) -> Dict[type, object]:
+        """Clients created so far"""
+        return dict(self._clients)
+
+
+clients = ClientRegistry()
+
+# Shared policy client rejects certainly-denied requests locally
+clients.register(
+    ZKPolicyClient,
+    lambda: ZKPolicyClient(precheck=RoleStrengthPrecheck.compile(ROLES, ACTIONS))
+)
+
+# Spread API calls over the discovered ZK API nodes
+if settings.LB_ENABLED:
+    metrics_registry.register(api_nodes)
+    clients.configure(lambda client: client.use_node_pool(api_nodes))
+
+# Hedge slow idempotent GETs within the hedge budget
+if settings.HEDGE_ENABLED:
+    metrics_registry.register(hedge_policy)
+    clients.configure(lambda client: client.use_hedging(hedge_policy))
+
+# Per-operation timeouts learned from observed latency
+if settings.API_TIMEOUT_ADAPTIVE:
+    metrics_registry.register(api_timeouts)
+    clients.configure(lambda client: client.use_adaptive_timeouts(api_timeouts))
@@ -16,6 +16,15 @@ class Settings(BaseSettings):
     HOST: str = os.getenv("HOST", "127.0.0.1")
     PORT: int = int(os.getenv("PORT", "8000"))
     
+    # Production launcher settings (python main.py --production)
+    WORKERS: int = int(os.getenv("WORKERS", "0"))  # 0 = one worker per CPU
+    MAX_REQUESTS: int = int(os.getenv("MAX_REQUESTS", "10000"))
+    MAX_REQUESTS_JITTER: int = int(os.getenv("MAX_REQUESTS_JITTER", "1000"))
+    GRACEFUL_TIMEOUT: int = int(os.getenv("GRACEFUL_TIMEOUT", "30"))
+    
+    # Import each router on its first request instead of at startup
+    LAZY_ROUTERS: bool = os.getenv("LAZY_ROUTERS", "False").lower() == "true"
+    
     # Security settings
     SECRET_KEY: str = os.getenv("SECRET_KEY", "your-secret-key-for-jwt")
     ALGORITHM: str = "HS256"
@@ -31,6 +40,33 @@ class Settings(BaseSettings):
     POLICY_API: str = f"{ZK_API_BASE_URL}/api/policy"
     GATEWAY_API: str = f"{ZK_API_BASE_URL}/api/gateway"
     
+    # Client-side load balancing across ZK API nodes discovered from /scaling/status
+    LB_ENABLED: bool = os.getenv("LB_ENABLED", "False").lower() == "true"
+    LB_DISCOVERY_URL: str = os.getenv("LB_DISCOVERY_URL", f"{ZK_API_BASE_URL}/scaling/status")
+    LB_REFRESH_SECONDS: float = float(os.getenv("LB_REFRESH_SECONDS", "30"))
+    LB_EJECT_AFTER_FAILURES: int = int(os.getenv("LB_EJECT_AFTER_FAILURES", "3"))
+    LB_EJECT_SECONDS: float = float(os.getenv("LB_EJECT_SECONDS", "30"))
+    LB_MIN_NODE_HEALTH: float = float(os.getenv("LB_MIN_NODE_HEALTH", "0.5"))
+    # Node choice: p2c (least loaded) or affinity (consistent hash by patient/owner ID)
+    LB_ROUTING: str = os.getenv("LB_ROUTING", "p2c")
+    LB_VIRTUAL_NODES: int = int(os.getenv("LB_VIRTUAL_NODES", "160"))
+    LB_LOAD_FACTOR: float = float(os.getenv("LB_LOAD_FACTOR", "1.25"))
+    
+    # Hedged requests for idempotent GETs (backup request after the tracked quantile)
+    HEDGE_ENABLED: bool = os.getenv("HEDGE_ENABLED", "False").lower() == "true"
+    HEDGE_QUANTILE: float = float(os.getenv("HEDGE_QUANTILE", "0.95"))
+    HEDGE_BUDGET_RATIO: float = float(os.getenv("HEDGE_BUDGET_RATIO", "0.05"))
+    HEDGE_MIN_SAMPLES: int = int(os.getenv("HEDGE_MIN_SAMPLES", "20"))
+    
+    # Adaptive per-operation API timeouts: multiplier x observed p99, clamped to [min, max]
+    # (off by default: a learned timeout can fail calls the fixed 30s timeout allowed)
+    API_TIMEOUT_ADAPTIVE: bool = os.getenv("API_TIMEOUT_ADAPTIVE", "False").lower() == "true"
+    API_TIMEOUT_MULTIPLIER: float = float(os.getenv("API_TIMEOUT_MULTIPLIER", "3.0"))
+    API_TIMEOUT_MIN: float = float(os.getenv("API_TIMEOUT_MIN", "1.0"))
+    API_TIMEOUT_MAX: float = float(os.getenv("API_TIMEOUT_MAX", "120.0"))
+    API_TIMEOUT_DEFAULT: float = float(os.getenv("API_TIMEOUT_DEFAULT", "30.0"))
+    API_TIMEOUT_MIN_SAMPLES: int = int(os.getenv("API_TIMEOUT_MIN_SAMPLES", "50"))
+    
     # MongoDB settings
     MONGODB_URL: str = os.getenv("MONGODB_URL", "mongodb://localhost:27017")
     MONGODB_DB: str = os.getenv("MONGODB_DB", "zk_health_hms")
@@ -38,6 +74,41 @@ class Settings(BaseSettings):
     # Default country code for location-based policies
     DEFAULT_COUNTRY: str = os.getenv("DEFAULT_COUNTRY", "US")
     
+    # Precomputed allowed-actions table
+    ALLOWED_ACTIONS_REFRESH_SECONDS: float = float(os.getenv("ALLOWED_ACTIONS_REFRESH_SECONDS", "300"))
+    ALLOWED_ACTIONS_CONCURRENCY: int = int(os.getenv("ALLOWED_ACTIONS_CONCURRENCY", "8"))
+    
+    # Admission control (per-route concurrency bulkheads)
+    BULKHEAD_AUTH_MAX_IN_FLIGHT: int = int(os.getenv("BULKHEAD_AUTH_MAX_IN_FLIGHT", "32"))
+    BULKHEAD_PATIENTS_MAX_IN_FLIGHT: int = int(os.getenv("BULKHEAD_PATIENTS_MAX_IN_FLIGHT", "32"))
+    BULKHEAD_HEAVY_MAX_IN_FLIGHT: int = int(os.getenv("BULKHEAD_HEAVY_MAX_IN_FLIGHT", "8"))
+    BULKHEAD_DEFAULT_MAX_IN_FLIGHT: int = int(os.getenv("BULKHEAD_DEFAULT_MAX_IN_FLIGHT", "64"))
+    BULKHEAD_MAX_QUEUE: int = int(os.getenv("BULKHEAD_MAX_QUEUE", "16"))
+    BULKHEAD_QUEUE_TIMEOUT: float = float(os.getenv("BULKHEAD_QUEUE_TIMEOUT", "2.0"))
+    BULKHEAD_RETRY_AFTER: int = int(os.getenv("BULKHEAD_RETRY_AFTER", "1"))
+    
+    # Background validation jobs
+    VALIDATION_JOB_WORKERS: int = int(os.getenv("VALIDATION_JOB_WORKERS", "4"))
+    VALIDATION_JOB_QUEUE_SIZE: int = int(os.getenv("VALIDATION_JOB_QUEUE_SIZE", "100"))
+    
+    # Max concurrent clause checks in clause-level oracle validation
+    ORACLE_CLAUSE_CONCURRENCY: int = int(os.getenv("ORACLE_CLAUSE_CONCURRENCY", "4"))
+    
+    # Policy simulator validation mode: serial, speculative or combined. This backend's
+    # /policy/validate/oracle returns no policy result, so combined falls back to
+    # serial after the combined call (one extra round trip)
+    POLICY_SIMULATION_MODE: str = os.getenv("POLICY_SIMULATION_MODE", "serial")
+    
+    # Policy what-if matrix and decision cache
+    POLICY_MATRIX_CONCURRENCY: int = int(os.getenv("POLICY_MATRIX_CONCURRENCY", "8"))
+    POLICY_DECISION_CACHE_SIZE: int = int(os.getenv("POLICY_DECISION_CACHE_SIZE", "10000"))
+    
+    # Resolve patient/doctor names on list and detail pages through the identity API
+    # (off by default: those pages still render demo rows whose IDs the backend lacks)
+    RESOLVE_IDENTITY_NAMES: bool = os.getenv("RESOLVE_IDENTITY_NAMES", "False").lower() == "true"
+    # Max concurrent identity lookups per batched wave within one request
+    IDENTITY_LOADER_CONCURRENCY: int = int(os.getenv("IDENTITY_LOADER_CONCURRENCY", "10"))
+    
     class Config:
         """Pydantic config"""
         env_file = ".env"
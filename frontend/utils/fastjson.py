@@ -0,0 +1,44 @@
+"""
+JSON serialization helpers for the ZK Health Hospital Management System
+
+Uses orjson when it is installed and falls back to the standard library, so
+callers can always work in bytes: ``dumps`` returns UTF-8 bytes and ``loads``
+accepts bytes directly, without an intermediate ``str`` copy.
+"""
+import json
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+if orjson is not None:
+    from fastapi.responses import ORJSONResponse as FastJSONResponse
+
+    def dumps(obj: Any) -> bytes:
+        """Serialize to UTF-8 JSON bytes"""
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+
+    loads = orjson.loads
+else:
+    FastJSONResponse = JSONResponse
+
+    def dumps(obj: Any) -> bytes:
+        """Serialize to UTF-8 JSON bytes"""
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    def loads(data) -> Any:
+        """Deserialize JSON from bytes or str"""
+        return json.loads(data)
+
+
+def dumps_str(obj: Any) -> str:
+    """Serialize to a JSON string (for text protocols such as server-sent events)"""
+    return dumps(obj).decode("utf-8")
+
+
+BACKEND = "orjson" if orjson is not None else "json"
@@ -0,0 +1,149 @@
+"""
+Hedged requests for read-only ZK API calls in the ZK Health Hospital Management System
+"""
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, TypeVar
+
+from utils.config import settings
+from utils.latency import QuantileSketch
+from utils.metrics import Sample
+
+T = TypeVar("T")
+
+
+class HedgeBudget:
+    """Token bucket limiting hedges to a fraction of primary requests
+
+    Each primary request earns ``ratio`` tokens (up to ``burst``) and each hedge
+    spends one, so over time hedges add at most ``ratio`` extra load.
+    """
+
+    def __init__(self, ratio: float = 0.05, burst: float = 10.0):
+        self.ratio = ratio
+        self.burst = burst
+        self.tokens = burst
+
+    def earn(self):
+        """Credit one primary request"""
+        self.tokens = min(self.burst, self.tokens + self.ratio)
+
+    def try_spend(self) -> bool:
+        """Take a token for a hedge if one is available"""
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return True
+        return False
+
+
+class HedgePolicy:
+    """Sends a backup request when the first is slower than the tracked p95
+
+    Latency is tracked per operation. A hedge is sent only once an operation has
+    ``min_samples`` observations, only if the budget allows, and never sooner than
+    ``min_delay``. Whichever request answers first wins; the other is cancelled.
+    """
+
+    def __init__(self, quantile: float = 0.95, budget_ratio: float = 0.05,
+                 min_samples: int = 20, min_delay: float = 0.005):
+        self.quantile = quantile
+        self.min_samples = min_samples
+        self.min_delay = min_delay
+        self.budget = HedgeBudget(budget_ratio)
+        self.latencies: Dict[str, QuantileSketch] = {}
+        self.stats: Dict[str, Dict[str, int]] = {}
+
+    def _stats(self, operation: str) -> Dict[str, int]:
+        if operation not in self.stats:
+            self.stats[operation] = {"requests": 0, "hedged": 0, "hedge_won": 0, "budget_denied": 0}
+        return self.stats[operation]
+
+    def observe(self, operation: str, seconds: float):
+        """Record the latency of a completed call"""
+        if operation not in self.latencies:
+            self.latencies[operation] = QuantileSketch()
+        self.latencies[operation].add(seconds)
+
+    def hedge_delay(self, operation: str) -> Optional[float]:
+        """How long to wait before hedging, or None if the operation is not tracked yet"""
+        sketch = self.latencies.get(operation)
+        if sketch is None or sketch.count < self.min_samples:
+            return None
+        return max(self.min_delay, sketch.quantile(self.quantile))
+
+    async def run(self, operation: str, send: Callable[[List], Awaitable[T]]) -> T:
+        """Run ``send`` and possibly a hedge of it; ``send`` gets the nodes to avoid"""
+        stats = self._stats(operation)
+        stats["requests"] += 1
+        self.budget.earn()
+
+        started = time.perf_counter()
+        result = await self._race(operation, stats, send)
+        self.observe(operation, time.perf_counter() - started)
+        return result
+
+    async def _race(self, operation: str, stats: Dict[str, int],
+                    send: Callable[[List], Awaitable[T]]) -> T:
+        primary_nodes: List = []
+        tasks = [asyncio.create_task(send(primary_nodes))]
+        try:
+            delay = self.hedge_delay(operation)
+            if delay is None:
+                return await tasks[0]
+
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if done:
+                return tasks[0].result()
+            if not self.budget.try_spend():
+                stats["budget_denied"] += 1
+                return await tasks[0]
+
+            stats["hedged"] += 1
+            tasks.append(asyncio.create_task(send(list(primary_nodes))))
+            pending = set(tasks)
+            while True:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                succeeded = [task for task in done if task.exception() is None]
+                if succeeded or not pending:
+                    # First success wins; if both failed, surface the last error
+                    winner = succeeded[0] if succeeded else done.pop()
+                    if winner is tasks[1] and succeeded:
+                        stats["hedge_won"] += 1
+                    return winner.result()
+        finally:
+            unfinished = [task for task in tasks if not task.done()]
+            for task in unfinished:
+                task.cancel()
+            await asyncio.gather(*unfinished, return_exceptions=True)
+
+    def collect(self) -> List[Sample]:
+        """Metrics samples per operation"""
+        samples = [
+            Sample("zk_hedge_budget_tokens", "gauge", "Hedges currently allowed by the budget",
+                   {}, self.budget.tokens)
+        ]
+        for operation, stats in self.stats.items():
+            labels = {"operation": operation}
+            samples.extend([
+                Sample("zk_hedge_requests_total", "counter", "Hedge-eligible requests",
+                       labels, stats["requests"]),
+                Sample("zk_hedge_sent_total", "counter", "Hedged (backup) requests sent",
+                       labels, stats["hedged"]),
+                Sample("zk_hedge_won_total", "counter", "Hedges that answered before the primary",
+                       labels, stats["hedge_won"]),
+                Sample("zk_hedge_budget_denied_total", "counter", "Hedges skipped by the budget",
+                       labels, stats["budget_denied"]),
+            ])
+            delay = self.hedge_delay(operation)
+            if delay is not None:
+                samples.append(Sample("zk_hedge_delay_seconds", "gauge",
+                                      "Current hedge trigger delay (tracked quantile)", labels, delay))
+        return samples
+
+
+# Hedging for idempotent GETs (used when HEDGE_ENABLED is set)
+hedge_policy = HedgePolicy(
+    quantile=settings.HEDGE_QUANTILE,
+    budget_ratio=settings.HEDGE_BUDGET_RATIO,
+    min_samples=settings.HEDGE_MIN_SAMPLES
+)
@@ -0,0 +1,181 @@
+"""
+In-process background job queue for the ZK Health Hospital Management System
+"""
+import asyncio
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from fastapi import HTTPException
+
+from utils.config import settings
+from utils.metrics import Sample, metrics_registry
+
+
+class QueueFull(Exception):
+    """Raised when a job cannot be queued because the queue is at capacity"""
+
+
+class Job:
+    """A queued unit of work and its outcome"""
+
+    def __init__(self, kind: str, owner: Optional[str], func: Callable[[], Awaitable[Any]]):
+        self.id = f"job_{uuid.uuid4().hex[:12]}"
+        self.kind = kind
+        self.owner = owner
+        self.func = func
+        self.status = "queued"
+        self.result: Any = None
+        self.error: Optional[Dict] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.done = asyncio.Event()
+
+    def to_dict(self) -> Dict:
+        """Public view of the job"""
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "result": self.result,
+            "error": self.error,
+            "created_at": datetime.fromtimestamp(self.created_at).isoformat(),
+            "queue_ms": round((self.started_at - self.created_at) * 1000, 2) if self.started_at else None,
+            "run_ms": (
+                round((self.finished_at - self.started_at) * 1000, 2)
+                if self.finished_at and self.started_at else None
+            )
+        }
+
+
+class JobQueue:
+    """Bounded queue drained by a fixed pool of asyncio worker tasks
+
+    Workers are started on first submit so the queue always binds to the running
+    event loop. Finished jobs are kept for status polling up to ``max_history``.
+    Jobs live in this process only: when several server workers share the port
+    (``python main.py --production``), ``pollable`` is cleared and callers should
+    wait for the job instead of handing out a status URL another worker cannot
+    answer.
+    """
+
+    def __init__(self, name: str, workers: int = 4, max_queue: int = 100,
+                 max_history: int = 1000):
+        self.name = name
+        self.worker_count = max(1, workers)
+        self.max_queue = max(1, max_queue)
+        self.max_history = max_history
+        self.pollable = True
+        self.jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self.running = 0
+        self.completed = {"succeeded": 0, "failed": 0}
+        self.rejected = 0
+        self.latency_sum = 0.0
+        self.latency_count = 0
+        self.latency_max = 0.0
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+
+    @property
+    def depth(self) -> int:
+        """Jobs waiting for a worker"""
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def submit(self, kind: str, func: Callable[[], Awaitable[Any]], owner: Optional[str] = None) -> Job:
+        """Queue a coroutine function; raises QueueFull when at capacity"""
+        self._ensure_workers()
+        job = Job(kind, owner, func)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            self.rejected += 1
+            raise QueueFull(f"{self.name} queue is full ({self.max_queue} jobs)")
+
+        self.jobs[job.id] = job
+        while len(self.jobs) > self.max_history:
+            oldest_id, oldest = next(iter(self.jobs.items()))
+            if not oldest.done.is_set():
+                break
+            del self.jobs[oldest_id]
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Look up a job by ID"""
+        return self.jobs.get(job_id)
+
+    async def stop(self):
+        """Cancel worker tasks"""
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._queue = None
+
+    def _ensure_workers(self):
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.max_queue)
+        if not self._workers:
+            self._workers = [
+                asyncio.create_task(self._worker()) for _ in range(self.worker_count)
+            ]
+
+    async def _worker(self):
+        while True:
+            job = await self._queue.get()
+            job.status = "running"
+            job.started_at = time.time()
+            self.running += 1
+            try:
+                job.result = await job.func()
+                job.status = "succeeded"
+            except HTTPException as e:
+                job.status = "failed"
+                job.error = {"status_code": e.status_code, "detail": e.detail}
+            except Exception as e:
+                job.status = "failed"
+                job.error = {"status_code": 500, "detail": str(e)}
+            except asyncio.CancelledError:
+                # Shutting down: the job never finished, so keep it out of the latency stats
+                job.status = "cancelled"
+                job.error = {"status_code": 503, "detail": "Job cancelled"}
+                raise
+            finally:
+                self.running -= 1
+                job.finished_at = time.time()
+                self.completed[job.status] = self.completed.get(job.status, 0) + 1
+                if job.status != "cancelled":
+                    latency = job.finished_at - job.created_at
+                    self.latency_sum += latency
+                    self.latency_count += 1
+                    self.latency_max = max(self.latency_max, latency)
+                job.done.set()
+                self._queue.task_done()
+
+    def collect(self) -> List[Sample]:
+        """Metrics samples for this queue"""
+        labels = {"queue": self.name}
+        samples = [
+            Sample("zk_jobs_queue_depth", "gauge", "Jobs waiting for a worker", labels, self.depth),
+            Sample("zk_jobs_running", "gauge", "Jobs currently executing", labels, self.running),
+            Sample("zk_jobs_rejected_total", "counter", "Jobs rejected because the queue was full",
+                   labels, self.rejected),
+            Sample("zk_jobs_latency_seconds_sum", "counter", "Total job latency (queued to finished)",
+                   labels, self.latency_sum),
+            Sample("zk_jobs_latency_seconds_count", "counter", "Jobs finished", labels, self.latency_count),
+            Sample("zk_jobs_latency_seconds_max", "gauge", "Slowest job latency", labels, self.latency_max),
+        ]
+        for status, count in self.completed.items():
+            samples.append(Sample("zk_jobs_completed_total", "counter", "Jobs finished by status",
+                                  {**labels, "status": status}, count))
+        return samples
+
+
+# Shared queue for validation work that should not block request handlers
+validation_jobs = metrics_registry.register(JobQueue(
+    "validation",
+    workers=settings.VALIDATION_JOB_WORKERS,
+    max_queue=settings.VALIDATION_JOB_QUEUE_SIZE
+))
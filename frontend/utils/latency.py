@@ -0,0 +1,54 @@
+"""
+Streaming latency quantiles for the ZK Health Hospital Management System
+"""
+import math
+from typing import Dict, Optional
+
+
+class QuantileSketch:
+    """Log-bucketed streaming quantile sketch with relative error ``accuracy``
+
+    Values are counted in geometric buckets (each ``1 + 2 * accuracy`` times wider
+    than the last), so memory depends on the value range rather than the sample
+    count and any quantile is within ``accuracy`` of the true value. Every
+    ``decay_every`` observations all counts are halved, so the sketch follows
+    recent behaviour instead of the whole history.
+    """
+
+    def __init__(self, accuracy: float = 0.01, min_value: float = 1e-4, decay_every: int = 1000):
+        self.gamma = (1 + accuracy) / (1 - accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.min_value = min_value
+        self.decay_every = decay_every
+        self.buckets: Dict[int, float] = {}
+        self.count = 0.0
+        self._since_decay = 0
+
+    def add(self, value: float):
+        """Record one observation"""
+        index = math.ceil(math.log(max(value, self.min_value)) / self._log_gamma)
+        self.buckets[index] = self.buckets.get(index, 0.0) + 1
+        self.count += 1
+        self._since_decay += 1
+        if self.decay_every and self._since_decay >= self.decay_every:
+            self._decay()
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimated value at quantile q, or None before any observations"""
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = 0.0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen > rank:
+                return 2 * self.gamma ** index / (self.gamma + 1)
+        return 2 * self.gamma ** max(self.buckets) / (self.gamma + 1)
+
+    def _decay(self):
+        # Keep fractional counts so rare tail values fade gradually instead of vanishing
+        self.buckets = {
+            index: count / 2 for index, count in self.buckets.items() if count / 2 >= 0.01
+        }
+        self.count = sum(self.buckets.values())
+        self._since_decay = 0
@@ -0,0 +1,282 @@
+"""
+Client-side load balancing across ZK API nodes for the ZK Health Hospital Management System
+"""
+import asyncio
+import bisect
+import hashlib
+import math
+import random
+import statistics
+import time
+from typing import Dict, Iterable, Iterator, List, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from utils.config import settings
+from utils.metrics import Sample
+
+
+class ApiNode:
+    """A backend node and the latency/health observed by this process"""
+
+    def __init__(self, url: str, node_id: Optional[str] = None, ewma_ms: float = 0.0):
+        self.url = url.rstrip("/")
+        self.id = node_id or self.url
+        self.ewma_ms = ewma_ms
+        self.in_flight = 0
+        self.requests = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.ejected_until = 0.0
+        self.reported_healthy = True
+
+    @property
+    def available(self) -> bool:
+        """Not ejected and not reported unhealthy by discovery"""
+        return self.reported_healthy and time.monotonic() >= self.ejected_until
+
+    def score(self) -> float:
+        """Expected cost of sending one more request here (lower is better)"""
+        return (self.ewma_ms + 1.0) * (self.in_flight + 1)
+
+
+class HashRing:
+    """Consistent-hash ring with ``vnodes`` virtual points per node"""
+
+    def __init__(self, node_keys: Iterable[str], vnodes: int = 160):
+        points = sorted(
+            (self._hash(f"{node_key}#{i}"), node_key)
+            for node_key in node_keys for i in range(max(1, vnodes))
+        )
+        self._hashes = [point for point, _ in points]
+        self._owners = [owner for _, owner in points]
+
+    @staticmethod
+    def _hash(key: str) -> int:
+        return int.from_bytes(hashlib.md5(key.encode("utf-8")).digest()[:8], "big")
+
+    def walk(self, key: str) -> Iterator[str]:
+        """Distinct node keys clockwise from the key's position on the ring"""
+        if not self._owners:
+            return
+        start = bisect.bisect(self._hashes, self._hash(key))
+        seen = set()
+        for i in range(len(self._owners)):
+            owner = self._owners[(start + i) % len(self._owners)]
+            if owner not in seen:
+                seen.add(owner)
+                yield owner
+
+
+class NodePool:
+    """Set of ZK API nodes with discovery, power-of-two-choices selection and ejection
+
+    Nodes come from the backend's /scaling/status node list, refreshed in the
+    background; the seed URL is used on its own until discovery succeeds or if it
+    returns nothing. Each request picks the better of two random available nodes,
+    scored by an EWMA of observed latency times in-flight requests. A node is
+    ejected for ``eject_seconds`` after ``eject_after`` consecutive failures, and
+    if every node is ejected, all of them are tried again rather than failing.
+
+    With ``routing="affinity"``, requests that carry an affinity key (patient or
+    owner ID) go to the key's owner on a consistent-hash ring instead, so each
+    node keeps serving the same patients from its cache. Load is bounded: a node
+    already holding more than ``load_factor`` times the average in-flight count
+    is passed over for the next node on the ring, as are unavailable nodes.
+    """
+
+    def __init__(self, seed_url: str, discovery_url: str, refresh_interval: float = 30.0,
+                 decay: float = 0.3, eject_after: int = 3, eject_seconds: float = 30.0,
+                 min_health: float = 0.5, routing: str = "p2c", vnodes: int = 160,
+                 load_factor: float = 1.25):
+        self.seed_url = seed_url.rstrip("/")
+        self.discovery_url = discovery_url
+        self.refresh_interval = refresh_interval
+        self.decay = decay
+        self.eject_after = max(1, eject_after)
+        self.eject_seconds = eject_seconds
+        self.min_health = min_health
+        self.routing = routing
+        self.vnodes = vnodes
+        self.load_factor = max(1.0, load_factor)
+        self.ejections = 0
+        self.affinity_routed = 0
+        self.affinity_spilled = 0
+        self.last_discovered: Optional[float] = None
+        self.nodes: Dict[str, ApiNode] = {}
+        self.set_nodes([ApiNode(self.seed_url, "seed")])
+        self._task: Optional[asyncio.Task] = None
+
+    def set_nodes(self, nodes: Iterable[ApiNode]):
+        """Replace the node set and rebuild the hash ring"""
+        self.nodes = {node.url: node for node in nodes}
+        self._ring = HashRing(self.nodes, self.vnodes)
+
+    def candidates(self) -> List[ApiNode]:
+        """Available nodes, or every node when all are ejected"""
+        nodes = list(self.nodes.values())
+        return [node for node in nodes if node.available] or nodes
+
+    def pick(self, exclude: Iterable[ApiNode] = ()) -> ApiNode:
+        """Power of two choices: the lower-scored of two random candidates"""
+        exclude = list(exclude)
+        nodes = [node for node in self.candidates() if node not in exclude] or self.candidates()
+        if len(nodes) == 1:
+            return nodes[0]
+        first, second = random.sample(nodes, 2)
+        return first if first.score() <= second.score() else second
+
+    def pick_for_key(self, key: str, exclude: Iterable[ApiNode] = ()) -> ApiNode:
+        """Owner of the key on the hash ring, skipping unavailable or overloaded nodes"""
+        exclude = list(exclude)
+        nodes = [node for node in self.candidates() if node not in exclude] or self.candidates()
+        in_flight = sum(node.in_flight for node in self.nodes.values())
+        capacity = math.ceil((in_flight + 1) / len(nodes) * self.load_factor)
+
+        owner = True
+        for url in self._ring.walk(key):
+            node = self.nodes[url]
+            if node in nodes and node.in_flight < capacity:
+                if owner:
+                    self.affinity_routed += 1
+                else:
+                    self.affinity_spilled += 1
+                return node
+            owner = False
+        return self.pick(exclude)
+
+    def acquire(self, exclude: Iterable[ApiNode] = (), affinity_key: Optional[str] = None) -> ApiNode:
+        """Pick a node and count the request as in flight on it"""
+        if affinity_key and self.routing == "affinity":
+            node = self.pick_for_key(affinity_key, exclude)
+        else:
+            node = self.pick(exclude)
+        node.in_flight += 1
+        node.requests += 1
+        return node
+
+    def abandon(self, node: ApiNode):
+        """Release a request that was cancelled (e.g. lost a hedge) without judging the node"""
+        node.in_flight -= 1
+
+    def release(self, node: ApiNode, latency: float, ok: bool):
+        """Record the outcome of a request started with acquire()"""
+        node.in_flight -= 1
+        if ok:
+            latency_ms = latency * 1000
+            node.ewma_ms += self.decay * (latency_ms - node.ewma_ms)
+            node.consecutive_failures = 0
+            return
+
+        node.failures += 1
+        node.consecutive_failures += 1
+        if node.consecutive_failures >= self.eject_after and node.available:
+            node.ejected_until = time.monotonic() + self.eject_seconds
+            self.ejections += 1
+            print(f"Ejecting API node {node.id} ({node.url}) for {self.eject_seconds:g}s")
+
+    async def refresh(self) -> int:
+        """Replace the node list from the discovery endpoint; returns the node count"""
+        async with httpx.AsyncClient() as client:
+            response = await client.get(self.discovery_url, timeout=5.0)
+            response.raise_for_status()
+            status = response.json()
+
+        scheme = urlsplit(self.seed_url).scheme or "http"
+        discovered: Dict[str, Dict] = {}
+        for entry in status.get("nodes") or []:
+            address = entry.get("address") or entry.get("Address")
+            port = entry.get("port") or entry.get("Port")
+            if not address:
+                continue
+            url = f"{scheme}://{address}:{port}" if port else f"{scheme}://{address}"
+            discovered[url] = entry
+
+        if not discovered:
+            return len(self.nodes)
+
+        # New nodes start at the median latency so they are not flooded before their first sample
+        known = [node.ewma_ms for node in self.nodes.values() if node.requests]
+        initial_ms = statistics.median(known) if known else 0.0
+
+        nodes = []
+        for url, entry in discovered.items():
+            node = self.nodes.get(url) or ApiNode(url, entry.get("id") or entry.get("ID"), initial_ms)
+            health = entry.get("health", 1.0)
+            node.reported_healthy = not isinstance(health, (int, float)) or health >= self.min_health
+            nodes.append(node)
+        if set(discovered) == set(self.nodes):
+            self.nodes = {node.url: node for node in nodes}
+        else:
+            self.set_nodes(nodes)
+        self.last_discovered = time.time()
+        return len(nodes)
+
+    async def start(self):
+        """Discover nodes and start the background refresh task"""
+        await self._refresh_safely()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the background refresh task"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            await self._refresh_safely()
+
+    async def _refresh_safely(self):
+        try:
+            await self.refresh()
+        except (httpx.HTTPError, ValueError) as e:
+            print(f"API node discovery failed ({self.discovery_url}): {e}")
+
+    def collect(self) -> List[Sample]:
+        """Metrics samples for the pool"""
+        samples = [
+            Sample("zk_api_nodes", "gauge", "Known ZK API nodes", {}, len(self.nodes)),
+            Sample("zk_api_node_ejections_total", "counter", "Node ejections after repeated failures",
+                   {}, self.ejections),
+            Sample("zk_api_affinity_routed_total", "counter",
+                   "Affinity requests sent to the key's owner node", {}, self.affinity_routed),
+            Sample("zk_api_affinity_spilled_total", "counter",
+                   "Affinity requests sent past the owner (overloaded or unavailable)",
+                   {}, self.affinity_spilled),
+        ]
+        for node in self.nodes.values():
+            labels = {"node": node.id}
+            samples.extend([
+                Sample("zk_api_node_ewma_ms", "gauge", "EWMA of observed request latency",
+                       labels, node.ewma_ms),
+                Sample("zk_api_node_in_flight", "gauge", "Requests in flight to the node",
+                       labels, node.in_flight),
+                Sample("zk_api_node_requests_total", "counter", "Requests sent to the node",
+                       labels, node.requests),
+                Sample("zk_api_node_failures_total", "counter", "Failed requests to the node",
+                       labels, node.failures),
+                Sample("zk_api_node_available", "gauge", "1 if the node is eligible for requests",
+                       labels, int(node.available)),
+            ])
+        return samples
+
+
+# ZK API nodes shared by every API client (used when LB_ENABLED is set)
+api_nodes = NodePool(
+    settings.ZK_API_BASE_URL,
+    settings.LB_DISCOVERY_URL,
+    refresh_interval=settings.LB_REFRESH_SECONDS,
+    eject_after=settings.LB_EJECT_AFTER_FAILURES,
+    eject_seconds=settings.LB_EJECT_SECONDS,
+    min_health=settings.LB_MIN_NODE_HEALTH,
+    routing=settings.LB_ROUTING,
+    vnodes=settings.LB_VIRTUAL_NODES,
+    load_factor=settings.LB_LOAD_FACTOR
+)
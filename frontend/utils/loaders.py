@@ -0,0 +1,129 @@
+"""
+Per-request batching loaders for the ZK Health Hospital Management System
+"""
+import asyncio
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import httpx
+from fastapi import Request
+
+from utils.api_client import ZKIdentityClient
+from utils.clients import clients
+from utils.config import settings
+
+# Identity fields that may carry a display name, in order of preference
+NAME_FIELDS = ("full_name", "name", "display_name")
+
+
+class IdentityLoader:
+    """Batches and memoizes identity lookups for the lifetime of one request
+
+    IDs requested within the same event-loop tick are collected and fetched
+    together as one wave of at most ``max_concurrency`` concurrent
+    ``get_identity`` calls (the identity API has no batch endpoint). Each ID is
+    fetched at most once per loader, so repeated lookups of the same doctor or
+    patient on a page share the first result, or the first error.
+    """
+
+    def __init__(self, client: ZKIdentityClient, max_concurrency: int = 10):
+        self.client = client
+        self.max_concurrency = max(1, max_concurrency)
+        self.requested = 0
+        self.fetched = 0
+        self.waves = 0
+        self._results: Dict[str, asyncio.Future] = {}
+        self._queue: List[str] = []
+        # The loop only keeps weak references to tasks
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def load(self, user_id: str) -> Dict:
+        """Identity details for user_id, fetched with the rest of this tick's IDs"""
+        self.requested += 1
+        future = self._results.get(user_id)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = self._results[user_id] = loop.create_future()
+            if not self._queue:
+                loop.call_soon(self._dispatch)
+            self._queue.append(user_id)
+        return await asyncio.shield(future)
+
+    async def load_many(self, user_ids: Iterable[str]) -> List[Dict]:
+        """Identity details for several IDs in one wave"""
+        return await asyncio.gather(*(self.load(user_id) for user_id in user_ids))
+
+    def _dispatch(self):
+        batch, self._queue = self._queue, []
+        self.waves += 1
+        task = asyncio.get_running_loop().create_task(self._fetch(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _fetch(self, batch: List[str]):
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def fetch_one(user_id: str):
+            future = self._results[user_id]
+            try:
+                async with semaphore:
+                    self.fetched += 1
+                    result = await self.client.get_identity(user_id)
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+                    # Mark retrieved so unawaited failures are not reported as leaks
+                    future.exception()
+            else:
+                if not future.done():
+                    future.set_result(result)
+
+        await asyncio.gather(*(fetch_one(user_id) for user_id in batch))
+
+
+def identity_name(identity: Optional[Dict]) -> Optional[str]:
+    """Display name carried by an identity record, if any"""
+    if not isinstance(identity, dict) or identity.get("success") is False:
+        return None
+    for field in NAME_FIELDS:
+        if identity.get(field):
+            return identity[field]
+    return None
+
+
+async def resolve_names(loader: IdentityLoader, rows: Sequence[Dict],
+                        *fields: Tuple[str, str]):
+    """Fill name fields of rows from the identities of their ID fields
+
+    ``fields`` are (id_field, name_field) pairs, e.g. ("doctor_id", "doctor_name").
+    Every referenced identity is loaded in one wave; a row keeps its current
+    name when the lookup fails or the identity carries no name. Does nothing
+    unless RESOLVE_IDENTITY_NAMES is set.
+    """
+    if not settings.RESOLVE_IDENTITY_NAMES:
+        return
+    lookups = [
+        (row, id_field, name_field)
+        for row in rows for id_field, name_field in fields if row.get(id_field)
+    ]
+
+    async def lookup(user_id: str) -> Optional[Dict]:
+        try:
+            return await loader.load(user_id)
+        except httpx.HTTPError:
+            return None
+
+    identities = await asyncio.gather(*(lookup(row[id_field]) for row, id_field, _ in lookups))
+    for (row, _, name_field), identity in zip(lookups, identities):
+        name = identity_name(identity)
+        if name:
+            row[name_field] = name
+
+
+def get_identity_loader(request: Request) -> IdentityLoader:
+    """Dependency returning the identity loader of the current request"""
+    loader = getattr(request.state, "identity_loader", None)
+    if loader is None:
+        loader = request.state.identity_loader = IdentityLoader(
+            clients.get(ZKIdentityClient), settings.IDENTITY_LOADER_CONCURRENCY
+        )
+    return loader
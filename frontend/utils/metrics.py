@@ -0,0 +1,69 @@
+"""
+Lightweight metrics registry for the ZK Health Hospital Management System
+"""
+from typing import Dict, List, NamedTuple
+
+
+class Sample(NamedTuple):
+    """A single metric sample"""
+    name: str
+    kind: str  # "counter" or "gauge"
+    help: str
+    labels: Dict[str, str]
+    value: float
+
+
+class MetricsRegistry:
+    """Registry of collectors rendered in the Prometheus text exposition format
+
+    A collector is any object with a ``collect()`` method returning samples. Values
+    are read at scrape time, so components only keep plain counters.
+    """
+
+    def __init__(self):
+        self._collectors: List = []
+
+    def register(self, collector):
+        """Register a collector"""
+        if collector not in self._collectors:
+            self._collectors.append(collector)
+        return collector
+
+    def unregister(self, collector):
+        """Remove a collector"""
+        if collector in self._collectors:
+            self._collectors.remove(collector)
+
+    def collect(self) -> List[Sample]:
+        """Gather samples from all collectors"""
+        samples: List[Sample] = []
+        for collector in self._collectors:
+            samples.extend(collector.collect())
+        return samples
+
+    def render(self) -> str:
+        """Render all samples as Prometheus text"""
+        lines = []
+        seen = set()
+        for sample in sorted(self.collect(), key=lambda s: s.name):
+            if sample.name not in seen:
+                seen.add(sample.name)
+                lines.append(f"# HELP {sample.name} {sample.help}")
+                lines.append(f"# TYPE {sample.name} {sample.kind}")
+            lines.append(f"{sample.name}{_format_labels(sample.labels)} {sample.value}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    pairs = ",".join(f'{key}="{_escape(value)}"' for key, value in sorted(labels.items()))
+    return "{" + pairs + "}"
+
+
+# Process-wide registry exposed at /metrics
+metrics_registry = MetricsRegistry()
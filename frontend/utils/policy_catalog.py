@@ -0,0 +1,32 @@
+"""
+Policy catalogue (countries, roles, actions) for the ZK Health Hospital Management System
+"""
+
+# Supported countries
+COUNTRIES = [
+    {"code": "IN", "name": "India", "flag_emoji": "🇮🇳"},
+    {"code": "US", "name": "United States", "flag_emoji": "🇺🇸"},
+    {"code": "CA", "name": "Canada", "flag_emoji": "🇨🇦"},
+    {"code": "GB", "name": "United Kingdom", "flag_emoji": "🇬🇧"},
+    {"code": "AU", "name": "Australia", "flag_emoji": "🇦🇺"}
+]
+
+# Defined roles
+ROLES = [
+    {"id": "general_doctor", "name": "General Physician", "strength": 5},
+    {"id": "specialist", "name": "Specialist", "strength": 8},
+    {"id": "nurse", "name": "Nurse", "strength": 3},
+    {"id": "admin", "name": "Administrator", "strength": 2},
+    {"id": "researcher", "name": "Researcher", "strength": 4},
+    {"id": "compliance_officer", "name": "Compliance Officer", "strength": 6}
+]
+
+# Defined actions
+ACTIONS = [
+    {"id": "prescribe", "name": "Prescribe Medication", "min_strength": 5},
+    {"id": "diagnose", "name": "Diagnose Patient", "min_strength": 5},
+    {"id": "issue_certificate", "name": "Issue Medical Certificate", "min_strength": 8},
+    {"id": "refer", "name": "Refer Patient", "min_strength": 5},
+    {"id": "access_records", "name": "Access Medical Records", "min_strength": 3},
+    {"id": "edit_records", "name": "Edit Medical Records", "min_strength": 5}
+]
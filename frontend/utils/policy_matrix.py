@@ -0,0 +1,225 @@
+"""
+Policy decision cache and what-if matrix for the ZK Health Hospital Management System
+"""
+import asyncio
+from collections import OrderedDict
+from typing import AsyncIterator, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+from utils.api_client import ZKPolicyClient
+from utils.clients import clients
+from utils.config import settings
+from utils.metrics import Sample, metrics_registry
+from utils.policy_catalog import ACTIONS, COUNTRIES, ROLES
+from utils.policy_table import allowed_actions_table
+
+
+class DecisionCache:
+    """LRU cache of policy decisions with in-flight deduplication
+
+    Concurrent lookups of the same key share a single pending request; only
+    successful decisions are stored. Keys should include the policy version so a
+    policy change never serves stale decisions.
+    """
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max(1, max_entries)
+        self.hits = 0
+        self.misses = 0
+        self.deduplicated = 0
+        self._entries: "OrderedDict[Hashable, Dict]" = OrderedDict()
+        self._pending: Dict[Hashable, asyncio.Future] = {}
+
+    def get(self, key: Hashable) -> Optional[Dict]:
+        """Cached decision for the key, or None"""
+        decision = self._entries.get(key)
+        if decision is not None:
+            self._entries.move_to_end(key)
+        return decision
+
+    async def get_or_fetch(self, key: Hashable, fetch: Callable[[], Awaitable[Dict]]) -> Dict:
+        """Return the cached decision, joining or starting a fetch on a miss
+
+        The fetch runs as its own task, so a caller that is cancelled (e.g. a
+        disconnected stream) stops waiting without cancelling it for the others.
+        """
+        decision = self.get(key)
+        if decision is not None:
+            self.hits += 1
+            return decision
+
+        pending = self._pending.get(key)
+        if pending is not None:
+            self.deduplicated += 1
+        else:
+            self.misses += 1
+            pending = asyncio.create_task(self._fetch(key, fetch))
+            self._pending[key] = pending
+            pending.add_done_callback(self._fetch_done)
+        return await asyncio.shield(pending)
+
+    async def _fetch(self, key: Hashable, fetch: Callable[[], Awaitable[Dict]]) -> Dict:
+        try:
+            decision = await fetch()
+        finally:
+            del self._pending[key]
+        if decision.get("success") is not False:
+            self._entries[key] = decision
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return decision
+
+    @staticmethod
+    def _fetch_done(task: asyncio.Task):
+        # Mark a failure retrieved so it isn't logged when every caller has gone
+        if not task.cancelled():
+            task.exception()
+
+    def clear(self):
+        """Drop every cached decision"""
+        self._entries.clear()
+
+    def collect(self) -> List[Sample]:
+        """Metrics samples for the cache"""
+        return [
+            Sample("zk_policy_decision_cache_entries", "gauge", "Cached policy decisions",
+                   {}, len(self._entries)),
+            Sample("zk_policy_decision_cache_hits_total", "counter", "Decision cache hits",
+                   {}, self.hits),
+            Sample("zk_policy_decision_cache_misses_total", "counter", "Decision cache misses",
+                   {}, self.misses),
+            Sample("zk_policy_decision_cache_deduplicated_total", "counter",
+                   "Lookups that joined an in-flight policy request", {}, self.deduplicated),
+        ]
+
+
+class PolicyMatrix:
+    """Evaluates every role x action x country cell against the policy engine
+
+    Cells are streamed as they complete, with at most ``max_concurrency`` policy
+    requests in flight. Decisions go through the shared DecisionCache and each
+    completed matrix is kept for the current policy version, so repeat views are
+    served without touching the network.
+    """
+
+    def __init__(self, policy_client: ZKPolicyClient, decision_cache: DecisionCache,
+                 roles: List[str], actions: List[str], countries: List[str],
+                 version: Callable[[], str], max_concurrency: int = 8):
+        self.policy_client = policy_client
+        self.decision_cache = decision_cache
+        self.roles = tuple(roles)
+        self.actions = tuple(actions)
+        self.countries = tuple(countries)
+        self.version = version
+        self.max_concurrency = max(1, max_concurrency)
+        self._matrices: Dict[Tuple[str, bool], List[Dict]] = {}
+
+    def cells(self, cross_border: bool = False) -> List[Tuple[str, str, str, Optional[str]]]:
+        """(role, action, country, cross_jurisdiction) for every cell of the matrix"""
+        targets = [None]
+        cells = []
+        for role in self.roles:
+            for action in self.actions:
+                for country in self.countries:
+                    if cross_border:
+                        targets = [None] + [c for c in self.countries if c != country]
+                    for cross_jurisdiction in targets:
+                        cells.append((role, action, country, cross_jurisdiction))
+        return cells
+
+    def cached(self, cross_border: bool = False) -> Optional[List[Dict]]:
+        """Completed matrix for the current policy version, if any"""
+        return self._matrices.get((self.version(), cross_border))
+
+    def invalidate(self):
+        """Forget completed matrices and cached decisions (policy update)"""
+        self._matrices.clear()
+        self.decision_cache.clear()
+
+    async def stream(self, cross_border: bool = False) -> AsyncIterator[Dict]:
+        """Yield matrix cells as they are decided"""
+        version = self.version()
+        cached = self._matrices.get((version, cross_border))
+        if cached is not None:
+            for cell in cached:
+                yield {**cell, "cached": True}
+            return
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def evaluate(cell):
+            async with semaphore:
+                return await self._evaluate(version, *cell)
+
+        tasks = [asyncio.create_task(evaluate(cell)) for cell in self.cells(cross_border)]
+        results = []
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                cell = await next_done
+                results.append(cell)
+                yield cell
+        finally:
+            # Client went away: don't leave policy requests running
+            for task in tasks:
+                task.cancel()
+
+        if all(cell["error"] is None for cell in results):
+            # Only the current version's matrices are worth keeping
+            self._matrices = {
+                key: value for key, value in self._matrices.items() if key[0] == version
+            }
+            self._matrices[(version, cross_border)] = results
+
+    async def _evaluate(self, version: str, role: str, action: str, country: str,
+                        cross_jurisdiction: Optional[str]) -> Dict:
+        validation_request = {
+            "actor": {
+                "id": f"matrix-{role}",
+                "role": role,
+                "attributes": {"country": country}
+            },
+            "action": action,
+            "location": country,
+            "resource": {"id": "matrix-resource", "type": "medical_record"}
+        }
+        if cross_jurisdiction:
+            validation_request["cross_jurisdiction"] = cross_jurisdiction
+
+        key = (version, role, action, country, cross_jurisdiction)
+        cell = {
+            "role": role,
+            "action": action,
+            "country": country,
+            "cross_jurisdiction": cross_jurisdiction,
+            "allowed": False,
+            "reason": None,
+            "error": None,
+            "cached": self.decision_cache.get(key) is not None
+        }
+        try:
+            decision = await self.decision_cache.get_or_fetch(
+                key, lambda: self.policy_client.validate_action(validation_request)
+            )
+        except Exception as e:
+            cell["error"] = str(e)
+            return cell
+
+        if decision.get("success") is False:
+            cell["error"] = decision.get("error")
+        cell["allowed"] = bool(decision.get("allowed", False))
+        cell["reason"] = decision.get("reason")
+        return cell
+
+
+# Shared policy decision cache
+decision_cache = metrics_registry.register(DecisionCache(settings.POLICY_DECISION_CACHE_SIZE))
+
+# What-if matrix over the policy catalogue, versioned by the allowed-actions table
+policy_matrix = PolicyMatrix(
+    clients.get(ZKPolicyClient),
+    decision_cache,
+    roles=[role["id"] for role in ROLES],
+    actions=[action["id"] for action in ACTIONS],
+    countries=[country["code"] for country in COUNTRIES],
+    version=lambda: allowed_actions_table.version,
+    max_concurrency=settings.POLICY_MATRIX_CONCURRENCY
+)
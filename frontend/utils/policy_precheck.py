@@ -0,0 +1,70 @@
+"""
+Local role-strength policy pre-check for the ZK Health Hospital Management System
+"""
+from typing import Dict, Iterable, Optional
+
+
+class RoleStrengthPrecheck:
+    """Compiled role-strength matrix used to reject certainly-denied requests in-process
+
+    Roles and actions are encoded as integer IDs and each role maps to a bitset of
+    actions its strength satisfies. The policy engine rejects any request where the
+    role strength is below the action's minimum, so a cleared bit is a certain
+    denial. Unknown roles or actions are ambiguous and must go to the policy API.
+    """
+
+    def __init__(self, role_ids: Dict[str, int], action_ids: Dict[str, int], allowed_rows):
+        self.role_ids = role_ids
+        self.action_ids = action_ids
+        self.allowed_rows = tuple(allowed_rows)
+        self.short_circuited = 0
+        self.forwarded = 0
+
+    @classmethod
+    def compile(cls, roles: Iterable[Dict], actions: Iterable[Dict]) -> "RoleStrengthPrecheck":
+        """Build the matrix from role `strength` and action `min_strength` tables"""
+        roles = list(roles)
+        actions = list(actions)
+        role_ids = {role["id"]: i for i, role in enumerate(roles)}
+        action_ids = {action["id"]: i for i, action in enumerate(actions)}
+
+        allowed_rows = []
+        for role in roles:
+            row = 0
+            for action in actions:
+                if role["strength"] >= action["min_strength"]:
+                    row |= 1 << action_ids[action["id"]]
+            allowed_rows.append(row)
+
+        return cls(role_ids, action_ids, allowed_rows)
+
+    def is_denied(self, role: Optional[str], action: Optional[str]) -> bool:
+        """True only when the role certainly lacks the strength for the action"""
+        role_id = self.role_ids.get(role)
+        action_id = self.action_ids.get(action)
+        if role_id is None or action_id is None:
+            return False
+        return not (self.allowed_rows[role_id] >> action_id) & 1
+
+    def check(self, validation_request: Dict) -> Optional[Dict]:
+        """Return a denial response for certainly-denied requests, otherwise None"""
+        role = validation_request.get("actor", {}).get("role")
+        action = validation_request.get("action")
+
+        if not self.is_denied(role, action):
+            self.forwarded += 1
+            return None
+
+        self.short_circuited += 1
+        return {
+            "allowed": False,
+            "reason": f"Role {role} has insufficient strength for action {action}",
+            "precheck": True
+        }
+
+    def stats(self) -> Dict:
+        """Pre-check counters"""
+        return {
+            "short_circuited": self.short_circuited,
+            "forwarded": self.forwarded
+        }
@@ -0,0 +1,147 @@
+"""
+Precomputed allowed-actions table for the ZK Health Hospital Management System
+"""
+import asyncio
+import hashlib
+import json
+from datetime import datetime
+from types import MappingProxyType
+from typing import Dict, Iterable, Mapping, Optional, Tuple
+
+import httpx
+
+from utils.api_client import ZKPolicyClient
+from utils.clients import clients
+from utils.config import settings
+from utils.policy_catalog import COUNTRIES, ROLES
+
+
+class AllowedActionsTable:
+    """Immutable (role, country) -> allowed actions table kept warm in the background
+
+    The table is fetched once at startup for every known (role, country) pair and
+    then swapped atomically on each refresh, so lookups never touch the network.
+    """
+
+    def __init__(self, policy_client: ZKPolicyClient, roles: Iterable[str],
+                 countries: Iterable[str], refresh_interval: float = 300.0,
+                 max_concurrency: int = 8):
+        self.policy_client = policy_client
+        self.roles = tuple(roles)
+        self.countries = tuple(countries)
+        self.refresh_interval = refresh_interval
+        self.max_concurrency = max(1, max_concurrency)
+        self.last_refreshed: Optional[datetime] = None
+        self.version = "unversioned"
+        self._table: Mapping[Tuple[str, str], Mapping] = MappingProxyType({})
+        self._refresh_requested: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def table(self) -> Mapping[Tuple[str, str], Mapping]:
+        """Current read-only snapshot of the table"""
+        return self._table
+
+    def get(self, role: str, country: str) -> Optional[Dict]:
+        """Return the cached allowed-actions response, or None if the pair is unknown"""
+        entry = self._table.get((role, country))
+        return dict(entry) if entry is not None else None
+
+    async def get_allowed_actions(self, role: str, country: str) -> Dict:
+        """Serve from the table, falling back to the policy API for unknown pairs"""
+        cached = self.get(role, country)
+        if cached is not None:
+            return cached
+        return await self.policy_client.get_allowed_actions(role, country)
+
+    async def refresh(self) -> int:
+        """Fetch every (role, country) pair and swap in a new table
+
+        Pairs that fail to load keep their previous entry. Returns the number of
+        pairs that were refreshed successfully.
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def fetch(role: str, country: str):
+            async with semaphore:
+                try:
+                    response = await self.policy_client.get_allowed_actions(role, country)
+                except httpx.HTTPError as e:
+                    print(f"Allowed-actions refresh failed for {role}/{country}: {e}")
+                    return role, country, None
+            if not isinstance(response, dict) or response.get("success") is False:
+                return role, country, None
+            return role, country, response
+
+        results = await asyncio.gather(*(
+            fetch(role, country) for role in self.roles for country in self.countries
+        ))
+
+        table = dict(self._table)
+        refreshed = 0
+        for role, country, response in results:
+            if response is None:
+                continue
+            frozen = dict(response)
+            frozen["actions"] = tuple(response.get("actions", []))
+            table[(role, country)] = MappingProxyType(frozen)
+            refreshed += 1
+
+        self._table = MappingProxyType(table)
+        self.version = self._fingerprint(table)
+        self.last_refreshed = datetime.now()
+        return refreshed
+
+    @staticmethod
+    def _fingerprint(table: Mapping[Tuple[str, str], Mapping]) -> str:
+        """Short content hash of the table, used as the observed policy version"""
+        canonical = json.dumps(
+            sorted((role, country, sorted(entry.get("actions", ())))
+                   for (role, country), entry in table.items())
+        )
+        return hashlib.sha256(canonical.encode()).hexdigest()[:16]
+
+    def request_refresh(self):
+        """Signal the background task to refresh now (e.g. after a policy update)"""
+        if self._refresh_requested is not None:
+            self._refresh_requested.set()
+
+    async def start(self):
+        """Warm the table and start the background refresh task"""
+        self._refresh_requested = asyncio.Event()
+        await self.refresh()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the background refresh task"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(
+                    self._refresh_requested.wait(), timeout=self.refresh_interval
+                )
+            except asyncio.TimeoutError:
+                pass
+            self._refresh_requested.clear()
+            try:
+                await self.refresh()
+            except Exception as e:
+                print(f"Allowed-actions refresh error: {e}")
+
+
+# Allowed actions for every (role, country) pair, warmed at startup
+allowed_actions_table = AllowedActionsTable(
+    clients.get(ZKPolicyClient),
+    roles=[role["id"] for role in ROLES],
+    countries=[country["code"] for country in COUNTRIES],
+    refresh_interval=settings.ALLOWED_ACTIONS_REFRESH_SECONDS,
+    max_concurrency=settings.ALLOWED_ACTIONS_CONCURRENCY
+)
@@ -0,0 +1,105 @@
+"""
+Registry-driven router loading for the ZK Health Hospital Management System
+"""
+import importlib
+import importlib.util
+import time
+from typing import Dict, List, NamedTuple
+
+from fastapi import APIRouter
+
+
+class RouterSpec(NamedTuple):
+    """Router module registration"""
+    module: str
+    prefix: str
+    tags: List[str]
+
+
+def module_available(module_name: str) -> bool:
+    """True if the module can be imported (without importing it)"""
+    try:
+        return importlib.util.find_spec(module_name) is not None
+    except ModuleNotFoundError:
+        return False
+
+
+class LazyRouter:
+    """ASGI app mounted at a router prefix that imports the router on first request"""
+
+    def __init__(self, spec: RouterSpec, registry: "RouterRegistry", default_response_class=None):
+        self.spec = spec
+        self.registry = registry
+        self.default_response_class = default_response_class
+        self._router = None
+
+    def load(self):
+        """Import the router module (once)"""
+        if self._router is None:
+            router = self.registry.import_router(self.spec)
+            if self.default_response_class is not None:
+                # Re-include so routes pick up the app's default response class
+                mounted = APIRouter(default_response_class=self.default_response_class)
+                mounted.include_router(router, tags=self.spec.tags)
+                router = mounted
+            self._router = router
+        return self._router
+
+    async def __call__(self, scope, receive, send):
+        await self.load()(scope, receive, send)
+
+
+class RouterRegistry:
+    """Installs the routers listed in ``specs`` on an app
+
+    Specs whose module does not exist are skipped with a warning instead of
+    failing startup. In lazy mode each router is mounted behind a LazyRouter and
+    imported on its first request; in eager mode routers are imported and
+    included immediately (use eager mode with preloading servers so the import
+    cost is paid once in the master process). Per-module import times are kept
+    in ``import_times``.
+    """
+
+    def __init__(self, specs: List[RouterSpec]):
+        self.specs = list(specs)
+        self.import_times: Dict[str, float] = {}
+        self.skipped: List[str] = []
+        self._lazy: List[LazyRouter] = []
+
+    def import_router(self, spec: RouterSpec):
+        """Import a router module and record how long it took"""
+        started = time.perf_counter()
+        module = importlib.import_module(spec.module)
+        self.import_times[spec.module] = time.perf_counter() - started
+        return module.router
+
+    def install(self, app, lazy: bool = False):
+        """Register every available router on the app"""
+        for spec in self.specs:
+            if not module_available(spec.module):
+                self.skipped.append(spec.module)
+                print(f"Router {spec.module} not found, skipping {spec.prefix}")
+                continue
+
+            if lazy:
+                lazy_router = LazyRouter(spec, self, app.router.default_response_class)
+                self._lazy.append(lazy_router)
+                app.mount(spec.prefix, lazy_router, name=spec.module)
+            else:
+                app.include_router(self.import_router(spec), prefix=spec.prefix, tags=spec.tags)
+
+    def preload(self):
+        """Import any routers that are still lazy"""
+        for lazy_router in self._lazy:
+            lazy_router.load()
+
+    def report(self) -> List[str]:
+        """Human-readable import time report, slowest first"""
+        lines = [
+            f"{seconds * 1000:9.2f} ms  {module}"
+            for module, seconds in sorted(self.import_times.items(), key=lambda item: -item[1])
+        ]
+        lines.append(f"{sum(self.import_times.values()) * 1000:9.2f} ms  total")
+        for module in self.skipped:
+            lines.append(f"{'skipped':>12}  {module}")
+        return lines
@@ -0,0 +1,96 @@
+"""
+Server launchers for the ZK Health Hospital Management System frontend
+"""
+import importlib.util
+import multiprocessing
+from typing import Dict
+
+import uvicorn
+
+from utils.config import settings
+
+
+def detect_runtime() -> Dict[str, str]:
+    """Pick uvloop/httptools when installed, else the pure-Python defaults"""
+    return {
+        "loop": "uvloop" if importlib.util.find_spec("uvloop") else "asyncio",
+        "http": "httptools" if importlib.util.find_spec("httptools") else "h11"
+    }
+
+
+def default_workers() -> int:
+    """Worker count: WORKERS setting, else one per CPU"""
+    return settings.WORKERS or multiprocessing.cpu_count()
+
+
+def run_development(app_path: str = "main:app"):
+    """Single-process server with optional auto-reload"""
+    uvicorn.run(
+        app_path,
+        host=settings.HOST,
+        port=settings.PORT,
+        reload=settings.DEBUG
+    )
+
+
+def run_production(app_path: str = "main:app", workers: int = None,
+                   max_requests: int = None, max_requests_jitter: int = None):
+    """Multi-worker server for production
+
+    Runs gunicorn with uvicorn workers: the app is imported once in the master and
+    forked into each worker (preload), workers bind with SO_REUSEPORT, and each
+    worker is gracefully recycled after ``max_requests`` (+ jitter) requests.
+    """
+    from gunicorn.app.base import BaseApplication
+
+    from utils.jobs import validation_jobs
+
+    runtime = detect_runtime()
+    workers = workers or default_workers()
+    # Jobs are kept in the worker that queued them; a poll could land elsewhere
+    validation_jobs.pollable = workers == 1
+    options = {
+        "bind": f"{settings.HOST}:{settings.PORT}",
+        "workers": workers,
+        "worker_class": "utils.server.RuntimeUvicornWorker",
+        "preload_app": True,
+        "reuse_port": True,
+        "max_requests": settings.MAX_REQUESTS if max_requests is None else max_requests,
+        "max_requests_jitter": (
+            settings.MAX_REQUESTS_JITTER if max_requests_jitter is None else max_requests_jitter
+        ),
+        "graceful_timeout": settings.GRACEFUL_TIMEOUT,
+        "keepalive": 5,
+    }
+
+    class ProductionApplication(BaseApplication):
+        def load_config(self):
+            for key, value in options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            module_name, attr = app_path.split(":")
+            app = getattr(importlib.import_module(module_name), attr)
+            # Import lazy routers in the master so workers fork with them loaded
+            router_registry = getattr(app.state, "router_registry", None)
+            if router_registry is not None:
+                router_registry.preload()
+            return app
+
+    print(
+        f"Starting {options['workers']} workers on {options['bind']} "
+        f"(loop={runtime['loop']}, http={runtime['http']}, "
+        f"max_requests={options['max_requests']})"
+    )
+    ProductionApplication().run()
+
+
+try:
+    from uvicorn.workers import UvicornWorker
+
+    class RuntimeUvicornWorker(UvicornWorker):
+        """Uvicorn worker using the event loop and HTTP parser picked by detect_runtime"""
+        CONFIG_KWARGS = {**UvicornWorker.CONFIG_KWARGS, **detect_runtime()}
+except ImportError:
+    # gunicorn is only required for production mode
+    RuntimeUvicornWorker = None
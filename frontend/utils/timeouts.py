@@ -0,0 +1,82 @@
+"""
+Adaptive per-endpoint API timeouts for the ZK Health Hospital Management System
+"""
+from typing import Dict, List
+
+from utils.config import settings
+from utils.latency import QuantileSketch
+from utils.metrics import Sample
+
+
+class AdaptiveTimeouts:
+    """Per-endpoint timeouts derived from the observed latency distribution
+
+    Each endpoint's timeout is ``multiplier`` x its observed p99, clamped to
+    [``minimum``, ``maximum``]. Until an endpoint has ``min_samples`` observations
+    the ``default`` timeout applies. Requests that time out are recorded at the
+    timeout value, so an endpoint that gets slower pushes its own timeout up.
+    """
+
+    def __init__(self, multiplier: float = 3.0, minimum: float = 1.0, maximum: float = 120.0,
+                 default: float = 30.0, min_samples: int = 50, quantile: float = 0.99):
+        self.multiplier = multiplier
+        self.minimum = minimum
+        self.maximum = maximum
+        self.default = default
+        self.min_samples = min_samples
+        self.quantile = quantile
+        self.sketches: Dict[str, QuantileSketch] = {}
+        self.timeouts: Dict[str, int] = {}
+
+    def timeout_for(self, endpoint: str) -> float:
+        """Timeout in seconds for the next request to the endpoint"""
+        sketch = self.sketches.get(endpoint)
+        if sketch is None or sketch.count < self.min_samples:
+            return self.default
+        return min(self.maximum, max(self.minimum, self.multiplier * sketch.quantile(self.quantile)))
+
+    def observe(self, endpoint: str, seconds: float):
+        """Record the latency of a completed request"""
+        if endpoint not in self.sketches:
+            self.sketches[endpoint] = QuantileSketch()
+        self.sketches[endpoint].add(seconds)
+
+    def observe_timeout(self, endpoint: str, timeout: float):
+        """Record a request that timed out (its true latency is at least ``timeout``)"""
+        self.timeouts[endpoint] = self.timeouts.get(endpoint, 0) + 1
+        self.observe(endpoint, timeout)
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """Current timeout and latency quantiles per endpoint"""
+        snapshot = {}
+        for endpoint, sketch in sorted(self.sketches.items()):
+            snapshot[endpoint] = {
+                "timeout_seconds": round(self.timeout_for(endpoint), 3),
+                "adaptive": sketch.count >= self.min_samples,
+                "samples": round(sketch.count),
+                "p50_ms": round(sketch.quantile(0.5) * 1000, 2),
+                "p99_ms": round(sketch.quantile(0.99) * 1000, 2),
+                "timeouts": self.timeouts.get(endpoint, 0)
+            }
+        return snapshot
+
+    def collect(self) -> List[Sample]:
+        """Metrics samples per endpoint"""
+        samples = []
+        for endpoint in self.sketches:
+            labels = {"endpoint": endpoint}
+            samples.append(Sample("zk_api_timeout_seconds", "gauge", "Current adaptive API timeout",
+                                  labels, self.timeout_for(endpoint)))
+            samples.append(Sample("zk_api_timeouts_total", "counter", "API requests that timed out",
+                                  labels, self.timeouts.get(endpoint, 0)))
+        return samples
+
+
+# Timeouts shared by every API client
+api_timeouts = AdaptiveTimeouts(
+    multiplier=settings.API_TIMEOUT_MULTIPLIER,
+    minimum=settings.API_TIMEOUT_MIN,
+    maximum=settings.API_TIMEOUT_MAX,
+    default=settings.API_TIMEOUT_DEFAULT,
+    min_samples=settings.API_TIMEOUT_MIN_SAMPLES
+)